@@ -1,8 +1,10 @@
-from distutils.core import setup
+from setuptools import setup
 
 
 setup(
     name="remapping",
     packages=["remapping"],
     package_dir={"remapping": "src/remapping"},
+    entry_points={"console_scripts": ["remap = remapping.cli:main"]},
+    extras_require={"numpy": ["numpy"]},
 )
@@ -1,4 +1,33 @@
-__all__ = ["SimpleRemap", "MixedPlatformRemap"]
+__all__ = [
+    "SimpleRemap",
+    "MixedPlatformRemap",
+    "ParallelRemap",
+    "AsyncRemap",
+    "CacheInfo",
+    "Instrumentation",
+    "TextRewrite",
+    "BatchStats",
+    "CompactRemapResult",
+    "MappingWatcher",
+    "RemapServer",
+    "RemapClient",
+    "ManifestRewrite",
+    "VerifiedRemap",
+    "DirectoryListingCache",
+    "PersistentRemap",
+]
 
 from .simple_remap import SimpleRemap
 from .mixed_platforms_resolver import MixedPlatformRemap
+from .parallel import ParallelRemap
+from .async_remap import AsyncRemap
+from .cache import CacheInfo
+from .instrumentation import Instrumentation
+from .rewrite import TextRewrite
+from .batch import BatchStats
+from .compact_result import CompactRemapResult
+from .watcher import MappingWatcher
+from .daemon import RemapServer, RemapClient
+from .manifest import ManifestRewrite
+from .verification import VerifiedRemap, DirectoryListingCache
+from .result_store import PersistentRemap
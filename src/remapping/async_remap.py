@@ -0,0 +1,192 @@
+import asyncio
+import concurrent.futures
+import threading
+import typing
+
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .simple_remap import SimpleRemap
+
+# Marks the end of input paths read by AsyncRemap.iter_remap.
+END = object()
+
+
+class AsyncRemap:
+    """Class for remapping paths in asyncio applications without blocking event loop.
+
+    Remapping is done by given remapper, in batches of batch_size paths,
+    with control given back to event loop after each batch.
+    Lists with at least executor_threshold paths are remapped in executor
+    (thread pool by default), so event loop stays responsive during long remapping.
+    Small lists are remapped at once, so there is no additional latency for them.
+    Remapper and its caches are not thread safe, so it's called by one thread
+    at a time. Small lists are remapped in executor too, while remapper is busy there.
+    Remapper should not be used by other threads at the same time.
+
+    Examples:
+        >>> remap = AsyncRemap(SimpleRemap({"L:\\": "X:\\"}))
+        >>> await remap(["L:\\temp"])
+        ["X:\\temp"]
+        >>> [path async for path in remap.iter_remap(paths_from_request())]
+        ["X:\\temp", ...]
+
+    Attributes:
+        remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper used for remapping.
+        batch_size (int): Number of paths remapped before control is given to event loop.
+        executor (typing.Optional[concurrent.futures.Executor]): Executor for big lists.
+        executor_threshold (typing.Optional[int]): Minimal number of paths
+            remapped in executor.
+    """
+
+    def __init__(
+        self,
+        remap: typing.Union[SimpleRemap, MixedPlatformRemap],
+        batch_size: int = 1000,
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+        executor_threshold: typing.Optional[int] = 100000,
+    ):
+        """
+        Args:
+            remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper to use.
+            batch_size (int): Number of paths remapped before control is given
+                back to event loop.
+            executor (typing.Optional[concurrent.futures.Executor]): Executor used
+                for big lists, event loop's default executor if not given.
+            executor_threshold (typing.Optional[int]): Lists with at least that many
+                paths are remapped in executor, None disables executor.
+        """
+        if batch_size <= 0:
+            raise ValueError(f"Batch size should be positive, given: {batch_size}")
+
+        self.remap = remap
+        self.batch_size = batch_size
+        self.executor = executor
+        self.executor_threshold = executor_threshold
+        self._lock = threading.Lock()
+
+    async def __call__(self, input_paths: typing.List[str], *args) -> typing.List[str]:
+        """
+        Args:
+            input_paths (typing.List[str]): Input paths to remap.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            typing.List[str]: List of remapped input paths
+
+        """
+        if len(input_paths) <= self.batch_size:
+            return await self._remap_batch(input_paths, args)
+
+        if (
+            self.executor_threshold is not None
+            and len(input_paths) >= self.executor_threshold
+        ):
+            return await self._remap_in_executor(input_paths, args)
+
+        result = []
+        for start in range(0, len(input_paths), self.batch_size):
+            result.extend(
+                await self._remap_batch(
+                    input_paths[start : start + self.batch_size], args
+                )
+            )
+            await asyncio.sleep(0)
+
+        return result
+
+    async def _remap_batch(
+        self, input_paths: typing.List[str], args: tuple
+    ) -> typing.List[str]:
+        if not self._lock.acquire(blocking=False):
+            # Waiting for remapping in executor would block event loop.
+            return await self._remap_in_executor(input_paths, args)
+        try:
+            return self.remap(input_paths, *args)
+        finally:
+            self._lock.release()
+
+    async def _remap_in_executor(
+        self, input_paths: typing.List[str], args: tuple
+    ) -> typing.List[str]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._remap_locked, input_paths, args
+        )
+
+    def _remap_locked(
+        self, input_paths: typing.List[str], args: tuple
+    ) -> typing.List[str]:
+        with self._lock:
+            return self.remap(input_paths, *args)
+
+    async def iter_remap(
+        self, input_paths: typing.AsyncIterable[str], *args
+    ) -> typing.AsyncIterator[str]:
+        """
+        Remaps paths from async iterable as soon as they arrive, so slow producers
+        don't wait for whole batch to be collected. Paths are read ahead
+        by background task, at most batch_size of them, and all paths which
+        are already read (up to batch_size) are remapped with single call.
+
+        Args:
+            input_paths (typing.AsyncIterable[str]): Input paths to remap.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Yields:
+            str: remapped input paths, in the same order as input paths.
+
+        """
+        # Validates remapper arguments before first path is read.
+        self.remap.iter_remap((), *args)
+
+        # Lighter than asyncio.Queue, which costs as much as remapping of short paths.
+        buffer = []
+        filled, drained = asyncio.Event(), asyncio.Event()
+        reader = asyncio.ensure_future(
+            self._read(input_paths, buffer, filled, drained)
+        )
+        try:
+            while True:
+                if not buffer:
+                    filled.clear()
+                    await filled.wait()
+                batch = buffer[: self.batch_size]
+                del buffer[: self.batch_size]
+                drained.set()
+                # End of input or error of producer is always the last item.
+                end = batch[-1]
+                if end is END or isinstance(end, Exception):
+                    batch.pop()
+                else:
+                    end = None
+                if batch:
+                    for path in await self._remap_batch(batch, args):
+                        yield path
+                if end is END:
+                    return
+                if end is not None:
+                    raise end
+                await asyncio.sleep(0)
+        finally:
+            reader.cancel()
+
+    async def _read(
+        self,
+        input_paths: typing.AsyncIterable[str],
+        buffer: typing.List[typing.Any],
+        filled: asyncio.Event,
+        drained: asyncio.Event,
+    ):
+        batch_size = self.batch_size
+        try:
+            async for input_path in input_paths:
+                buffer.append(input_path)
+                filled.set()
+                if len(buffer) >= batch_size:
+                    drained.clear()
+                    await drained.wait()
+        except Exception as error:
+            buffer.append(error)
+        else:
+            buffer.append(END)
+        filled.set()
@@ -0,0 +1,157 @@
+import typing
+
+from .utils import UNC_ANCHOR_PATTERN, is_windows_style_path
+
+
+class BatchStats:
+    """Collects statistics of batches remapped with remap_batch of remappers.
+
+    Examples:
+        >>> stats = BatchStats()
+        >>> remap.remap_batch(["L:\\temp\\a", "L:\\temp\\a", "L:\\temp\\b"], stats=stats)
+        >>> stats.report()
+        "paths: 3, unique: 2, directories: 1, dedup ratio: 1.50, paths per directory: 2.00"
+
+    Attributes:
+        paths (int): Number of remapped paths.
+        unique_paths (int): Number of unique paths in each batch.
+        directories (int): Number of unique parent directories in each batch,
+            for which mapping was looked up.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.paths = 0
+        self.unique_paths = 0
+        self.directories = 0
+
+    def record(self, paths: int, unique_paths: int, directories: int):
+        """
+        Args:
+            paths (int): Number of paths in batch.
+            unique_paths (int): Number of unique paths in batch.
+            directories (int): Number of unique parent directories in batch.
+        """
+        self.paths += paths
+        self.unique_paths += unique_paths
+        self.directories += directories
+
+    @property
+    def dedup_ratio(self) -> float:
+        """
+        Returns:
+            float: Number of paths per unique path, e.g. 4.0 if each path
+                was repeated four times.
+
+        """
+        return self.paths / self.unique_paths if self.unique_paths else 1.0
+
+    @property
+    def paths_per_directory(self) -> float:
+        """
+        Returns:
+            float: Number of unique paths per directory looked up in mapping.
+
+        """
+        return self.unique_paths / self.directories if self.directories else 0.0
+
+    def report(self) -> str:
+        """
+        Returns:
+            str: Summary of collected statistics.
+
+        """
+        return (
+            f"paths: {self.paths}, unique: {self.unique_paths}, "
+            f"directories: {self.directories}, dedup ratio: {self.dedup_ratio:.2f}, "
+            f"paths per directory: {self.paths_per_directory:.2f}"
+        )
+
+
+def split_basename(path: str) -> typing.Optional[typing.Tuple[str, str]]:
+    """
+    Splits path into its directory and basename, if path can be remapped
+    by remapping its directory and appending basename to the result.
+    It's true for basenames without separators, drives and parent statements,
+    since normalization never modifies them, as long as style of path doesn't change.
+
+    Examples:
+        >>> split_basename("p:/project1\\textures/grass.tga")
+        ("p:/project1\\textures/", "grass.tga")
+        >>> split_basename("/mnt/storage1/..")
+
+    Args:
+    path (str): path to split.
+
+    Returns:
+        typing.Optional[typing.Tuple[str, str]]: directory with trailing separator
+            and basename, None if path should be remapped as a whole.
+
+    """
+    if is_windows_style_path(path):
+        if ".." in path:
+            # Resolving parent statements might remove drive and change style of path.
+            return None
+        index = max(path.rfind("/"), path.rfind("\\"))
+        if path[:2] == "\\\\":
+            anchor = UNC_ANCHOR_PATTERN.match(path)
+            if anchor is not None and index < anchor.end():
+                # Share of UNC path is not a basename.
+                return None
+    else:
+        index = path.rfind("/")
+
+    basename = path[index + 1 :]
+    if (
+        index < 0
+        or not basename
+        or basename == "."
+        or basename.startswith("..")
+        or ":" in basename
+        or "\\" in basename
+    ):
+        return None
+    return path[: index + 1], basename
+
+
+def remap_batch(
+    input_paths: typing.Sequence[str],
+    remap_path: typing.Callable[[str], str],
+    remap_directory: typing.Callable[[str, typing.List[str]], typing.List[str]],
+    stats: typing.Optional[BatchStats] = None,
+) -> typing.List[str]:
+    """
+    Remaps each unique path once, grouped by parent directories,
+    and scatters results back to positions of input paths.
+
+    Args:
+    input_paths (typing.Sequence[str]): input paths to remap.
+    remap_path (typing.Callable[[str], str]): remaps single path.
+    remap_directory (typing.Callable[[str, typing.List[str]], typing.List[str]]):
+        remaps paths with given directory (see split_basename) and basenames.
+    stats (typing.Optional[BatchStats]): collector of batch statistics.
+
+    Returns:
+        typing.List[str]: List of remapped input paths
+
+    """
+    results = dict.fromkeys(input_paths)
+    directories = {}
+    for path in results:
+        split = split_basename(path)
+        if split is None:
+            results[path] = remap_path(path)
+        else:
+            directory, basename = split
+            paths, basenames = directories.setdefault(directory, ([], []))
+            paths.append(path)
+            basenames.append(basename)
+
+    for directory, (paths, basenames) in directories.items():
+        results.update(zip(paths, remap_directory(directory, basenames)))
+
+    if stats is not None:
+        stats.record(len(input_paths), len(results), len(directories))
+    return list(map(results.__getitem__, input_paths))
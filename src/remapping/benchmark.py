@@ -0,0 +1,347 @@
+"""Throughput benchmarks of remappers on synthetic, reproducible workloads.
+
+Usage:
+    python -m remapping.benchmark [--size N] [--save results.json] [--baseline base.json]
+
+Each workload reports paths per second, per path latency percentiles and
+peak memory allocated during remapping (measured with tracemalloc).
+Results can be saved as JSON and compared with previously saved baseline.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+import typing
+
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .simple_remap import SimpleRemap
+
+NAME_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789_"
+EXTENSIONS = (".tga", ".exr", ".abc", ".usd", ".ma", ".png")
+PERCENTILES = (50, 90, 99)
+
+
+class Workload(typing.NamedTuple):
+    name: str
+    remap: typing.Union[SimpleRemap, MixedPlatformRemap]
+    input_paths: typing.List[str]
+    args: tuple = ()
+
+
+def _name(generator: random.Random, length: int = 8) -> str:
+    return "".join(generator.choice(NAME_CHARS) for _ in range(length))
+
+
+def _file_name(generator: random.Random) -> str:
+    return _name(generator) + generator.choice(EXTENSIONS)
+
+
+def deep_tree_paths(
+    roots: typing.Sequence[str], count: int, depth: int = 12, seed: int = 0
+) -> typing.List[str]:
+    """
+    Generates paths placed deep below given roots, in style of the roots.
+
+    Args:
+    roots (typing.Sequence[str]): parent paths of generated paths.
+    count (int): number of paths.
+    depth (int): number of directories below root.
+    seed (int): seed of random generator.
+
+    Returns:
+        typing.List[str]: generated paths.
+
+    """
+    generator = random.Random(seed)
+    # Limited number of directories per level, just like in real projects.
+    directories = [[_name(generator) for _ in range(4)] for _ in range(depth)]
+    paths = []
+    for _ in range(count):
+        root = generator.choice(roots)
+        separator = "\\" if ":" in root else "/"
+        names = [generator.choice(level) for level in directories]
+        paths.append(
+            root.rstrip("\\/")
+            + separator
+            + separator.join(names + [_file_name(generator)])
+        )
+    return paths
+
+
+def parent_statement_paths(
+    roots: typing.Sequence[str], count: int, depth: int = 6, seed: int = 0
+) -> typing.List[str]:
+    """
+    Generates paths with many parent statements, e.g. "/mnt/a/b/../../c/../d".
+
+    Args:
+    roots (typing.Sequence[str]): parent paths of generated paths.
+    count (int): number of paths.
+    depth (int): number of nested parent statements in each path.
+    seed (int): seed of random generator.
+
+    Returns:
+        typing.List[str]: generated paths.
+
+    """
+    generator = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        root = generator.choice(roots)
+        separator = "\\" if ":" in root else "/"
+        names = [_name(generator, 6) for _ in range(depth)]
+        paths.append(
+            root.rstrip("\\/")
+            + separator
+            + separator.join(names + [".."] * (depth - 1) + [_file_name(generator)])
+        )
+    return paths
+
+
+def unmatched_paths(count: int, seed: int = 0) -> typing.List[str]:
+    """
+    Generates paths, which mostly (9 of 10) are not placed below any root
+    from mappings generated by this module.
+
+    Args:
+    count (int): number of paths.
+    seed (int): seed of random generator.
+
+    Returns:
+        typing.List[str]: generated paths.
+
+    """
+    return deep_tree_paths(
+        ["/home/user", "/tmp", "C:\\Users\\user", "D:\\cache", "relative", "/mnt/storage1"]
+        + ["/opt/software"] * 4,
+        count,
+        depth=6,
+        seed=seed,
+    )
+
+
+def overlapping_mapping(roots_count: int, seed: int = 0) -> typing.Dict[str, str]:
+    """
+    Generates SimpleRemap mapping with many roots nested in each other,
+    e.g. "/mnt/storage1", "/mnt/storage1/project1", ...
+
+    Args:
+    roots_count (int): number of mapping entries.
+    seed (int): seed of random generator.
+
+    Returns:
+        typing.Dict[str, str]: generated mapping.
+
+    """
+    generator = random.Random(seed)
+    roots = ["/mnt/storage1"]
+    while len(roots) < roots_count:
+        roots.append(generator.choice(roots) + "/" + _name(generator, 4))
+    return {root: "/Volumes/" + _name(generator) for root in roots}
+
+
+def mixed_platforms_mapping(roots_count: int) -> typing.Dict[str, typing.List[str]]:
+    """
+    Generates MixedPlatformRemap mapping with given number of storages.
+
+    Args:
+    roots_count (int): number of paths for each platform.
+
+    Returns:
+        typing.Dict[str, typing.List[str]]: generated mapping.
+
+    """
+    letters = [chr(code) for code in range(ord("D"), ord("Z") + 1)]
+    return {
+        "Windows": [
+            f"{letters[i % len(letters)]}:\\storage{i}" for i in range(roots_count)
+        ],
+        "Linux": [f"/mnt/storage{i}" for i in range(roots_count)],
+        "Mac": [f"/Volumes/storage{i}" for i in range(roots_count)],
+    }
+
+
+def mixed_style_paths(
+    mapping: typing.Dict[str, typing.List[str]], count: int, seed: int = 0
+) -> typing.List[str]:
+    """
+    Generates paths of all platforms from mapping, with different styles
+    of separators and drive letters, like "p:/project1/textures\\grass.tga".
+
+    Args:
+    mapping (typing.Dict[str, typing.List[str]]): MixedPlatformRemap mapping.
+    count (int): number of paths.
+    seed (int): seed of random generator.
+
+    Returns:
+        typing.List[str]: generated paths.
+
+    """
+    generator = random.Random(seed)
+    roots = [path for paths in mapping.values() for path in paths if path]
+    paths = deep_tree_paths(roots, count, depth=5, seed=seed)
+    for i, path in enumerate(paths):
+        variant = generator.randrange(4)
+        if variant == 0 and ":" in path:
+            paths[i] = path[0].lower() + path[1:].replace("\\", "/", 2)
+        elif variant == 1:
+            paths[i] = path.replace("/", "//", 1).replace("\\", "\\\\\\", 1)
+        elif variant == 2:
+            paths[i] = "cache\\" + _file_name(generator)
+    return paths
+
+
+def default_workloads(size: int) -> typing.List[Workload]:
+    """
+    Args:
+    size (int): number of paths in each workload.
+
+    Returns:
+        typing.List[Workload]: workloads used by default by benchmark.
+
+    """
+    windows_mapping = {"L:\\": "X:\\", "P:\\project1\\textures": "Z:\\library\\textures"}
+    posix_mapping = {"/mnt/storage1/": "/Volumes/storage1/", "/mnt/storage2": "/mnt2"}
+    mixed_mapping = mixed_platforms_mapping(100)
+    return [
+        Workload(
+            "simple-deep-windows",
+            SimpleRemap(windows_mapping),
+            deep_tree_paths(list(windows_mapping), size),
+        ),
+        Workload(
+            "simple-deep-posix",
+            SimpleRemap(posix_mapping),
+            deep_tree_paths(list(posix_mapping), size),
+        ),
+        Workload(
+            "simple-parent-statements",
+            SimpleRemap(posix_mapping),
+            parent_statement_paths(list(posix_mapping) + ["L:\\"], size),
+        ),
+        Workload("simple-unmatched", SimpleRemap(posix_mapping), unmatched_paths(size)),
+        Workload(
+            "simple-overlapping-roots",
+            SimpleRemap(overlapping_mapping(300)),
+            deep_tree_paths(list(overlapping_mapping(300)), size, depth=4),
+        ),
+        Workload(
+            "mixed-styles",
+            MixedPlatformRemap(mixed_mapping),
+            mixed_style_paths(mixed_mapping, size),
+            ("Linux",),
+        ),
+        Workload(
+            "mixed-unmatched",
+            MixedPlatformRemap(mixed_mapping),
+            unmatched_paths(size),
+            ("Mac",),
+        ),
+    ]
+
+
+def _percentile(sorted_values: typing.List[float], percentile: int) -> float:
+    index = round(percentile / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def run_workload(workload: Workload, latency_samples: int = 10000) -> dict:
+    """
+    Args:
+    workload (Workload): workload to measure.
+    latency_samples (int): maximal number of paths used to measure per path latency.
+
+    Returns:
+        dict: measured "paths_per_second", latency percentiles in microseconds
+            (e.g. "latency_p50_us") and "peak_memory_bytes".
+
+    """
+    remap, input_paths, args = workload.remap, workload.input_paths, workload.args
+
+    start = time.perf_counter()
+    remap(input_paths, *args)
+    duration = time.perf_counter() - start
+
+    latencies = []
+    clock = time.perf_counter
+    remapped_paths = remap.iter_remap(input_paths[:latency_samples], *args)
+    while True:
+        start = clock()
+        if next(remapped_paths, None) is None:
+            break
+        latencies.append((clock() - start) * 1e6)
+    latencies.sort()
+
+    tracemalloc.start()
+    try:
+        remap(input_paths, *args)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {"paths_per_second": len(input_paths) / duration if duration else 0.0}
+    for percentile in PERCENTILES:
+        result[f"latency_p{percentile}_us"] = (
+            _percentile(latencies, percentile) if latencies else 0.0
+        )
+    result["peak_memory_bytes"] = peak_memory
+    return result
+
+
+def compare_with_baseline(results: dict, baseline: dict) -> typing.List[str]:
+    """
+    Args:
+    results (dict): results of run_workload for each workload name.
+    baseline (dict): results saved in previous run.
+
+    Returns:
+        typing.List[str]: lines describing relative change of throughput and memory.
+
+    """
+    lines = []
+    for name, result in results.items():
+        if name not in baseline:
+            lines.append(f"{name}: no baseline")
+            continue
+        base = baseline[name]
+        speedup = result["paths_per_second"] / max(base["paths_per_second"], 1)
+        memory = result["peak_memory_bytes"] / max(base["peak_memory_bytes"], 1)
+        lines.append(f"{name}: throughput x{speedup:.2f}, peak memory x{memory:.2f}")
+    return lines
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000, help="paths per workload")
+    parser.add_argument("--save", help="file to save results in (JSON)")
+    parser.add_argument("--baseline", help="results file to compare with (JSON)")
+    arguments = parser.parse_args(argv)
+
+    results = {}
+    for workload in default_workloads(arguments.size):
+        results[workload.name] = result = run_workload(workload)
+        print(
+            f"{workload.name:<26} {result['paths_per_second']:>12,.0f} paths/s  "
+            + "  ".join(
+                f"p{percentile} {result[f'latency_p{percentile}_us']:.1f}us"
+                for percentile in PERCENTILES
+            )
+            + f"  peak {result['peak_memory_bytes'] / 2 ** 20:.1f} MiB"
+        )
+
+    if arguments.save:
+        with open(arguments.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        print("\n".join(compare_with_baseline(results, baseline)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import typing
+
+from .cache import MISSING
+from .prefix_index import PrefixIndex
+from .utils import is_unusual_windows_path, split_bytes_path
+
+# Encoding of paths, which are remapped as str. It keeps undecodable bytes unchanged.
+ENCODING = "utf-8"
+ENCODING_ERRORS = "surrogateescape"
+# Result of directories lookup, when paths in directory should be remapped as str.
+FALLBACK = object()
+
+BytesPath = typing.Union[bytes, bytearray, memoryview]
+
+
+def _encode(path: str) -> typing.Optional[bytes]:
+    # Components which don't survive decoding never match decoded input paths.
+    try:
+        encoded_path = path.encode(ENCODING, ENCODING_ERRORS)
+    except UnicodeEncodeError:
+        return None
+    if encoded_path.decode(ENCODING, ENCODING_ERRORS) != path:
+        return None
+    return encoded_path
+
+
+class BytesRoots:
+    """POSIX mapping roots with components encoded to bytes, used to match
+    byte paths without decoding them.
+
+    For each root destination prefix of paths placed under it is prepared,
+    so paths in directory are remapped by joining the prefix with components
+    of directory below matched root and with basename.
+
+    Examples:
+        >>> roots = BytesRoots(index, lookup)
+        >>> roots.find_prefix(b"/mnt/storage1/temp/")
+        b"/mnt2/storage2/temp/"
+    """
+
+    def __init__(
+        self,
+        index: PrefixIndex,
+        lookup: typing.Callable[
+            [typing.Tuple[str, ...]], typing.Optional[typing.Tuple[int, str, bool]]
+        ],
+        fallback: bool = False,
+    ):
+        """
+        Args:
+            index (PrefixIndex): Index of mapping roots of remapper.
+            lookup (typing.Callable): Finds match of POSIX path with given components:
+                number of components of matched root, destination path
+                and whether destination is Windows style path.
+            fallback (bool): Whether all paths should be remapped as str,
+                e.g. when POSIX roots are also matched by patterns.
+        """
+        self.fallback = fallback
+        self._index = PrefixIndex()
+        for windows, parts in index.iter_roots():
+            encoded_parts = None if windows else tuple(map(_encode, parts))
+            if encoded_parts is None or None in encoded_parts:
+                continue
+            # Placeholder component, matching roots are parents of paths under the root.
+            self._index.add(False, encoded_parts, self._prefix(lookup(parts + ("",))))
+
+    @staticmethod
+    def _prefix(
+        match: typing.Optional[typing.Tuple[int, str, bool]]
+    ) -> typing.Union[None, object, typing.Tuple[int, bytes, bytes]]:
+        # Number of components of matched root, destination prefix and separator.
+        if match is None:
+            return None
+        depth, dst_path, dst_windows = match
+        if dst_windows and is_unusual_windows_path(dst_path):
+            return FALLBACK
+
+        separator = "\\" if dst_windows else "/"
+        if dst_path == ".":
+            dst_path = ""
+        elif dst_path[-1:] != separator:
+            dst_path += separator
+        encoded_path = _encode(dst_path)
+        if encoded_path is None:
+            return FALLBACK
+        return depth, encoded_path, separator.encode(ENCODING)
+
+    def find_prefix(self, directory: bytes) -> typing.Union[None, object, bytes]:
+        """
+        Args:
+            directory (bytes): Directory of remapped paths, with trailing separator.
+
+        Returns:
+            typing.Union[None, object, bytes]: Prefix of remapped paths,
+                to which their basenames are appended, None if paths are not changed
+                by remapping, FALLBACK if they should be remapped as str.
+
+        """
+        parts = split_bytes_path(directory)
+        if parts is None or self.fallback:
+            return FALLBACK
+
+        match = next(self._index.iter_matches(False, parts + (b"",)), None)
+        value = None if match is None else match[1]
+        if value is None or value is FALLBACK:
+            return value
+
+        depth, prefix, separator = value
+        sub_parts = parts[depth:]
+        if separator == b"\\" and any(b"\\" in part for part in sub_parts):
+            # Backslashes of POSIX paths would be separators on Windows.
+            return FALLBACK
+        return prefix + b"".join(part + separator for part in sub_parts)
+
+
+def iter_remap_bytes(
+    input_paths: typing.Iterable[BytesPath],
+    roots: BytesRoots,
+    remap_path: typing.Callable[[str], str],
+) -> typing.Iterator[bytes]:
+    """
+    Remaps byte paths, giving the same results as remapping decoded paths.
+    Mapping is looked up once for each directory and basenames are appended
+    to prepared prefix. Paths which would be changed by normalization
+    (e.g. Windows style paths, parent statements) are decoded and remapped as str.
+    Results are new bytes objects, so bytearray and memoryview paths are copied
+    to bytes first. Many paths of single buffer should be remapped with remap_buffer,
+    which copies the buffer once instead.
+
+    Args:
+    input_paths (typing.Iterable[BytesPath]): input paths to remap.
+    roots (BytesRoots): mapping roots of remapper.
+    remap_path (typing.Callable[[str], str]): remaps single decoded path.
+
+    Yields:
+        bytes: remapped input paths, in the same order as input paths.
+
+    """
+    prefixes = {}
+    for path in input_paths:
+        if type(path) is not bytes:
+            path = bytes(path)
+        index = path.rfind(b"/") + 1
+        directory = path[:index]
+        prefix = prefixes.get(directory, MISSING)
+        if prefix is MISSING:
+            prefix = prefixes[directory] = roots.find_prefix(directory)
+
+        basename = path[index:]
+        # Bytes find is much faster than "in" operator, which checks for int first.
+        if (
+            prefix is FALLBACK
+            or basename == b""
+            or basename == b"."
+            or basename.find(b":") >= 0
+            or basename.find(b"..") >= 0
+            or basename.find(b"\\") >= 0
+        ):
+            yield remap_path(path.decode(ENCODING, ENCODING_ERRORS)).encode(
+                ENCODING, ENCODING_ERRORS
+            )
+        elif prefix is None:
+            yield path
+        else:
+            yield prefix + basename
+
+
+def remap_buffer(
+    buffer: BytesPath,
+    roots: BytesRoots,
+    remap_path: typing.Callable[[str], str],
+    output: typing.Optional[bytearray] = None,
+) -> bytearray:
+    """
+    Remaps NUL delimited paths (e.g. output of "find -print0") and writes them
+    to output buffer, with the same delimiters. Buffer other than bytes
+    (e.g. memoryview of shared memory) is copied once and paths are split
+    from the copy.
+
+    Args:
+    buffer (BytesPath): NUL delimited input paths.
+    roots (BytesRoots): mapping roots of remapper.
+    remap_path (typing.Callable[[str], str]): remaps single decoded path.
+    output (typing.Optional[bytearray]): buffer to which remapped paths are appended.
+
+    Returns:
+        bytearray: output buffer.
+
+    """
+    if output is None:
+        output = bytearray()
+    if type(buffer) is not bytes:
+        buffer = bytes(buffer)
+
+    paths = buffer.split(b"\0")
+    # Trailing delimiter terminates the last path, it doesn't start an empty one.
+    terminated = not paths[-1]
+    if terminated:
+        paths.pop()
+    for path in iter_remap_bytes(paths, roots, remap_path):
+        output += path
+        output += b"\0"
+    if not terminated:
+        del output[-1]
+    return output
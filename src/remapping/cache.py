@@ -0,0 +1,69 @@
+import collections
+import typing
+
+# Returned by LRUCache.get for missing keys, when cached values might be None.
+MISSING = object()
+
+
+class CacheInfo(typing.NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class LRUCache:
+    """Bounded mapping which evicts least recently used items.
+
+    It's used by remappers to memoize results for repeated values,
+    so memory usage stays bounded even for unbounded streams of paths.
+
+    Examples:
+        >>> cache = LRUCache(1)
+        >>> cache.put("L:\\temp", "X:\\temp")
+        >>> cache.get("L:\\temp")
+        "X:\\temp"
+        >>> cache.put("L:\\temp2", "X:\\temp2")
+        >>> cache.info()
+        CacheInfo(hits=1, misses=0, evictions=1, size=1, max_size=1)
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Args:
+            max_size (int): Maximum number of stored items, should be positive.
+        """
+        if max_size <= 0:
+            raise ValueError(f"Cache size should be positive, given: {max_size}")
+
+        self.max_size = max_size
+        self._items = collections.OrderedDict()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        try:
+            value = self._items[key]
+        except KeyError:
+            self._misses += 1
+            return default
+
+        self._items.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key: typing.Hashable, value: typing.Any):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self):
+        self._items.clear()
+        self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            self._hits, self._misses, self._evictions, len(self._items), self.max_size
+        )
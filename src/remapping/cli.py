@@ -0,0 +1,428 @@
+"""Remaps paths listed in files, using mapping stored in JSON file.
+
+Usage:
+    remap --mapping mapping.json [--dst-platform PLATFORM] [-0] [-o OUTPUT] [FILE ...]
+    remap --mapping mapping.json --result-cache results.db [FILE ...]
+    remap --mapping mapping.json --manifest {jsonl,csv} --field FIELD [FILE ...]
+
+Mapping with list values (e.g. {"Windows": ["L:\\"], "Linux": ["/mnt/storage1"]})
+is used with MixedPlatformRemap and requires destination platform,
+mapping with string values (e.g. {"L:\\": "X:\\"}) is used with SimpleRemap.
+Paths are read from given files (or standard input) as newline or NUL delimited
+records and remapped paths are written in the same order, with the same delimiter
+(CRLF line endings are kept).
+With --rewrite, paths embedded in given text files (e.g. scenes) are remapped in place.
+With --manifest, given JSON Lines or CSV manifests are written to output
+with paths remapped in selected fields (e.g. "path", "layers.*.path" or CSV columns).
+With --result-cache, results are stored in SQLite database and reused by next runs
+with the same mapping, so only new paths are remapped.
+With --serve, mapping is hosted for RemapClient of other processes on the machine
+and reloaded when the mapping file changes.
+"""
+import argparse
+import contextlib
+import itertools
+import mmap
+import os
+import sqlite3
+import sys
+import time
+import typing
+
+from .batch import BatchStats
+from .daemon import RemapServer
+from .manifest import MANIFEST_FORMATS, ManifestRewrite
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .parallel import ParallelRemap
+from .result_store import PersistentRemap, ResultStore
+from .rewrite import TextRewrite
+from .simple_remap import SimpleRemap
+from .watcher import MappingWatcher, load_remap
+
+ENCODING = "utf-8"
+# Keeps bytes which are not valid UTF-8 unchanged in the output.
+ENCODING_ERRORS = "surrogateescape"
+READ_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+MMAP_MIN_SIZE = 1 << 20
+BATCH_SIZE = 1 << 16
+# Stored results are read at once for big batches, see result_store.SCAN_RATIO.
+RESULT_CACHE_BATCH_SIZE = 1 << 20
+
+
+def _iter_mmap_records(
+    file: typing.BinaryIO, delimiter: bytes
+) -> typing.Iterator[bytes]:
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start, size = 0, len(data)
+        while start < size:
+            end = data.find(delimiter, start)
+            if end == -1:
+                end = size
+            yield data[start:end]
+            start = end + 1
+
+
+def _iter_stream_records(
+    file: typing.BinaryIO, delimiter: bytes
+) -> typing.Iterator[bytes]:
+    rest = b""
+    for block in iter(lambda: file.read(READ_SIZE), b""):
+        records = (rest + block).split(delimiter)
+        rest = records.pop()
+        yield from records
+    if rest:
+        yield rest
+
+
+def iter_byte_records(
+    file: typing.BinaryIO, delimiter: bytes
+) -> typing.Iterator[bytes]:
+    """
+    Reads delimited records from binary file. Big regular files are memory mapped,
+    other files (e.g. pipes) are read in blocks, so whole file is never loaded into memory.
+    Trailing delimiter at the end of file doesn't create empty record.
+    Records of CRLF line endings keep trailing carriage return.
+
+    Args:
+    file (typing.BinaryIO): file opened in binary mode.
+    delimiter (bytes): records delimiter, e.g. b"\\n" or b"\\0".
+
+    Yields:
+        bytes: records, without decoding.
+
+    """
+    try:
+        use_mmap = os.fstat(file.fileno()).st_size >= MMAP_MIN_SIZE
+    except (OSError, ValueError, AttributeError):
+        use_mmap = False
+
+    if use_mmap:
+        return _iter_mmap_records(file, delimiter)
+    return _iter_stream_records(file, delimiter)
+
+
+def iter_records(file: typing.BinaryIO, delimiter: bytes) -> typing.Iterator[str]:
+    """
+    Decoded equivalent of iter_byte_records.
+
+    Args:
+    file (typing.BinaryIO): file opened in binary mode.
+    delimiter (bytes): records delimiter, e.g. b"\\n" or b"\\0".
+
+    Yields:
+        str: decoded records.
+
+    """
+    for record in iter_byte_records(file, delimiter):
+        yield record.decode(ENCODING, ENCODING_ERRORS)
+
+
+def _strip_carriage_returns(
+    records: typing.List[typing.AnyStr], carriage_return: typing.AnyStr
+) -> typing.List[int]:
+    # Removes carriage returns of CRLF line endings from records, in place, and returns
+    # indices of stripped records, so line endings can be restored in remapped paths.
+    stripped = [
+        index
+        for index, record in enumerate(records)
+        if record.endswith(carriage_return)
+    ]
+    for index in stripped:
+        records[index] = records[index][:-1]
+    return stripped
+
+
+def _open_output(path: str) -> typing.BinaryIO:
+    if path == "-":
+        return open(
+            sys.stdout.fileno(), "wb", buffering=WRITE_BUFFER_SIZE, closefd=False
+        )
+    return open(path, "wb", buffering=WRITE_BUFFER_SIZE)
+
+
+def _parse_arguments(argv: typing.Optional[typing.List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="remap",
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[6:]),
+    )
+    parser.add_argument("files", nargs="*", default=["-"], help="input files")
+    parser.add_argument("-m", "--mapping", required=True, help="JSON mapping file")
+    parser.add_argument(
+        "-p", "--dst-platform", help="destination platform for platforms mapping"
+    )
+    parser.add_argument("-o", "--output", default="-", help="output file")
+    parser.add_argument(
+        "-0", "--null", action="store_true", help="NUL delimited input and output"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of worker processes"
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=0, help="size of remapper caches"
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="remap unique paths of each batch once, grouped by directories",
+    )
+    parser.add_argument(
+        "--result-cache",
+        metavar="DATABASE",
+        help="reuse results stored in given database by previous runs",
+    )
+    parser.add_argument(
+        "--rewrite",
+        action="store_true",
+        help="remap paths embedded in given files, in place",
+    )
+    parser.add_argument(
+        "--manifest",
+        choices=MANIFEST_FORMATS,
+        help="remap paths in selected fields of JSON Lines or CSV manifests",
+    )
+    parser.add_argument(
+        "--field",
+        action="append",
+        default=[],
+        help="field of manifest holding paths, can be given several times",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="SOCKET",
+        help="host mapping for clients connecting to given Unix socket",
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="print summary to standard error"
+    )
+    return parser.parse_args(argv)
+
+
+def _rewrite_files(
+    remap: typing.Union[SimpleRemap, MixedPlatformRemap], arguments: argparse.Namespace
+) -> int:
+    if "-" in arguments.files or arguments.output != "-":
+        print("remap: --rewrite works only with files, in place", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    rewrite = TextRewrite(remap, arguments.dst_platform)
+    try:
+        remapped_count = sum(rewrite.rewrite_file(path) for path in arguments.files)
+    except OSError as error:
+        print(f"remap: {error}", file=sys.stderr)
+        return 2
+    if arguments.stats:
+        print(
+            f"files: {len(arguments.files)}, remapped paths: {remapped_count}, "
+            f"time: {time.perf_counter() - start:.3f}s",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def _rewrite_manifests(
+    remap: typing.Union[SimpleRemap, MixedPlatformRemap], arguments: argparse.Namespace
+) -> int:
+    if not arguments.field:
+        print("remap: --manifest requires at least one --field", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    rewrite = ManifestRewrite(
+        remap, arguments.field, arguments.dst_platform, arguments.manifest
+    )
+    remapped_count = 0
+    try:
+        with _open_output(arguments.output) as output:
+            for path in arguments.files:
+                file = sys.stdin.buffer if path == "-" else open(path, "rb")
+                try:
+                    remapped_count += rewrite.rewrite_stream(file, output)
+                except ValueError as error:
+                    print(f"remap: {path}: {error}", file=sys.stderr)
+                    return 2
+                finally:
+                    if file is not sys.stdin.buffer:
+                        file.close()
+    except OSError as error:
+        print(f"remap: {error}", file=sys.stderr)
+        return 2
+
+    if arguments.stats:
+        print(
+            f"files: {len(arguments.files)}, remapped paths: {remapped_count}, "
+            f"time: {time.perf_counter() - start:.3f}s",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def _serve(arguments: argparse.Namespace) -> int:
+    try:
+        watcher = MappingWatcher(arguments.mapping, cache_size=arguments.cache_size)
+        server = RemapServer(arguments.serve, {"": watcher})
+    except (OSError, ValueError) as error:
+        print(f"remap: {error}", file=sys.stderr)
+        return 2
+
+    with watcher, server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    arguments = _parse_arguments(argv)
+    if arguments.jobs < 1:
+        print("remap: number of jobs should be positive", file=sys.stderr)
+        return 2
+    if arguments.dedup and arguments.jobs > 1:
+        print("remap: --dedup works only in single process", file=sys.stderr)
+        return 2
+    if arguments.result_cache and arguments.jobs > 1:
+        print("remap: --result-cache works only in single process", file=sys.stderr)
+        return 2
+    if arguments.rewrite and arguments.jobs > 1:
+        print("remap: --rewrite works only in single process", file=sys.stderr)
+        return 2
+    if arguments.serve:
+        return _serve(arguments)
+
+    try:
+        remap = load_remap(arguments.mapping, arguments.cache_size)
+    except (OSError, ValueError) as error:
+        print(f"remap: {error}", file=sys.stderr)
+        return 2
+
+    args = ()
+    if isinstance(remap, MixedPlatformRemap):
+        if arguments.dst_platform not in remap.mapping:
+            print(
+                f"remap: destination platform should be one of: {list(remap.mapping)}",
+                file=sys.stderr,
+            )
+            return 2
+        args = (arguments.dst_platform,)
+    elif arguments.dst_platform:
+        print("remap: destination platform requires platforms mapping", file=sys.stderr)
+        return 2
+
+    if arguments.rewrite:
+        return _rewrite_files(remap, arguments)
+    if arguments.manifest:
+        return _rewrite_manifests(remap, arguments)
+
+    persistent_remap = None
+    if arguments.result_cache:
+        try:
+            persistent_remap = PersistentRemap(
+                remap, ResultStore(arguments.result_cache)
+            )
+        except sqlite3.Error as error:
+            print(f"remap: {arguments.result_cache}: {error}", file=sys.stderr)
+            return 2
+
+    delimiter = "\0" if arguments.null else "\n"
+    encoded_delimiter = delimiter.encode(ENCODING)
+    start = time.perf_counter()
+    paths_count = changed_count = 0
+    batch_stats = BatchStats()
+    # Each worker process gets a few chunks of every batch.
+    batch_size = BATCH_SIZE * arguments.jobs
+    if persistent_remap is not None:
+        batch_size = RESULT_CACHE_BATCH_SIZE
+
+    with contextlib.ExitStack() as stack:
+        if persistent_remap is not None:
+            stack.callback(persistent_remap.store.close)
+        try:
+            input_files = [
+                sys.stdin.buffer
+                if path == "-"
+                else stack.enter_context(open(path, "rb"))
+                for path in arguments.files
+            ]
+            output = stack.enter_context(_open_output(arguments.output))
+        except OSError as error:
+            print(f"remap: {error}", file=sys.stderr)
+            return 2
+
+        parallel_remap = stack.enter_context(
+            ParallelRemap(
+                remap,
+                workers=arguments.jobs,
+                chunk_size=BATCH_SIZE // 4,
+                min_parallel_size=BATCH_SIZE,
+            )
+        )
+        # Single process remaps records as bytes, without decoding them.
+        remap_bytes = (
+            arguments.jobs == 1 and not arguments.dedup and persistent_remap is None
+        )
+        read_records = iter_byte_records if remap_bytes else iter_records
+        paths = itertools.chain.from_iterable(
+            read_records(file, encoded_delimiter) for file in input_files
+        )
+        carriage_return = b"\r" if remap_bytes else "\r"
+        while True:
+            batch = list(itertools.islice(paths, batch_size))
+            if not batch:
+                break
+            crlf = []
+            if not arguments.null:
+                crlf = _strip_carriage_returns(batch, carriage_return)
+            if remap_bytes:
+                result = remap.remap_bytes(batch, *args)
+            elif persistent_remap is not None:
+                result = persistent_remap(batch, *args)
+            elif arguments.dedup:
+                result = remap.remap_batch(batch, *args, batch_stats)
+            else:
+                result = parallel_remap(batch, *args)
+            paths_count += len(batch)
+            if arguments.stats:
+                changed_count += sum(
+                    input_path != path for input_path, path in zip(batch, result)
+                )
+
+            if crlf:
+                result = list(result)
+                for index in crlf:
+                    result[index] += carriage_return
+            if remap_bytes:
+                output.write(encoded_delimiter.join(result) + encoded_delimiter)
+            else:
+                output.write(
+                    (delimiter.join(result) + delimiter).encode(
+                        ENCODING, ENCODING_ERRORS
+                    )
+                )
+
+    if arguments.stats:
+        duration = time.perf_counter() - start
+        print(
+            f"paths: {paths_count}, changed: {changed_count}, "
+            f"time: {duration:.3f}s, {paths_count / (duration or 1):,.0f} paths/s",
+            file=sys.stderr,
+        )
+        if arguments.dedup:
+            print(batch_stats.report(), file=sys.stderr)
+        if persistent_remap is not None:
+            print(
+                f"result cache: hits: {persistent_remap.hits}, "
+                f"misses: {persistent_remap.misses}",
+                file=sys.stderr,
+            )
+        for name, info in remap.cache_info().items():
+            print(f"{name} cache: {info}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
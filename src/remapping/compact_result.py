@@ -0,0 +1,190 @@
+import array
+import collections.abc
+import typing
+
+from .utils import is_unusual_windows_path
+
+# Encoded entries of paths, which are not described by destination path and suffix.
+UNCHANGED = -1
+REMAP_ON_ACCESS = -2
+# Translation of separators of input path suffix for (input windows, destination windows).
+_SEPARATORS_TRANSLATIONS = {
+    (False, False): None,
+    (False, True): str.maketrans("/", "\\"),
+    (True, False): str.maketrans("\\", "/"),
+    (True, True): str.maketrans("/", "\\"),
+}
+
+
+class CompactRemapResult(collections.abc.Sequence):
+    """Read-only sequence of remapped paths, which are built only when accessed.
+
+    Remapped path is usually destination path from mapping joined with suffix
+    of input path, so instead of remapped strings only id of destination path,
+    offset of suffix in input path and style of input path are stored
+    in compact arrays (9 bytes per path). Paths which would be changed
+    by normalization in unusual way are remapped again when accessed.
+    Input paths are referenced, not copied, so they should not be modified.
+
+    Examples:
+        >>> result = remap.remap_compact(["L:\\temp", "cache\\Tree.abc"])
+        >>> result[0]
+        "X:\\temp"
+        >>> list(result)
+        ["X:\\temp", "cache\\Tree.abc"]
+    """
+
+    def __init__(
+        self,
+        input_paths: typing.Sequence[str],
+        remap_path: typing.Callable[[str], str],
+    ):
+        """
+        Args:
+            input_paths (typing.Sequence[str]): Remapped input paths.
+            remap_path (typing.Callable[[str], str]): Function remapping single path,
+                used for paths which are not encoded.
+        """
+        self._input_paths = input_paths
+        self._remap_path = remap_path
+        self._entries = array.array("i")
+        self._offsets = array.array("I")
+        self._windows = bytearray()
+        # Prefix of remapped paths (destination path with separator)
+        # and translations of separators of suffixes for each destination path.
+        self._dst_paths: typing.List[
+            typing.Tuple[str, typing.Tuple[typing.Optional[dict], ...]]
+        ] = []
+        self._dst_ids: typing.Dict[typing.Tuple[str, bool], int] = {}
+
+    def append_unchanged(self):
+        """Adds path, which is the same after remapping."""
+        self._entries.append(UNCHANGED)
+        self._offsets.append(0)
+        self._windows.append(False)
+
+    def append_remapped_on_access(self):
+        """Adds path, which should be remapped again when accessed."""
+        self._entries.append(REMAP_ON_ACCESS)
+        self._offsets.append(0)
+        self._windows.append(False)
+
+    def append_match(
+        self,
+        input_path: str,
+        windows: bool,
+        sub_parts: typing.Sequence[str],
+        dst_path: str,
+        dst_windows: bool,
+    ):
+        """
+        Adds path, which is remapped to destination path joined with sub parts,
+        see join_path.
+
+        Args:
+            input_path (str): Input path.
+            windows (bool): whether input path is Windows style path.
+            sub_parts (typing.Sequence[str]): components of input path
+                placed under matched mapping entry.
+            dst_path (str): resolved destination path of mapping entry.
+            dst_windows (bool): whether destination path is Windows style path.
+        """
+        sub_path = ("\\" if windows else "/").join(sub_parts)
+        offset = len(input_path) - len(sub_path)
+        suffix = input_path[offset:]
+        if (
+            not sub_parts
+            or offset <= 0
+            or (suffix.replace("/", "\\") if windows else suffix) != sub_path
+            or (
+                dst_windows
+                and (":" in sub_path or (not windows and "\\" in sub_path))
+            )
+        ):
+            # Suffix of input path is not the same as normalized one,
+            # or it would be joined by PureWindowsPath.
+            self.append_remapped_on_access()
+            return
+
+        dst_id = self._dst_ids.get((dst_path, dst_windows))
+        if dst_id is None:
+            dst_id = self._add_dst_path(dst_path, dst_windows)
+        if dst_id < 0:
+            self.append_remapped_on_access()
+            return
+
+        self._entries.append(dst_id)
+        self._offsets.append(offset)
+        self._windows.append(windows)
+
+    def _add_dst_path(self, dst_path: str, dst_windows: bool) -> int:
+        if dst_windows and is_unusual_windows_path(dst_path):
+            dst_id = REMAP_ON_ACCESS
+        else:
+            separator = "\\" if dst_windows else "/"
+            if dst_path == ".":
+                prefix = ""
+            elif dst_path[-1:] == separator:
+                prefix = dst_path
+            else:
+                prefix = dst_path + separator
+            dst_id = len(self._dst_paths)
+            translations = tuple(
+                _SEPARATORS_TRANSLATIONS[(windows, dst_windows)]
+                for windows in (False, True)
+            )
+            self._dst_paths.append((prefix, translations))
+        self._dst_ids[(dst_path, dst_windows)] = dst_id
+        return dst_id
+
+    def _build(self, input_path: str, entry: int, offset: int, windows: int) -> str:
+        if entry == UNCHANGED:
+            return input_path
+        if entry == REMAP_ON_ACCESS:
+            return self._remap_path(input_path)
+
+        prefix, translations = self._dst_paths[entry]
+        translation = translations[windows]
+        suffix = input_path[offset:]
+        if translation is not None:
+            suffix = suffix.translate(translation)
+        return prefix + suffix
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(
+        self, index: typing.Union[int, slice]
+    ) -> typing.Union[str, typing.List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactRemapResult index out of range")
+        return self._build(
+            self._input_paths[index],
+            self._entries[index],
+            self._offsets[index],
+            self._windows[index],
+        )
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return map(
+            self._build, self._input_paths, self._entries, self._offsets, self._windows
+        )
+
+    def __repr__(self) -> str:
+        return f"<CompactRemapResult of {len(self)} paths>"
+
+    def nbytes(self) -> int:
+        """
+        Returns:
+            int: Number of bytes used by encoded paths, without input paths.
+
+        """
+        return (
+            self._entries.itemsize * len(self._entries)
+            + self._offsets.itemsize * len(self._offsets)
+            + len(self._windows)
+        )
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import typing
+import uuid
+
+from .instrumentation import Instrumentation
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .prefix_index import PrefixIndex
+from .simple_remap import SimpleRemap
+
+# Should be increased whenever internal structure of remappers changes,
+# so artifacts compiled by older versions are rebuilt.
+FORMAT_VERSION = 3
+MAGIC = b"REMAPPING"
+DIGEST_SIZE = hashlib.sha256().digest_size
+HEADER_SIZE = len(MAGIC) + 2 + DIGEST_SIZE
+
+Remap = typing.Union[SimpleRemap, MixedPlatformRemap]
+
+
+def mapping_digest(remap_class: typing.Type[Remap], mapping: dict) -> bytes:
+    """
+    Args:
+    remap_class (typing.Type[Remap]): class of remapper, SimpleRemap or MixedPlatformRemap.
+    mapping (dict): mapping of remapper.
+
+    Returns:
+        bytes: SHA-256 digest identifying compiled remapper. Order of mapping
+            items is taken into account, since it decides about precedence.
+
+    """
+    source = json.dumps([remap_class.__name__, list(mapping.items())])
+    return hashlib.sha256(source.encode("utf-8")).digest()
+
+
+def _header(remap_class: typing.Type[Remap], mapping: dict) -> bytes:
+    return (
+        MAGIC
+        + FORMAT_VERSION.to_bytes(2, "little")
+        + mapping_digest(remap_class, mapping)
+    )
+
+
+def _dump_state(remap: Remap) -> dict:
+    # Only plain data (lists, strings, numbers) is stored, so loading artifact
+    # never runs code, unlike unpickling.
+    state = {
+        "index": [
+            [windows, parts, values]
+            for windows, parts, values in remap._index.iter_entries()
+        ]
+    }
+    if isinstance(remap, MixedPlatformRemap):
+        state["dst_paths"] = remap._dst_paths
+    return state
+
+
+def _load_state(remap_class: typing.Type[Remap], state: dict) -> dict:
+    # Keyword arguments of remapper with prebuilt lookup structures.
+    # Patterns of SimpleRemap are compiled regexes, so they are built from mapping.
+    index = PrefixIndex()
+    for windows, parts, values in state["index"]:
+        for value in values:
+            index.add(bool(windows), tuple(parts), tuple(value))
+    if not issubclass(remap_class, MixedPlatformRemap):
+        return {"index": index}
+    dst_paths = {
+        platform: [None if path is None else tuple(path) for path in paths]
+        for platform, paths in state["dst_paths"].items()
+    }
+    return {"index": index, "dst_paths": dst_paths}
+
+
+def save_compiled(remap: Remap, artifact_path: str):
+    """
+    Saves remapper with its prepared mapping (normalized roots and lookup index),
+    so it can be loaded without processing the mapping again.
+    File is replaced atomically, so concurrent jobs never read partially written artifact.
+    It's created with default permissions (according to umask),
+    so it can be shared by jobs of different users.
+
+    Args:
+    remap (Remap): remapper to save. Its caches and instrumentation are not saved.
+    artifact_path (str): path of artifact file.
+
+    """
+    data = json.dumps(_dump_state(remap), separators=(",", ":")).encode("utf-8")
+    temporary_path = f"{artifact_path}.{uuid.uuid4().hex}.tmp"
+    # Unlike tempfile.mkstemp (mode 0600), os.open applies umask to given mode.
+    file_descriptor = os.open(
+        temporary_path,
+        os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+        0o666,
+    )
+    try:
+        with open(file_descriptor, "wb") as file:
+            file.write(_header(type(remap), remap.mapping))
+            file.write(data)
+        os.replace(temporary_path, artifact_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def load_compiled(
+    artifact_path: str,
+    remap_class: typing.Type[Remap],
+    mapping: dict,
+    cache_size: int = 0,
+    instrumentation: typing.Optional[Instrumentation] = None,
+) -> typing.Optional[Remap]:
+    """
+    Loads artifact saved by save_compiled. Lookup index is rebuilt from stored
+    components of normalized roots, which takes about half of the time
+    of building remapper from mapping (roots are not normalized nor resolved again).
+    Artifact holds only data, but anyone who can write it can change results
+    of remapping (header only detects stale artifacts, it's not a signature),
+    so artifacts should be kept in directory writable only by trusted users.
+
+    Args:
+    artifact_path (str): path of artifact file.
+    remap_class (typing.Type[Remap]): class of remapper, SimpleRemap or MixedPlatformRemap.
+    mapping (dict): mapping of remapper, used to check whether artifact is up to date.
+    cache_size (int): cache size of loaded remapper.
+    instrumentation (typing.Optional[Instrumentation]): instrumentation of loaded remapper.
+
+    Returns:
+        typing.Optional[Remap]: loaded remapper, None if artifact doesn't exist,
+            is compiled from different mapping, by different version or is damaged.
+
+    """
+    try:
+        with open(artifact_path, "rb") as file:
+            if file.read(HEADER_SIZE) != _header(remap_class, mapping):
+                return None
+            payload = file.read()
+    except OSError:
+        return None
+
+    try:
+        state = _load_state(remap_class, json.loads(payload))
+    except Exception:
+        # Damaged artifact can raise almost anything while it's decoded.
+        return None
+    return remap_class(mapping, cache_size, instrumentation, **state)
+
+
+def load_or_compile(
+    remap_class: typing.Type[Remap],
+    mapping: dict,
+    artifact_path: str,
+    cache_size: int = 0,
+    instrumentation: typing.Optional[Instrumentation] = None,
+) -> Remap:
+    """
+    Loads remapper from artifact, or creates it and saves artifact
+    if it's missing, stale or incompatible.
+
+    Examples:
+        >>> remap = load_or_compile(MixedPlatformRemap, mapping, "/tmp/studio.remap")
+        >>> remap(["L:\\temp"], "Linux")
+        ["/mnt/storage1/temp"]
+
+    Args:
+    remap_class (typing.Type[Remap]): class of remapper, SimpleRemap or MixedPlatformRemap.
+    mapping (dict): mapping of remapper.
+    artifact_path (str): path of artifact file.
+    cache_size (int): cache size of remapper.
+    instrumentation (typing.Optional[Instrumentation]): instrumentation of remapper.
+
+    Returns:
+        Remap: remapper for given mapping.
+
+    """
+    remap = load_compiled(
+        artifact_path, remap_class, mapping, cache_size, instrumentation
+    )
+    if remap is None:
+        remap = remap_class(mapping, cache_size, instrumentation)
+        try:
+            save_compiled(remap, artifact_path)
+        except OSError:
+            # Read-only location only costs building remapper again next time.
+            pass
+    return remap
@@ -0,0 +1,423 @@
+import collections
+import itertools
+import os
+import selectors
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import typing
+
+# Protocol: each message is a frame with big-endian 32 bit size and payload.
+# Request payload: request id, number of paths, then NUL separated UTF-8 fields:
+# mapping name, destination platform (empty for SimpleRemap) and input paths.
+# Response payload: request id, status, then NUL separated remapped paths
+# or error message.
+FRAME_HEADER = struct.Struct(">I")
+REQUEST_HEADER = struct.Struct(">II")
+RESPONSE_HEADER = struct.Struct(">IB")
+MAX_FRAME_SIZE = 1 << 30
+STATUS_OK = 0
+STATUS_ERROR = 1
+ENCODING = "utf-8"
+# Keeps bytes which are not valid UTF-8 unchanged, just like the command line tool.
+ENCODING_ERRORS = "surrogateescape"
+RECEIVE_SIZE = 1 << 20
+
+Remap = typing.Callable[..., typing.List[str]]
+
+
+def _encode_frame(header: bytes, body: bytes) -> bytes:
+    return b"".join((FRAME_HEADER.pack(len(header) + len(body)), header, body))
+
+
+def _split_frames(buffer: bytearray) -> typing.List[bytes]:
+    # Removes complete frames from the beginning of buffer and returns their payloads.
+    payloads = []
+    start = 0
+    while len(buffer) - start >= FRAME_HEADER.size:
+        (size,) = FRAME_HEADER.unpack_from(buffer, start)
+        end = start + FRAME_HEADER.size + size
+        if len(buffer) < end:
+            break
+        payloads.append(bytes(buffer[start + FRAME_HEADER.size : end]))
+        start = end
+    del buffer[:start]
+    return payloads
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.server.remap_server._add_connection(self.request)
+
+    def handle(self):
+        while True:
+            header = self.rfile.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            (size,) = FRAME_HEADER.unpack(header)
+            if size > MAX_FRAME_SIZE:
+                return
+            payload = self.rfile.read(size)
+            if len(payload) < size:
+                return
+            self.wfile.write(self.server.remap_server._handle_request(payload))
+
+    def finish(self):
+        self.server.remap_server._remove_connection(self.request)
+        super().finish()
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        block_on_close = False
+
+        def __init__(self, socket_path: str, remap_server: "RemapServer"):
+            self.remap_server = remap_server
+            super().__init__(socket_path, _RequestHandler)
+
+
+def _remove_stale_socket(socket_path: str):
+    # Socket file is left behind when server is killed, it can't be bound again.
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        # Never remove other files, e.g. mapping given by mistake instead of socket.
+        raise FileExistsError(f"Path '{socket_path}' exists and it's not a socket.")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+class RemapServer:
+    """Local server sharing warmed remappers with many processes over Unix socket.
+
+    Each process on the machine (e.g. every DCC application) can remap paths
+    with RemapClient, instead of building its own remapper and cold caches.
+    Connections are served in separate threads, but each remapper is called
+    by one thread at a time, since remappers and their caches are not thread safe.
+    Requests sent over one connection are answered in the same order,
+    so clients can send many requests before reading responses.
+    Unix sockets are available only on POSIX platforms.
+
+    Examples:
+        >>> remap = MixedPlatformRemap(mapping, cache_size=100000)
+        >>> with RemapServer("/tmp/remapping.sock", {"studio": remap}) as server:
+        ...     server.serve_forever()
+
+    Attributes:
+        socket_path (str): Path of Unix socket.
+        remaps (typing.Dict[str, Remap]): Hosted remappers by name used by clients.
+    """
+
+    def __init__(self, socket_path: str, remaps: typing.Dict[str, Remap]):
+        """
+        Args:
+            socket_path (str): Path of Unix socket. Socket left by killed server
+                is replaced, socket of running server and other files
+                raise OSError.
+            remaps (typing.Dict[str, Remap]): Remappers by name, e.g. SimpleRemap,
+                MixedPlatformRemap or MappingWatcher, so mapping is reloaded
+                when its file changes.
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not supported on this platform.")
+
+        self.socket_path = socket_path
+        self.remaps = remaps
+        self._locks = {name: threading.Lock() for name in remaps}
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        self._thread = None
+        _remove_stale_socket(socket_path)
+        self._server = _UnixServer(socket_path, self)
+
+    def serve_forever(self):
+        """Serves requests in current thread, until it's interrupted."""
+        self._server.serve_forever()
+
+    def start(self):
+        """Serves requests in background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="remapping-server", daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        """Stops serving, closes open connections and removes socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        with self._connections_lock:
+            for connection in self._connections:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._server.server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "RemapServer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _add_connection(self, connection: socket.socket):
+        with self._connections_lock:
+            self._connections.add(connection)
+
+    def _remove_connection(self, connection: socket.socket):
+        with self._connections_lock:
+            self._connections.discard(connection)
+
+    def _handle_request(self, payload: bytes) -> bytes:
+        request_id = 0
+        try:
+            request_id, count = REQUEST_HEADER.unpack_from(payload)
+            name, dst_platform, *input_paths = (
+                payload[REQUEST_HEADER.size :]
+                .decode(ENCODING, ENCODING_ERRORS)
+                .split("\0")
+            )
+            if len(input_paths) != count:
+                raise ValueError("Input paths should not contain NUL characters.")
+            if name not in self.remaps:
+                raise ValueError(
+                    f"Mapping '{name}' is not hosted, available: {list(self.remaps)}"
+                )
+
+            args = (dst_platform,) if dst_platform else ()
+            with self._locks[name]:
+                result = self.remaps[name](input_paths, *args)
+            status = STATUS_OK
+            body = "\0".join(result).encode(ENCODING, ENCODING_ERRORS)
+        except Exception as error:
+            # Any error is reported to the client, server keeps serving.
+            status = STATUS_ERROR
+            body = str(error).encode(ENCODING, "replace")
+        return _encode_frame(RESPONSE_HEADER.pack(request_id, status), body)
+
+
+class RemapClient:
+    """Client of RemapServer, which can be used just like hosted remapper.
+
+    Connections are kept in pool, so threads of one process can remap concurrently
+    and connections are reused between calls. Many batches can be pipelined
+    over one connection, i.e. all of them are sent before responses are read.
+    Connection broken by restarted server is replaced once, remapping is repeated.
+
+    Examples:
+        >>> with RemapClient("/tmp/remapping.sock", "studio") as remap:
+        ...     remap(["L:\\temp"], "Linux")
+        ...     remap.pipeline([["L:\\temp"], ["P:\\assets"]], "Mac")
+        ["/mnt/storage1/temp"]
+        [["/Volumes/storage1/temp"], ["/Volumes/storage2/assets"]]
+
+    Attributes:
+        socket_path (str): Path of server Unix socket.
+        name (str): Name of remapper hosted by server.
+        timeout (typing.Optional[float]): Number of seconds to wait for server.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        name: str = "",
+        pool_size: int = 4,
+        timeout: typing.Optional[float] = None,
+    ):
+        """
+        Args:
+            socket_path (str): Path of server Unix socket.
+            name (str): Name of remapper hosted by server.
+            pool_size (int): Maximum number of open connections.
+            timeout (typing.Optional[float]): Number of seconds to wait for server,
+                None waits without limit.
+        """
+        if pool_size <= 0:
+            raise ValueError(f"Pool size should be positive, given: {pool_size}")
+
+        self.socket_path = socket_path
+        self.name = name
+        self.timeout = timeout
+        self._idle_connections = []
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._request_ids = itertools.count()
+
+    def __call__(self, input_paths: typing.List[str], *args) -> typing.List[str]:
+        """
+        Args:
+            input_paths (typing.List[str]): Input paths to remap.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            typing.List[str]: List of remapped input paths
+
+        """
+        return self.pipeline([input_paths], *args)[0]
+
+    def pipeline(
+        self, batches: typing.Sequence[typing.List[str]], *args
+    ) -> typing.List[typing.List[str]]:
+        """
+        Remaps batches of paths with single round trip to server.
+
+        Args:
+            batches (typing.Sequence[typing.List[str]]): Batches of input paths.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            typing.List[typing.List[str]]: List of remapped paths for each batch.
+
+        """
+        if len(args) > 1:
+            raise ValueError(f"Only destination platform can be given, given: {args}")
+
+        dst_platform = args[0] if args else ""
+        request_ids = []
+        frames = []
+        for batch in batches:
+            request_id = next(self._request_ids) & 0xFFFFFFFF
+            body = "\0".join(itertools.chain((self.name, dst_platform), batch))
+            frames.append(
+                _encode_frame(
+                    REQUEST_HEADER.pack(request_id, len(batch)),
+                    body.encode(ENCODING, ENCODING_ERRORS),
+                )
+            )
+            request_ids.append(request_id)
+        if not frames:
+            return []
+
+        payloads = self._send(frames)
+        results = []
+        error = None
+        for batch, request_id, payload in zip(batches, request_ids, payloads):
+            response_id, status = RESPONSE_HEADER.unpack_from(payload)
+            body = payload[RESPONSE_HEADER.size :].decode(ENCODING, ENCODING_ERRORS)
+            if status != STATUS_OK:
+                # Other responses are read anyway, so connection can be reused.
+                error = error or ValueError(body)
+            elif response_id != request_id:
+                raise ConnectionError("Remapping server responded out of order.")
+            else:
+                results.append(body.split("\0") if batch else [])
+        if error is not None:
+            raise error
+        return results
+
+    def close(self):
+        """Closes idle connections."""
+        while self._idle_connections:
+            self._idle_connections.pop().close()
+
+    def __enter__(self) -> "RemapClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connect(self) -> socket.socket:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.settimeout(self.timeout)
+            connection.connect(self.socket_path)
+        except BaseException:
+            connection.close()
+            raise
+        connection.setblocking(False)
+        return connection
+
+    def _send(self, frames: typing.List[bytes]) -> typing.List[bytes]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("No connection to remapping server is available.")
+        try:
+            try:
+                connection = self._idle_connections.pop()
+                reused = True
+            except IndexError:
+                connection = self._connect()
+                reused = False
+
+            try:
+                payloads = self._exchange(connection, frames)
+            except ConnectionError:
+                connection.close()
+                if not reused:
+                    raise
+                # Server was restarted since connection was used,
+                # remapping has no side effects, so it can be repeated.
+                connection = self._connect()
+                try:
+                    payloads = self._exchange(connection, frames)
+                except BaseException:
+                    connection.close()
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+
+            self._idle_connections.append(connection)
+            return payloads
+        finally:
+            self._slots.release()
+
+    def _exchange(
+        self, connection: socket.socket, frames: typing.List[bytes]
+    ) -> typing.List[bytes]:
+        # Requests are sent while responses are read, otherwise both sides
+        # could wait for each other when big batches fill socket buffers.
+        outgoing = collections.deque(memoryview(frame) for frame in frames)
+        buffer = bytearray()
+        payloads = []
+        with selectors.DefaultSelector() as selector:
+            selector.register(
+                connection, selectors.EVENT_READ | selectors.EVENT_WRITE
+            )
+            while len(payloads) < len(frames):
+                events = selector.select(self.timeout)
+                if not events:
+                    raise TimeoutError("Remapping server didn't respond in time.")
+                for _, mask in events:
+                    if mask & selectors.EVENT_WRITE:
+                        try:
+                            sent = connection.send(outgoing[0])
+                        except BlockingIOError:
+                            sent = 0
+                        if sent == len(outgoing[0]):
+                            outgoing.popleft()
+                            if not outgoing:
+                                selector.modify(connection, selectors.EVENT_READ)
+                        else:
+                            outgoing[0] = outgoing[0][sent:]
+                    if mask & selectors.EVENT_READ:
+                        try:
+                            data = connection.recv(RECEIVE_SIZE)
+                        except BlockingIOError:
+                            continue
+                        if not data:
+                            raise ConnectionError(
+                                "Remapping server closed the connection."
+                            )
+                        buffer += data
+                        payloads.extend(_split_frames(buffer))
+        return payloads
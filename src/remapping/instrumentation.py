@@ -0,0 +1,94 @@
+import collections
+import typing
+
+PHASES = ("normalization", "matching", "building")
+
+
+class Instrumentation:
+    """Collects statistics of paths remapped by remapper it's attached to.
+
+    It counts hits of each mapping entry (identified by sub path for SimpleRemap
+    and by (source platform, index) for MixedPlatformRemap), absolute paths
+    not matching any entry and relative paths, which are always passed through.
+    Time spent in each remapping phase (normalization, matching and building
+    destination path) is accumulated in seconds.
+    When remapper uses cache, only paths which are not cached are counted.
+
+    Examples:
+        >>> instrumentation = Instrumentation()
+        >>> remap = SimpleRemap({"L:\\": "X:\\"}, instrumentation=instrumentation)
+        >>> remap(["L:\\temp", "g:\\nope", "cache\\Tree.abc"])
+        >>> instrumentation.snapshot()
+        {"entry_hits": {"L:\\": 1}, "unmatched": 1, "passed_through": 1, "timings": {...}}
+
+    Attributes:
+        callback (typing.Optional[typing.Callable]): Function called for each remapped path
+            with input path, result and matched mapping entry (None if not matched).
+        entry_hits (collections.Counter): Number of matches of each mapping entry.
+        unmatched (int): Number of absolute paths not matching any mapping entry.
+        passed_through (int): Number of relative paths.
+        timings (typing.Dict[str, float]): Total time of each remapping phase in seconds.
+    """
+
+    def __init__(
+        self,
+        callback: typing.Optional[
+            typing.Callable[[str, str, typing.Optional[typing.Hashable]], None]
+        ] = None,
+    ):
+        """
+        Args:
+            callback (typing.Optional[typing.Callable]): Function called for each
+                remapped path with input path, result and matched mapping entry.
+        """
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        self.entry_hits = collections.Counter()
+        self.unmatched = 0
+        self.passed_through = 0
+        self.timings = dict.fromkeys(PHASES, 0.0)
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: Copy of current statistics, with "entry_hits", "unmatched",
+                "passed_through" and "timings" keys.
+
+        """
+        return {
+            "entry_hits": dict(self.entry_hits),
+            "unmatched": self.unmatched,
+            "passed_through": self.passed_through,
+            "timings": dict(self.timings),
+        }
+
+    def record(
+        self,
+        input_path: str,
+        result: str,
+        entry: typing.Optional[typing.Hashable],
+        relative: bool,
+        timings: typing.Tuple[float, float, float],
+    ):
+        """
+        Args:
+            input_path (str): Remapped path.
+            result (str): Result of remapping.
+            entry (typing.Optional[typing.Hashable]): Matched mapping entry.
+            relative (bool): Whether input path is relative path.
+            timings (typing.Tuple[float, float, float]): Time of each remapping phase.
+        """
+        if entry is not None:
+            self.entry_hits[entry] += 1
+        elif relative:
+            self.passed_through += 1
+        else:
+            self.unmatched += 1
+
+        for phase, duration in zip(PHASES, timings):
+            self.timings[phase] += duration
+
+        if self.callback is not None:
+            self.callback(input_path, result, entry)
@@ -0,0 +1,430 @@
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import typing
+
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .rewrite import _iter_roots
+from .simple_remap import SimpleRemap
+from .utils import normalize_path, split_path
+
+ENCODING = "utf-8"
+ENCODING_ERRORS = "surrogateescape"
+# Input size after which parsed records are remapped and written.
+CHUNK_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+MANIFEST_FORMATS = ("jsonl", "csv")
+# Selector component matching all items of JSON array or values of JSON object.
+WILDCARD = "*"
+# Characters escaped in JSON strings, which can't be searched for in raw records.
+JSON_ESCAPED_CHARACTERS = frozenset('"\\' + "".join(map(chr, range(0x20))))
+SURROGATE_PATTERN = re.compile("[\ud800-\udfff]")
+
+# Field of parsed record holding path, i.e. its container and key.
+Reference = typing.Tuple[typing.Union[dict, list], typing.Union[str, int]]
+
+
+def _search_tokens(
+    remap: typing.Union[SimpleRemap, MixedPlatformRemap],
+    dst_platform: typing.Optional[str],
+    escaped_characters: typing.AbstractSet[str],
+) -> typing.Optional[typing.List[typing.Tuple[str, bool]]]:
+    # Every path under mapping root contains each component of the root,
+    # since normalization only removes parts of path. The longest component
+    # which is stored literally in raw record is searched for, None is returned
+    # if some root has no such component, so all records should be parsed.
+    tokens = []
+    for root in _iter_roots(remap, dst_platform):
+        if root is None:
+            return None
+        windows, parts = split_path(root)
+        if not parts:
+            continue
+        components = list(parts[1:])
+        if windows and parts[0][1:3] == ":\\":
+            components.append(parts[0][:2])
+        components = [
+            component
+            for component in components
+            if not escaped_characters.intersection(component)
+            # Windows components are compared case-insensitively, which works
+            # for raw bytes only with ASCII.
+            and (not windows or component.isascii())
+        ]
+        if not components:
+            return None
+        tokens.append((max(components, key=len), windows))
+    return tokens
+
+
+def _select_json_item(
+    container: typing.Union[dict, list],
+    key: typing.Union[str, int],
+    item: typing.Any,
+    references: typing.List[Reference],
+):
+    if isinstance(item, str):
+        references.append((container, key))
+    elif isinstance(item, list):
+        for index, sub_item in enumerate(item):
+            _select_json_item(item, index, sub_item, references)
+
+
+def _select_json_values(
+    value: typing.Any,
+    selector: typing.Tuple[str, ...],
+    references: typing.List[Reference],
+):
+    # Plain keys are followed in a loop, only wildcards need recursion.
+    for depth, key in enumerate(selector, 1):
+        if key == WILDCARD:
+            if isinstance(value, list):
+                items = enumerate(value)
+            elif isinstance(value, dict):
+                items = value.items()
+            else:
+                return
+            for item_key, item in items:
+                if depth < len(selector):
+                    _select_json_values(item, selector[depth:], references)
+                else:
+                    _select_json_item(value, item_key, item, references)
+            return
+
+        if not isinstance(value, dict) or key not in value:
+            return
+        if depth == len(selector):
+            _select_json_item(value, key, value[key], references)
+        else:
+            value = value[key]
+
+
+class ManifestRewrite:
+    """Class for remapping paths stored in fields of JSON Lines or CSV manifests.
+
+    Manifest is streamed record by record. Raw records are searched for
+    components of mapping roots first and only records which might contain
+    remapped paths are parsed, other records are written as they are.
+    Paths from selected fields of parsed records are collected and remapped
+    in batches (see remap_batch of remappers), then records are written
+    in chunks, so memory usage doesn't depend on size of manifest.
+    Records without remapped paths keep their original bytes,
+    changed records are serialized again.
+
+    Selectors of JSON Lines fields are keys separated with dots, e.g. "outputs.beauty".
+    "*" matches all items of array or values of object, e.g. "layers.*.path",
+    and arrays of selected values are remapped item by item.
+    Selectors of CSV fields are column names from the header.
+
+    Examples:
+        >>> rewrite = ManifestRewrite(SimpleRemap({"L:\\": "X:\\"}), ["path", "textures"])
+        >>> rewrite(b'{"path": "L:\\\\a.abc", "textures": ["l:/b.tga"], "frame": 1}\\n')
+        b'{"path": "X:\\\\a.abc", "textures": ["X:\\\\b.tga"], "frame": 1}\\n'
+        >>> rewrite.rewrite_file("manifest.jsonl")
+        12
+
+    Attributes:
+        remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper used for remapping.
+        fields (typing.List[str]): Selectors of fields holding paths.
+        dst_platform (typing.Optional[str]): Destination platform for MixedPlatformRemap.
+        manifest_format (str): "jsonl" or "csv".
+    """
+
+    def __init__(
+        self,
+        remap: typing.Union[SimpleRemap, MixedPlatformRemap],
+        fields: typing.Sequence[str],
+        dst_platform: typing.Optional[str] = None,
+        manifest_format: str = "jsonl",
+        dialect: typing.Union[str, csv.Dialect] = "excel",
+    ):
+        """
+        Args:
+            remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper to use.
+            fields (typing.Sequence[str]): Selectors of fields holding paths.
+            dst_platform (typing.Optional[str]): Destination platform,
+                required by MixedPlatformRemap.
+            manifest_format (str): "jsonl" for JSON Lines or "csv" for CSV with header.
+            dialect (typing.Union[str, csv.Dialect]): CSV dialect or its name.
+        """
+        if manifest_format not in MANIFEST_FORMATS:
+            raise ValueError(
+                f"Manifest format should be one of {MANIFEST_FORMATS},"
+                f" given: {manifest_format}"
+            )
+        if not fields:
+            raise ValueError("At least one field should be selected.")
+
+        self.remap = remap
+        self.fields = list(fields)
+        self.dst_platform = dst_platform
+        self.manifest_format = manifest_format
+        self._args = () if dst_platform is None else (dst_platform,)
+        self._selectors = [tuple(field.split(".")) for field in self.fields]
+        self._dialect = (
+            csv.get_dialect(dialect) if isinstance(dialect, str) else dialect
+        )
+
+        if manifest_format == "jsonl":
+            escaped_characters = JSON_ESCAPED_CHARACTERS
+            escape_character = None
+            # Any character might be written as unicode escape sequence.
+            tokens = [b"\\u"]
+        else:
+            escaped_characters = frozenset(self._dialect.quotechar or "")
+            # Escape character might precede any character of CSV field.
+            escape_character = self._dialect.escapechar
+            tokens = []
+
+        root_tokens = _search_tokens(remap, dst_platform, escaped_characters)
+        if root_tokens is None or escape_character:
+            # All records are parsed.
+            self._tokens = self._folded_tokens = None
+        else:
+            # Plain substring search is much faster than regex alternation.
+            tokens.extend(
+                token.encode(ENCODING, ENCODING_ERRORS)
+                for token, windows in root_tokens
+                if not windows
+            )
+            self._tokens = tuple(dict.fromkeys(tokens))
+            self._folded_tokens = tuple(
+                dict.fromkeys(
+                    token.lower().encode(ENCODING)
+                    for token, windows in root_tokens
+                    if windows
+                )
+            )
+        self._json_encoder = json.JSONEncoder(ensure_ascii=False)
+
+    def __call__(self, data: bytes) -> bytes:
+        """
+        Args:
+            data (bytes): Manifest content.
+
+        Returns:
+            bytes: Manifest with remapped paths.
+
+        """
+        output = io.BytesIO()
+        self.rewrite_stream(io.BytesIO(data), output)
+        return output.getvalue()
+
+    def rewrite_stream(self, file: typing.BinaryIO, output: typing.BinaryIO) -> int:
+        """
+        Args:
+            file (typing.BinaryIO): Manifest opened in binary mode.
+            output (typing.BinaryIO): Binary file to which rewritten manifest is written.
+
+        Returns:
+            int: Number of remapped paths.
+
+        """
+        if self.manifest_format == "jsonl":
+            records = iter(file)
+            parse_record = self._parse_json_record
+        else:
+            records = self._iter_csv_records(file)
+            header = next(records, None)
+            if header is None:
+                return 0
+            output.write(header)
+            parse_record = self._get_csv_parser(header)
+
+        remapped_count = 0
+        fragments = []
+        pending_records = []
+        paths = []
+        size = 0
+        for record_number, raw_record in enumerate(records, 1):
+            parsed_record = (
+                parse_record(raw_record, record_number)
+                if self._might_contain_paths(raw_record)
+                else None
+            )
+            if parsed_record is None:
+                fragments.append(raw_record)
+            else:
+                record, references = parsed_record
+                pending_records.append(
+                    (len(fragments), raw_record, record, references, len(paths))
+                )
+                paths.extend(container[key] for container, key in references)
+                fragments.append(None)
+
+            size += len(raw_record)
+            if size >= CHUNK_SIZE:
+                remapped_count += self._write_chunk(
+                    output, fragments, pending_records, paths
+                )
+                fragments, pending_records, paths = [], [], []
+                size = 0
+
+        remapped_count += self._write_chunk(output, fragments, pending_records, paths)
+        return remapped_count
+
+    def rewrite_file(
+        self, input_path: str, output_path: typing.Optional[str] = None
+    ) -> int:
+        """
+        Rewrites manifest file. Result is written to temporary file first
+        and then moved to output path, so file can be safely rewritten in place.
+
+        Args:
+            input_path (str): Path of manifest to rewrite.
+            output_path (typing.Optional[str]): Path of output file,
+                by default input file is rewritten in place.
+
+        Returns:
+            int: Number of remapped paths.
+
+        """
+        output_path = input_path if output_path is None else output_path
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(output_path))
+        )
+        try:
+            with open(
+                file_descriptor, "wb", buffering=WRITE_BUFFER_SIZE
+            ) as output, open(input_path, "rb") as file:
+                remapped_count = self.rewrite_stream(file, output)
+            shutil.copymode(input_path, temporary_path)
+            os.replace(temporary_path, output_path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        return remapped_count
+
+    def _might_contain_paths(self, raw_record: bytes) -> bool:
+        if self._tokens is None:
+            return True
+        for token in self._tokens:
+            if raw_record.find(token) >= 0:
+                return True
+        if self._folded_tokens:
+            folded_record = raw_record.lower()
+            for token in self._folded_tokens:
+                if folded_record.find(token) >= 0:
+                    return True
+        return False
+
+    def _write_chunk(
+        self,
+        output: typing.BinaryIO,
+        fragments: typing.List[typing.Optional[bytes]],
+        pending_records: typing.List[tuple],
+        paths: typing.List[str],
+    ) -> int:
+        results = self.remap.remap_batch(paths, *self._args) if paths else []
+        remapped_count = 0
+        for index, raw_record, record, references, start in pending_records:
+            changed = False
+            end = start + len(references)
+            for (container, key), path, result in zip(
+                references, paths[start:end], results[start:end]
+            ):
+                # SimpleRemap returns normalized path if it's not remapped.
+                if result != path and result != normalize_path(path):
+                    container[key] = result
+                    changed = True
+                    remapped_count += 1
+            fragments[index] = (
+                self._serialize(record, raw_record) if changed else raw_record
+            )
+
+        output.write(b"".join(fragments))
+        return remapped_count
+
+    def _serialize(self, record: typing.Any, raw_record: bytes) -> bytes:
+        if raw_record.endswith(b"\r\n"):
+            line_ending = "\r\n"
+        elif raw_record.endswith(b"\n"):
+            line_ending = "\n"
+        else:
+            line_ending = ""
+        if self.manifest_format == "jsonl":
+            text = self._json_encoder.encode(record) + line_ending
+            try:
+                return text.encode(ENCODING)
+            except UnicodeEncodeError:
+                text = self._escape_surrogates(text, raw_record)
+        else:
+            stream = io.StringIO()
+            csv.writer(stream, self._dialect, lineterminator=line_ending).writerow(
+                record
+            )
+            text = stream.getvalue()
+        return text.encode(ENCODING, ENCODING_ERRORS)
+
+    @staticmethod
+    def _escape_surrogates(text: str, raw_record: bytes) -> str:
+        # Lone surrogates of parsed record come from undecodable bytes of raw record
+        # (see ENCODING_ERRORS) or from escape sequences (e.g. "\\udcff"), which
+        # can't be encoded, so they are escaped again.
+        raw_surrogates = frozenset(
+            SURROGATE_PATTERN.findall(raw_record.decode(ENCODING, ENCODING_ERRORS))
+        )
+        return SURROGATE_PATTERN.sub(
+            lambda match: match.group()
+            if match.group() in raw_surrogates
+            else f"\\u{ord(match.group()):04x}",
+            text,
+        )
+
+    def _parse_json_record(
+        self, raw_record: bytes, record_number: int
+    ) -> typing.Optional[typing.Tuple[typing.Any, typing.List[Reference]]]:
+        if not raw_record.strip():
+            return None
+        try:
+            record = json.loads(raw_record.decode(ENCODING, ENCODING_ERRORS))
+        except ValueError as error:
+            raise ValueError(f"Incorrect JSON record {record_number}: {error}")
+
+        references = []
+        for selector in self._selectors:
+            _select_json_values(record, selector, references)
+        return (record, references) if references else None
+
+    def _iter_csv_records(self, file: typing.BinaryIO) -> typing.Iterator[bytes]:
+        # Lines are joined until quotes are balanced, since quoted fields
+        # might contain line breaks.
+        quote = (self._dialect.quotechar or "").encode(ENCODING)
+        record = b""
+        for line in file:
+            record += line
+            if not quote or record.count(quote) % 2 == 0:
+                yield record
+                record = b""
+        if record:
+            yield record
+
+    def _get_csv_parser(
+        self, header: bytes
+    ) -> typing.Callable[
+        [bytes, int], typing.Optional[typing.Tuple[list, typing.List[Reference]]]
+    ]:
+        columns = next(self._read_csv(header), [])
+        missing_fields = [field for field in self.fields if field not in columns]
+        if missing_fields:
+            raise ValueError(f"Fields {missing_fields} are not in CSV header {columns}")
+        column_ids = sorted({columns.index(field) for field in self.fields})
+
+        def parse_record(
+            raw_record: bytes, record_number: int
+        ) -> typing.Optional[typing.Tuple[list, typing.List[Reference]]]:
+            row = next(self._read_csv(raw_record), [])
+            references = [
+                (row, column_id) for column_id in column_ids if column_id < len(row)
+            ]
+            return (row, references) if references else None
+
+        return parse_record
+
+    def _read_csv(self, raw_record: bytes) -> typing.Iterator[typing.List[str]]:
+        return csv.reader([raw_record.decode(ENCODING, ENCODING_ERRORS)], self._dialect)
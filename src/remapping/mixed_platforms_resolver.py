@@ -1,10 +1,20 @@
+import functools
+import time
 import typing
 
+from .batch import BatchStats, remap_batch
+from .bytes_paths import BytesPath, BytesRoots, iter_remap_bytes, remap_buffer
+from .cache import LRUCache, CacheInfo, MISSING
+from .compact_result import CompactRemapResult
+from .instrumentation import Instrumentation
+from .prefix_index import PrefixIndex
 from .utils import (
-    normalize_path,
     get_resolved_path,
-    build_dst_path,
+    normalize_path,
     is_windows_style_path,
+    is_relative_path,
+    split_path,
+    join_path,
 )
 
 
@@ -22,10 +32,13 @@ class MixedPlatformRemap:
     Just like SimpleRemap it does not support relative paths on host machine,
     so only absolute paths are supported. Paths in form "~/dir" are also not supported.
     Paths style and platform is recognised based on beginning of absolute path.
-    Windows style paths begins with "DISC_LETTER:\".
+    Windows style paths begins with "DISC_LETTER:\" or "\\\\SERVER\\SHARE" (UNC paths).
     POSIX (Linux/Mac/...) paths should begin with "/...".
     Parent statements in input and mapping paths are be resolved, e.g. "/mnt/../mnt2" -> "/mnt2".
     It does support windows style multiplications of folders separator like "G:\\\\\\dir"
+    If several paths from mapping are parents of input path, the longest one is used.
+    In case of equal paths listed for different platforms, the platform listed first
+    in mapping takes precedence.
 
     Examples:
         >>> remap = MixedPlatformRemap({"Windows": ["L:\"], "Mac": ["/Volumes/storage1"]})
@@ -35,9 +48,20 @@ class MixedPlatformRemap:
     Attributes:
         mapping (typing.Dict[str, typing.List[typing.Optional[str]]]): Paths mapping.
             More information in __init__ doc.
+        instrumentation (typing.Optional[Instrumentation]): Collector of remapping statistics.
     """
 
-    def __init__(self, mapping: typing.Dict[str, typing.List[typing.Optional[str]]]):
+    def __init__(
+        self,
+        mapping: typing.Dict[str, typing.List[typing.Optional[str]]],
+        cache_size: int = 0,
+        instrumentation: typing.Optional[Instrumentation] = None,
+        *,
+        index: typing.Optional[PrefixIndex] = None,
+        dst_paths: typing.Optional[
+            typing.Dict[str, typing.List[typing.Optional[typing.Tuple[str, bool]]]]
+        ] = None,
+    ):
         """
         Args:
             mapping (typing.Dict[str, typing.List[typing.Optional[str]]]): Paths mapping.
@@ -45,6 +69,17 @@ class MixedPlatformRemap:
                 i.e. { paths-platform: [path, ...], ... }.
                 Each path presented in mapping correspond to paths at
                 the same index in paths listed for different systems.
+            cache_size (int): Maximum number of memoized results, 0 disables caching.
+                Results are memoized separately for whole input paths and for
+                mapping lookups of their parent directories, least recently used
+                results are evicted first.
+            instrumentation (typing.Optional[Instrumentation]): Collector of remapping
+                statistics, it can be also attached and detached later.
+                Without it no statistics are collected and remapping is not slowed down.
+            index (typing.Optional[PrefixIndex]): Prebuilt index of the mapping paths
+                (e.g. loaded by load_compiled), by default it's built from the mapping.
+            dst_paths (typing.Optional[typing.Dict[str, typing.List[...]]]): Prebuilt
+                resolved destination paths of the mapping, given together with index.
         """
         if any(
             paths for paths in mapping.values() if not isinstance(paths, (list, tuple))
@@ -60,6 +95,38 @@ class MixedPlatformRemap:
             )
 
         self.mapping = mapping
+        self.instrumentation = instrumentation
+        self._path_cache = LRUCache(cache_size) if cache_size else None
+        self._directory_cache = LRUCache(cache_size) if cache_size else None
+        self._bytes_roots = {}
+        if index is None or dst_paths is None:
+            index, dst_paths = self._build_index(mapping)
+        self._index = index
+        self._dst_paths = dst_paths
+
+    @classmethod
+    def _build_index(
+        cls, mapping: typing.Dict[str, typing.List[typing.Optional[str]]]
+    ) -> typing.Tuple[
+        PrefixIndex,
+        typing.Dict[str, typing.List[typing.Optional[typing.Tuple[str, bool]]]],
+    ]:
+        index = PrefixIndex()
+        dst_paths = {
+            platform: [cls._resolve_dst_path(path) if path else None for path in paths]
+            for platform, paths in mapping.items()
+        }
+        for platform, paths in mapping.items():
+            for path_id, path in enumerate(paths):
+                if not path:
+                    continue
+                index.add(*split_path(path), (platform, path_id))
+        return index, dst_paths
+
+    @staticmethod
+    def _resolve_dst_path(path: str) -> typing.Tuple[str, bool]:
+        path = normalize_path(path)
+        return str(get_resolved_path(path)), is_windows_style_path(path)
 
     def __call__(
         self, input_paths: typing.List[str], dst_platform: str
@@ -74,45 +141,539 @@ class MixedPlatformRemap:
             typing.List[str]: List of remapped input paths
 
         """
+        return list(self.iter_remap(input_paths, dst_platform))
+
+    def iter_remap(
+        self, input_paths: typing.Iterable[str], dst_platform: str
+    ) -> typing.Iterator[str]:
+        """
+        Lazily remaps paths from any iterable, so whole input never has to be kept in memory.
+        Destination platform is validated immediately, not on first iteration.
+        Note that items are used as they are, e.g. lines read from file should be
+        stripped from line breaks first.
+
+        Args:
+            input_paths (typing.Iterable[str]): Input paths to remap.
+            dst_platform (str): Destination platform from mapping.
+
+        Yields:
+            str: remapped input paths, in the same order as input paths.
+
+        """
+        self._validate_dst_platform(dst_platform)
+        dst_paths = self._dst_paths[dst_platform]
+        remap_path = (
+            self._remap_path
+            if self.instrumentation is None
+            else self._remap_instrumented_path
+        )
+        if self._path_cache is not None:
+            return (
+                self._remap_cached_path(remap_path, input_path, dst_platform, dst_paths)
+                for input_path in input_paths
+            )
+        return (
+            remap_path(input_path, dst_platform, dst_paths) for input_path in input_paths
+        )
+
+    def remap_batch(
+        self,
+        input_paths: typing.Sequence[str],
+        dst_platform: str,
+        stats: typing.Optional[BatchStats] = None,
+    ) -> typing.List[str]:
+        """
+        Remaps big lists with repeated paths and many files in the same directories.
+        Each unique path is remapped once and mapping is looked up once
+        for each parent directory, then basenames are appended to its result.
+        Results are the same as results of __call__.
+        Path cache and instrumentation are not used in batch mode.
+
+        Args:
+            input_paths (typing.Sequence[str]): Input paths to remap.
+            dst_platform (str): Destination platform from mapping.
+            stats (typing.Optional[BatchStats]): Collector of deduplication statistics.
+
+        Returns:
+            typing.List[str]: List of remapped input paths
+
+        """
+        self._validate_dst_platform(dst_platform)
+        dst_paths = self._dst_paths[dst_platform]
+        return remap_batch(
+            input_paths,
+            functools.partial(
+                self._remap_path, dst_platform=dst_platform, dst_paths=dst_paths
+            ),
+            functools.partial(
+                self._remap_directory, dst_platform=dst_platform, dst_paths=dst_paths
+            ),
+            stats,
+        )
+
+    def remap_compact(
+        self, input_paths: typing.Sequence[str], dst_platform: str
+    ) -> CompactRemapResult:
+        """
+        Remaps paths, but instead of list of strings returns compact sequence,
+        which builds remapped paths only when they are accessed.
+        It uses a fraction of memory needed for list of remapped paths,
+        when only part of them is used or they are streamed somewhere.
+        Path cache and instrumentation are not used.
+
+        Args:
+            input_paths (typing.Sequence[str]): Input paths to remap.
+                The sequence is referenced by result, so it should not be modified.
+            dst_platform (str): Destination platform from mapping.
+
+        Returns:
+            CompactRemapResult: Sequence of remapped input paths
+
+        """
+        self._validate_dst_platform(dst_platform)
+        dst_paths = self._dst_paths[dst_platform]
+        result = CompactRemapResult(
+            input_paths,
+            functools.partial(
+                self._remap_path, dst_platform=dst_platform, dst_paths=dst_paths
+            ),
+        )
+        for input_path in input_paths:
+            windows, parts = split_path(input_path)
+            match = self._find_match(windows, parts, dst_platform, dst_paths)
+            if match is None:
+                result.append_unchanged()
+            else:
+                depth, _, (dst_path, dst_windows) = match
+                result.append_match(
+                    input_path, windows, parts[depth:], dst_path, dst_windows
+                )
+        return result
+
+    def remap_bytes(
+        self, input_paths: typing.Iterable[BytesPath], dst_platform: str
+    ) -> typing.List[bytes]:
+        """
+        Remaps paths given as bytes (e.g. POSIX file names), without decoding them.
+        Results are the same as results of __call__ for paths decoded
+        from UTF-8 (undecodable bytes are kept unchanged) and encoded back.
+        Mapping is looked up once per directory and path cache
+        and instrumentation are not used.
+
+        Args:
+            input_paths (typing.Iterable[BytesPath]): Input paths to remap,
+                bytes, bytearray or memoryview objects (copied to bytes).
+            dst_platform (str): Destination platform from mapping.
+
+        Returns:
+            typing.List[bytes]: List of remapped input paths
+
+        """
+        roots, remap_path = self._prepare_bytes_remap(dst_platform)
+        return list(iter_remap_bytes(input_paths, roots, remap_path))
+
+    def remap_buffer(
+        self,
+        buffer: BytesPath,
+        dst_platform: str,
+        output: typing.Optional[bytearray] = None,
+    ) -> bytearray:
+        """
+        Remaps NUL delimited paths, e.g. output of "find -print0", see remap_bytes.
+
+        Examples:
+            >>> remap = MixedPlatformRemap({"Linux": ["/mnt/storage1"], "Mac": ["/Volumes"]})
+            >>> remap.remap_buffer(b"/mnt/storage1/a\\0/mnt/storage1/b\\0", "Mac")
+            bytearray(b"/Volumes/a\\x00/Volumes/b\\x00")
+
+        Args:
+            buffer (BytesPath): NUL delimited input paths.
+            dst_platform (str): Destination platform from mapping.
+            output (typing.Optional[bytearray]): Buffer to which remapped paths
+                are appended, new buffer is created by default.
+
+        Returns:
+            bytearray: Output buffer with NUL delimited remapped paths.
+
+        """
+        roots, remap_path = self._prepare_bytes_remap(dst_platform)
+        return remap_buffer(buffer, roots, remap_path, output)
+
+    def _prepare_bytes_remap(
+        self, dst_platform: str
+    ) -> typing.Tuple[BytesRoots, typing.Callable[[str], str]]:
+        self._validate_dst_platform(dst_platform)
+        # Dictionary is bound before the index is read, see _reset_caches.
+        bytes_roots = self._bytes_roots
+        dst_paths = self._dst_paths[dst_platform]
+        roots = bytes_roots.get(dst_platform)
+        if roots is None:
+            roots = bytes_roots[dst_platform] = BytesRoots(
+                self._index,
+                functools.partial(
+                    self._lookup_posix, dst_platform=dst_platform, dst_paths=dst_paths
+                ),
+            )
+        return roots, functools.partial(
+            self._remap_path, dst_platform=dst_platform, dst_paths=dst_paths
+        )
+
+    def remap_all(
+        self,
+        input_paths: typing.Iterable[str],
+        dst_platforms: typing.Optional[typing.Sequence[str]] = None,
+    ) -> typing.Dict[str, typing.List[str]]:
+        """
+        Remaps paths to several destination platforms at once.
+        Each input path is matched only once, for all destination platforms.
+
+        Examples:
+            >>> remap = MixedPlatformRemap({"Windows": ["L:\\"], "Mac": ["/Volumes/storage1"]})
+            >>> remap.remap_all(["L:\\temp"])
+            {"Windows": ["L:\\temp"], "Mac": ["/Volumes/storage1/temp"]}
+
+        Args:
+            input_paths (typing.Iterable[str]): Input paths to remap.
+            dst_platforms (typing.Optional[typing.Sequence[str]]): Destination platforms
+                from mapping, by default all platforms.
+
+        Returns:
+            typing.Dict[str, typing.List[str]]: List of remapped input paths
+                for each destination platform.
+
+        """
+        dst_platforms = list(self.mapping if dst_platforms is None else dst_platforms)
+        results = [[] for _ in dst_platforms]
+        appends = [result.append for result in results]
+        for remapped_paths in self.iter_remap_all(input_paths, dst_platforms):
+            for append, path in zip(appends, remapped_paths):
+                append(path)
+        return dict(zip(dst_platforms, results))
+
+    def iter_remap_all(
+        self,
+        input_paths: typing.Iterable[str],
+        dst_platforms: typing.Optional[typing.Sequence[str]] = None,
+    ) -> typing.Iterator[typing.Tuple[str, ...]]:
+        """
+        Lazy version of remap_all. Destination platforms are validated immediately.
+        Path cache and instrumentation are not used, but mapping lookups
+        of parent directories are cached if caching is enabled.
+
+        Args:
+            input_paths (typing.Iterable[str]): Input paths to remap.
+            dst_platforms (typing.Optional[typing.Sequence[str]]): Destination platforms
+                from mapping, by default all platforms.
+
+        Yields:
+            typing.Tuple[str, ...]: input path remapped to each destination platform,
+                in order of destination platforms.
+
+        """
+        dst_platforms = tuple(self.mapping if dst_platforms is None else dst_platforms)
+        for dst_platform in dst_platforms:
+            self._validate_dst_platform(dst_platform)
+
+        dst_paths = [self._dst_paths[dst_platform] for dst_platform in dst_platforms]
+        return (
+            self._remap_path_to_all(input_path, dst_platforms, dst_paths)
+            for input_path in input_paths
+        )
+
+    def cache_info(self) -> typing.Dict[str, CacheInfo]:
+        """
+        Returns:
+            typing.Dict[str, CacheInfo]: Statistics of "paths" and "directories" caches.
+                Empty if caching is disabled.
+
+        """
+        if self._path_cache is None:
+            return {}
+        return {
+            "paths": self._path_cache.info(),
+            "directories": self._directory_cache.info(),
+        }
+
+    def cache_clear(self):
+        if self._path_cache is not None:
+            self._path_cache.clear()
+            self._directory_cache.clear()
+
+    def add_paths(self, paths: typing.Dict[str, typing.Optional[str]]) -> int:
+        """
+        Adds paths corresponding to each other on different platforms,
+        i.e. new item of paths lists in mapping. Lookup structures are updated
+        incrementally, in single step for each platform, and caches are cleared.
+
+        Examples:
+            >>> remap.add_paths({"Windows": "Q:\\", "Linux": "/mnt/storage3"})
+            2
+
+        Args:
+            paths (typing.Dict[str, typing.Optional[str]]): Path for each platform,
+                missing platforms get None.
+
+        Returns:
+            int: Index of added paths in paths lists of mapping.
+
+        """
+        unknown_platforms = set(paths) - set(self.mapping)
+        if unknown_platforms:
+            raise ValueError(
+                f"Platforms {sorted(unknown_platforms)} were not specified"
+                f" in input mapping: {self.mapping}"
+            )
+
+        path_id = len(next(iter(self._dst_paths.values())))
+        mapping = {
+            platform: [*platform_paths, paths.get(platform)]
+            for platform, platform_paths in self.mapping.items()
+        }
+        # Destination paths are added before index entries referring to them.
+        for platform, dst_paths in self._dst_paths.items():
+            path = paths.get(platform)
+            dst_paths.append(self._resolve_dst_path(path) if path else None)
+        for platform in mapping:
+            if paths.get(platform):
+                self._index.add(
+                    *split_path(paths[platform]),
+                    (platform, path_id),
+                    sort_key=self._entry_order,
+                )
+
+        self.mapping = mapping
+        self._reset_caches()
+        return path_id
+
+    def replace_path(self, platform: str, path_id: int, path: typing.Optional[str]):
+        """
+        Replaces single path in mapping, see add_paths.
+
+        Args:
+            platform (str): Platform from mapping.
+            path_id (int): Index of path in paths list of platform.
+            path (typing.Optional[str]): New path, None removes path from mapping.
+        """
+        self._validate_path_id(platform, path_id)
+        old_path = self.mapping[platform][path_id]
+        mapping = dict(self.mapping)
+        mapping[platform] = list(mapping[platform])
+        mapping[platform][path_id] = path
+
+        # New path is available before old one is removed,
+        # so its entry is never missing for concurrent remapping.
+        if path:
+            self._index.add(
+                *split_path(path), (platform, path_id), sort_key=self._entry_order
+            )
+        self._dst_paths[platform][path_id] = (
+            self._resolve_dst_path(path) if path else None
+        )
+        if old_path:
+            self._index.remove(*split_path(old_path), (platform, path_id))
+
+        self.mapping = mapping
+        self._reset_caches()
+
+    def remove_paths(self, path_id: int):
+        """
+        Removes paths of all platforms from mapping, see add_paths.
+        Indexes of other paths don't change, so removed paths are replaced with None.
+
+        Args:
+            path_id (int): Index of paths in paths lists of mapping.
+        """
+        for platform in self.mapping:
+            self._validate_path_id(platform, path_id)
+        for platform in self.mapping:
+            self.replace_path(platform, path_id, None)
+
+    def _entry_order(self, entry: typing.Tuple[str, int]) -> typing.Tuple[int, int]:
+        # Index entries are kept in the same order as they would be added by __init__.
+        platform, path_id = entry
+        return list(self.mapping).index(platform), path_id
+
+    def _validate_path_id(self, platform: str, path_id: int):
+        self._validate_dst_platform(platform)
+        if not 0 <= path_id < len(self.mapping[platform]):
+            raise ValueError(
+                f"Path index {path_id} is out of range of '{platform}' paths."
+            )
+
+    def _reset_caches(self):
+        # Caches are replaced after the index, and remapping reads them before
+        # the index, so results of previous mapping never get into new caches.
+        self._bytes_roots = {}
+        if self._path_cache is not None:
+            self._directory_cache = LRUCache(self._directory_cache.max_size)
+            self._path_cache = LRUCache(self._path_cache.max_size)
+
+    def _validate_dst_platform(self, dst_platform: str):
         if dst_platform not in self.mapping:
             raise ValueError(
                 f"Destination platform '{dst_platform}'"
                 f" was not specified in input mapping: {self.mapping}"
             )
 
-        dst_paths = self.mapping[dst_platform]
-        result = []
+    def _remap_cached_path(
+        self,
+        remap_path: typing.Callable[..., str],
+        input_path: str,
+        dst_platform: str,
+        dst_paths: typing.List[typing.Optional[typing.Tuple[str, bool]]],
+    ) -> str:
+        path_cache = self._path_cache
+        key = (dst_platform, input_path)
+        result = path_cache.get(key)
+        if result is None:
+            result = remap_path(input_path, dst_platform, dst_paths)
+            path_cache.put(key, result)
+        return result
 
-        for input_path in input_paths:
-            for platform, platform_paths in self.mapping.items():
-                if platform == dst_platform:
-                    continue
+    def _find_match(
+        self,
+        windows: bool,
+        parts: typing.Tuple[str, ...],
+        dst_platform: str,
+        dst_paths: typing.List[typing.Optional[typing.Tuple[str, bool]]],
+    ) -> typing.Optional[
+        typing.Tuple[int, typing.Tuple[str, int], typing.Tuple[str, bool]]
+    ]:
+        directory_cache = self._directory_cache
+        if directory_cache is None:
+            return self._lookup_match(windows, parts, dst_platform, dst_paths)
 
-                resolved_input_path = get_resolved_path(input_path)
-                replacement_id, matching_parent_path = next(
-                    filter(
-                        lambda v: (dst_paths[v[0]] and v[1])
-                        and get_resolved_path(v[1]) in resolved_input_path.parents,
-                        enumerate(platform_paths),
-                    ),
-                    (None, None),
-                )
+        # Matching mapping entry depends only on parent directory of path.
+        key = (dst_platform, windows, parts[:-1])
+        match = directory_cache.get(key, MISSING)
+        if match is MISSING:
+            match = self._lookup_match(windows, parts, dst_platform, dst_paths)
+            directory_cache.put(key, match)
+        return match
 
-                if replacement_id is None or not matching_parent_path:
-                    continue
+    def _lookup_match(
+        self,
+        windows: bool,
+        parts: typing.Tuple[str, ...],
+        dst_platform: str,
+        dst_paths: typing.List[typing.Optional[typing.Tuple[str, bool]]],
+    ) -> typing.Optional[
+        typing.Tuple[int, typing.Tuple[str, int], typing.Tuple[str, bool]]
+    ]:
+        return next(
+            (
+                (depth, entry, dst_paths[entry[1]])
+                for depth, entry in self._index.iter_matches(windows, parts)
+                if entry[0] != dst_platform and dst_paths[entry[1]]
+            ),
+            None,
+        )
 
-                dst_path = normalize_path(dst_paths[replacement_id])
-                if not is_windows_style_path(dst_path):
-                    resolved_input_path = resolved_input_path.as_posix()
+    def _lookup_posix(
+        self,
+        parts: typing.Tuple[str, ...],
+        dst_platform: str,
+        dst_paths: typing.List[typing.Optional[typing.Tuple[str, bool]]],
+    ) -> typing.Optional[typing.Tuple[int, str, bool]]:
+        match = self._lookup_match(False, parts, dst_platform, dst_paths)
+        return None if match is None else (match[0], *match[2])
 
-                result.append(
-                    build_dst_path(
-                        str(resolved_input_path), matching_parent_path, dst_path
-                    )
-                )
-                break
+    def _find_all_matches(
+        self, windows: bool, parts: typing.Tuple[str, ...]
+    ) -> typing.List[typing.Tuple[int, typing.Tuple[str, int]]]:
+        directory_cache = self._directory_cache
+        if directory_cache is None:
+            return list(self._index.iter_matches(windows, parts))
+
+        # None never collides with destination platform used in keys of _find_match.
+        key = (None, windows, parts[:-1])
+        matches = directory_cache.get(key)
+        if matches is None:
+            matches = list(self._index.iter_matches(windows, parts))
+            directory_cache.put(key, matches)
+        return matches
+
+    def _remap_path_to_all(
+        self,
+        input_path: str,
+        dst_platforms: typing.Tuple[str, ...],
+        dst_paths: typing.List[typing.List[typing.Optional[typing.Tuple[str, bool]]]],
+    ) -> typing.Tuple[str, ...]:
+        windows, parts = split_path(input_path)
+        matches = self._find_all_matches(windows, parts)
+        if not matches:
+            return (input_path,) * len(dst_platforms)
 
+        results = []
+        for dst_platform, platform_dst_paths in zip(dst_platforms, dst_paths):
+            for depth, (platform, path_id) in matches:
+                dst_path = platform_dst_paths[path_id]
+                if platform != dst_platform and dst_path:
+                    results.append(join_path(dst_path[0], parts[depth:], dst_path[1]))
+                    break
             else:
-                result.append(input_path)
+                results.append(input_path)
+        return tuple(results)
+
+    def _remap_path(
+        self,
+        input_path: str,
+        dst_platform: str,
+        dst_paths: typing.List[typing.Optional[typing.Tuple[str, bool]]],
+    ) -> str:
+        windows, parts = split_path(input_path)
+        match = self._find_match(windows, parts, dst_platform, dst_paths)
+        if match is None:
+            return input_path
+
+        depth, _, (dst_path, dst_windows) = match
+        return join_path(dst_path, parts[depth:], dst_windows)
+
+    def _remap_directory(
+        self,
+        directory: str,
+        basenames: typing.List[str],
+        dst_platform: str,
+        dst_paths: typing.List[typing.Optional[typing.Tuple[str, bool]]],
+    ) -> typing.List[str]:
+        windows, parts = split_path(directory)
+        # Basename placeholder, matching entries are parents of the basename.
+        match = self._find_match(windows, parts + ("",), dst_platform, dst_paths)
+        if match is None:
+            return [directory + basename for basename in basenames]
+
+        depth, _, (dst_path, dst_windows) = match
+        sub_parts = parts[depth:]
+        return [
+            join_path(dst_path, sub_parts + (basename,), dst_windows)
+            for basename in basenames
+        ]
+
+    def _remap_instrumented_path(
+        self,
+        input_path: str,
+        dst_platform: str,
+        dst_paths: typing.List[typing.Optional[typing.Tuple[str, bool]]],
+    ) -> str:
+        # Timed copy of _remap_path, so there is no overhead when instrumentation is off.
+        clock = time.perf_counter
+        start = clock()
+        windows, parts = split_path(input_path)
+        normalized = clock()
+        match = self._find_match(windows, parts, dst_platform, dst_paths)
+        matched = clock()
+
+        if match is None:
+            result, entry = input_path, None
+        else:
+            depth, entry, (dst_path, dst_windows) = match
+            result = join_path(dst_path, parts[depth:], dst_windows)
 
+        self.instrumentation.record(
+            input_path,
+            result,
+            entry,
+            is_relative_path(windows, parts),
+            (normalized - start, matched - normalized, clock() - matched),
+        )
         return result
@@ -0,0 +1,79 @@
+import collections
+import typing
+
+
+class MultiPatternAutomaton:
+    """Aho-Corasick automaton finding occurrences of many byte patterns in one pass.
+
+    Failure links are resolved into transitions when automaton is built,
+    so each scanned byte costs single dictionary lookup, no matter
+    how many patterns are searched for.
+    Bytes not present in any pattern always lead back to initial state.
+
+    Examples:
+        >>> automaton = MultiPatternAutomaton([b"l:\\", b"/mnt"])
+        >>> state = automaton.INITIAL_STATE
+        >>> for byte in b"x l:\\":
+        ...     state = automaton.transitions[state].get(byte, automaton.INITIAL_STATE)
+        >>> automaton.outputs[state]
+        [0]
+
+    Attributes:
+        patterns (typing.List[bytes]): Searched patterns.
+        transitions (typing.List[typing.Dict[int, int]]): Next state for each state and byte.
+        outputs (typing.List[typing.List[int]]): Indexes of patterns ending in each state,
+            the longest pattern first.
+    """
+
+    INITIAL_STATE = 0
+
+    def __init__(self, patterns: typing.Sequence[bytes]):
+        """
+        Args:
+            patterns (typing.Sequence[bytes]): Non-empty patterns to search for.
+        """
+        self.patterns = list(patterns)
+        goto: typing.List[typing.Dict[int, int]] = [{}]
+        outputs: typing.List[typing.List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("Patterns should not be empty.")
+            state = self.INITIAL_STATE
+            for byte in pattern:
+                next_state = goto[state].get(byte)
+                if next_state is None:
+                    next_state = goto[state][byte] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(pattern_id)
+
+        fail = [self.INITIAL_STATE] * len(goto)
+        transitions: typing.List[typing.Dict[int, int]] = [{}] * len(goto)
+        transitions[self.INITIAL_STATE] = dict(goto[self.INITIAL_STATE])
+        # States are visited in breadth-first order, so failure state
+        # (which is always shallower) is complete before it's used.
+        queue = collections.deque(goto[self.INITIAL_STATE].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            transitions[state] = {**transitions[fail[state]], **goto[state]}
+            for byte, child in goto[state].items():
+                fail[child] = transitions[fail[state]].get(byte, self.INITIAL_STATE)
+                queue.append(child)
+
+        for state_outputs in outputs:
+            state_outputs.sort(key=lambda pattern_id: -len(self.patterns[pattern_id]))
+
+        self.transitions = transitions
+        self.outputs = outputs
+
+    @property
+    def first_bytes(self) -> bytes:
+        """
+        Returns:
+            bytes: Bytes which can start any pattern, i.e. leave initial state.
+
+        """
+        return bytes(sorted(self.transitions[self.INITIAL_STATE]))
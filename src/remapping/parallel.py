@@ -0,0 +1,112 @@
+import concurrent.futures
+import itertools
+import typing
+
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .simple_remap import SimpleRemap
+
+# Remapper used by worker process, set once by pool initializer.
+_worker_remap = None
+
+
+def _initialize_worker(remap: typing.Union[SimpleRemap, MixedPlatformRemap]):
+    global _worker_remap
+    _worker_remap = remap
+
+
+def _remap_chunk(chunk: typing.List[str], args: tuple) -> typing.List[str]:
+    return _worker_remap(chunk, *args)
+
+
+class ParallelRemap:
+    """Class for remapping big lists of paths in multiple processes.
+
+    Input paths are split into chunks, which are remapped by given remapper
+    in pool of worker processes. Results are returned in the same order as input paths.
+    Remapper (with its mapping) is sent to each worker only once, when worker starts,
+    so the pool should be reused for multiple calls, e.g. with context manager.
+    Lists smaller than min_parallel_size are remapped in current process,
+    so short jobs don't pay for starting processes.
+
+    Examples:
+        >>> remap = MixedPlatformRemap({"Windows": ["L:\\"], "Mac": ["/Volumes/storage1"]})
+        >>> with ParallelRemap(remap, workers=4) as parallel_remap:
+        ...     parallel_remap(["L:\\temp"] * 1000000, "Mac")
+        ["/Volumes/storage1/temp", ...]
+
+    Attributes:
+        remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper used for remapping.
+        workers (typing.Optional[int]): Number of worker processes.
+        chunk_size (int): Number of paths remapped by worker at once.
+        min_parallel_size (int): Minimal number of paths remapped in worker processes.
+    """
+
+    def __init__(
+        self,
+        remap: typing.Union[SimpleRemap, MixedPlatformRemap],
+        workers: typing.Optional[int] = None,
+        chunk_size: int = 10000,
+        min_parallel_size: int = 50000,
+    ):
+        """
+        Args:
+            remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper to use.
+            workers (typing.Optional[int]): Number of worker processes,
+                by default number of processors on the machine.
+            chunk_size (int): Number of paths sent to worker at once.
+            min_parallel_size (int): Lists with fewer paths are remapped
+                in current process.
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"Chunk size should be positive, given: {chunk_size}")
+
+        self.remap = remap
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.min_parallel_size = min_parallel_size
+        self._executor = None
+
+    def __call__(self, input_paths: typing.List[str], *args) -> typing.List[str]:
+        """
+        Args:
+            input_paths (typing.List[str]): Input paths to remap.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            typing.List[str]: List of remapped input paths
+
+        """
+        if len(input_paths) < self.min_parallel_size or self.workers == 1:
+            return self.remap(input_paths, *args)
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_initialize_worker,
+                initargs=(self.remap,),
+            )
+
+        chunks = (
+            input_paths[start : start + self.chunk_size]
+            for start in range(0, len(input_paths), self.chunk_size)
+        )
+        result = []
+        for remapped_chunk in self._executor.map(
+            _remap_chunk, chunks, itertools.repeat(args)
+        ):
+            result.extend(remapped_chunk)
+
+        return result
+
+    def close(self):
+        """Shuts down worker processes, they are started again on next parallel call."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "ParallelRemap":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,282 @@
+import re
+import string
+import typing
+
+from .utils import get_resolved_path, is_windows_style_path, normalize_path, split_path
+
+# Prefix of mapping keys, which are glob patterns instead of literal paths.
+PATTERN_PREFIX = "glob:"
+# Wildcards of glob patterns: named wildcard, "*", "?" and character set.
+GLOB_TOKEN_PATTERN = re.compile(r"\{(\w+)\}|\*|\?|\[(!?)([^\]]+)\]")
+WILDCARDS = frozenset("*?[{")
+
+
+def is_pattern(sub_path: str) -> bool:
+    return sub_path.startswith(PATTERN_PREFIX)
+
+
+def _path_key(windows: bool, parts: typing.Sequence[str]) -> str:
+    # Every component is followed by separator, so pattern matching
+    # whole components of strict parent of path is followed by more characters.
+    separator = "\\" if windows else "/"
+    return "".join(
+        part
+        if part[-1:] == separator or (windows and index == 0 and part[-1:] == ":")
+        else part + separator
+        for index, part in enumerate(parts)
+    )
+
+
+def _translate_component(
+    component: str, windows: bool, group_prefix: str, names: typing.List[str]
+) -> str:
+    separators = r"\\/" if windows else "/"
+    regex = []
+    position = 0
+    for match in GLOB_TOKEN_PATTERN.finditer(component):
+        regex.append(re.escape(component[position : match.start()]))
+        position = match.end()
+        name, negation, characters = match.groups()
+        if name is not None:
+            if name in names:
+                raise ValueError(f"Wildcard '{{{name}}}' is repeated in pattern.")
+            names.append(name)
+            regex.append(f"(?P<{group_prefix}{name}>[^{separators}]*)")
+        elif match.group() == "*":
+            regex.append(f"[^{separators}]*")
+        elif match.group() == "?":
+            regex.append(f"[^{separators}]")
+        else:
+            characters = characters.replace("\\", "\\\\")
+            if negation:
+                # Negated set never matches separators.
+                regex.append(f"[^{characters}{separators}]")
+            else:
+                if characters[:1] == "^":
+                    characters = "\\" + characters
+                regex.append(f"[{characters}]")
+    regex.append(re.escape(component[position:]))
+    return "".join(regex)
+
+
+def literal_root(sub_path: str) -> str:
+    """
+    Examples:
+        >>> literal_root("glob:P:\\show_*\\publish")
+        "P:\\"
+
+    Args:
+    sub_path (str): pattern mapping key.
+
+    Returns:
+        str: leading components of pattern, which don't contain wildcards,
+            empty if the first component contains wildcards.
+
+    """
+    windows, parts = split_path(sub_path[len(PATTERN_PREFIX) :])
+    literal_parts = []
+    for part in parts:
+        if WILDCARDS.intersection(part):
+            break
+        literal_parts.append(part)
+    if not literal_parts:
+        return ""
+    return str(get_resolved_path(_path_key(windows, literal_parts)))
+
+
+class _Pattern(typing.NamedTuple):
+    sub_path: str
+    windows: bool
+    depth: int
+    regex: str
+    group_name: str
+    names: typing.Tuple[str, ...]
+    replacement: str
+    dst_path: str
+    dst_windows: bool
+
+
+class PatternIndex:
+    """Matcher of glob pattern mapping keys, e.g. "glob:P:\\show_{show}\\publish".
+
+    Pattern is matched against whole components of path. "*" matches any characters
+    of single component, "?" single character and "[...]" character set
+    ("[!...]" is negated). Named wildcard "{name}" matches like "*" and matched text
+    is put in place of "{name}" in replacement, e.g. "/mnt/shows/{show}".
+    Just like for literal keys, Windows patterns are matched case-insensitively
+    and with both separators and parent statements of paths are resolved first.
+
+    All patterns of each path style are compiled into single regex alternation
+    with named groups, so each path is matched in one regex pass,
+    no matter how many patterns there are. Alternatives are ordered by number
+    of components of pattern, so the deepest matching pattern is used,
+    and patterns with the same number of components are tried in mapping order.
+
+    Examples:
+        >>> index = PatternIndex([("glob:P:\\show_{show}", "/mnt/shows/{show}")])
+        >>> index.match(*split_path("p:/show_abc/a.abc"))
+        (2, ("glob:P:\\show_{show}", "/mnt/shows/abc", False))
+
+    Attributes:
+        max_depths (typing.Dict[bool, int]): The biggest number of components
+            of Windows (True) and POSIX (False) patterns, 0 if there are none.
+    """
+
+    def __init__(self, entries: typing.Iterable[typing.Tuple[str, str]]):
+        """
+        Args:
+            entries (typing.Iterable[typing.Tuple[str, str]]): Pattern mapping keys
+                (with PATTERN_PREFIX) and their replacements, in mapping order.
+        """
+        patterns = [
+            self._prepare_pattern(index, sub_path, replacement)
+            for index, (sub_path, replacement) in enumerate(entries)
+        ]
+        # Stable sort keeps mapping order of patterns with the same depth.
+        patterns.sort(key=lambda pattern: -pattern.depth)
+
+        self.max_depths = {True: 0, False: 0}
+        self._patterns = {}
+        self._regexes = {}
+        self._pattern_regexes = {}
+        for windows in (True, False):
+            style_patterns = [
+                pattern for pattern in patterns if pattern.windows == windows
+            ]
+            if not style_patterns:
+                continue
+            flags = re.IGNORECASE | re.DOTALL if windows else re.DOTALL
+            self.max_depths[windows] = style_patterns[0].depth
+            self._regexes[windows] = re.compile(
+                "|".join(
+                    f"(?P<{pattern.group_name}>{pattern.regex})(?=.)"
+                    for pattern in style_patterns
+                ),
+                flags,
+            )
+            self._pattern_regexes[windows] = [
+                (pattern, re.compile(f"(?:{pattern.regex})(?=.)", flags))
+                for pattern in style_patterns
+            ]
+            self._patterns.update(
+                (pattern.group_name, pattern) for pattern in style_patterns
+            )
+
+    @staticmethod
+    def _prepare_pattern(index: int, sub_path: str, replacement: str) -> _Pattern:
+        windows, parts = split_path(sub_path[len(PATTERN_PREFIX) :])
+        if not parts:
+            raise ValueError(f"Pattern '{sub_path}' is empty.")
+
+        group_name = f"_{index}"
+        names = []
+        separator = "\\" if windows else "/"
+        # Regex matches key of path prefix, see _path_key.
+        regex = "".join(
+            _translate_component(part, windows, group_name + "_", names)
+            + (
+                ""
+                if part[-1:] == separator
+                or (windows and position == 0 and part[-1:] == ":")
+                else re.escape(separator)
+            )
+            for position, part in enumerate(parts)
+        )
+
+        for _, field_name, _, _ in string.Formatter().parse(replacement):
+            if field_name is not None and field_name not in names:
+                raise ValueError(
+                    f"Replacement '{replacement}' of pattern '{sub_path}'"
+                    f" uses unknown wildcard '{{{field_name}}}'."
+                )
+
+        replacement = normalize_path(replacement)
+        return _Pattern(
+            sub_path=sub_path,
+            windows=windows,
+            depth=len(parts),
+            regex=regex,
+            group_name=group_name,
+            names=tuple(names),
+            replacement=replacement,
+            dst_path=str(get_resolved_path(replacement)),
+            dst_windows=is_windows_style_path(replacement),
+        )
+
+    def match(
+        self, windows: bool, parts: typing.Sequence[str], min_depth: int = 0
+    ) -> typing.Optional[typing.Tuple[int, typing.Tuple[str, str, bool]]]:
+        """
+        Args:
+            windows (bool): whether path is Windows style path.
+            parts (typing.Sequence[str]): components of path (see split_path).
+            min_depth (int): Only patterns with more components are matched,
+                e.g. depth of matched literal mapping key.
+
+        Returns:
+            typing.Optional[typing.Tuple[int, typing.Tuple[str, str, bool]]]:
+                number of components of the deepest pattern, which matches
+                strict parent of path, and its mapping key, resolved destination path
+                and whether destination is Windows style path.
+
+        """
+        if self.max_depths[windows] <= min_depth:
+            return None
+        match = self._regexes[windows].match(_path_key(windows, parts))
+        if match is None:
+            return None
+        pattern = self._patterns[match.lastgroup]
+        if pattern.depth <= min_depth:
+            return None
+        return pattern.depth, self._destination(pattern, match)
+
+    def iter_matches(
+        self, windows: bool, parts: typing.Sequence[str]
+    ) -> typing.Iterator[typing.Tuple[int, typing.Tuple[str, str, bool]]]:
+        """
+        Yields all patterns matching strict parents of path, see match.
+
+        Args:
+            windows (bool): whether path is Windows style path.
+            parts (typing.Sequence[str]): components of path (see split_path).
+
+        Yields:
+            typing.Tuple[int, typing.Tuple[str, str, bool]]: number of components
+                of pattern and its value, starting from the deepest pattern.
+
+        """
+        key = _path_key(windows, parts)
+        for pattern, regex in self._pattern_regexes.get(windows, ()):
+            match = regex.match(key)
+            if match is not None:
+                yield pattern.depth, self._destination(pattern, match)
+
+    @staticmethod
+    def _destination(
+        pattern: _Pattern, match: typing.Match
+    ) -> typing.Tuple[str, str, bool]:
+        values = {
+            name: match.group(f"{pattern.group_name}_{name}") for name in pattern.names
+        }
+        if all(
+            value
+            and value != "."
+            and value != ".."
+            and ":" not in value
+            and "/" not in value
+            and "\\" not in value
+            for value in values.values()
+        ):
+            # Values are plain path components, so resolved replacement stays resolved.
+            return (
+                pattern.sub_path,
+                pattern.dst_path.format_map(values),
+                pattern.dst_windows,
+            )
+
+        replacement = normalize_path(pattern.replacement.format_map(values))
+        return (
+            pattern.sub_path,
+            str(get_resolved_path(replacement)),
+            is_windows_style_path(replacement),
+        )
@@ -0,0 +1,183 @@
+import typing
+
+
+class _Node:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: typing.Dict[str, "_Node"] = {}
+        self.values: typing.List[typing.Any] = []
+
+
+class PrefixIndex:
+    """Component-level prefix trie used to find mapping roots of a path.
+
+    Paths are stored as sequences of their components (PurePath.parts),
+    separately for Windows and POSIX style, because paths of different styles
+    never match each other. Windows components are compared case-insensitively,
+    just like PureWindowsPath does. Children of nodes are dictionaries, so the first
+    component (drive, UNC share or POSIX root) picks roots of its own drive or share
+    and each path is compared only with roots placed along its components.
+    Lookup cost depends only on depth of looked up path, not on number of stored roots.
+
+    Examples:
+        >>> index = PrefixIndex()
+        >>> index.add(False, ("/", "mnt"), "short")
+        >>> index.add(False, ("/", "mnt", "storage1"), "long")
+        >>> list(index.iter_matches(False, ("/", "mnt", "storage1", "temp")))
+        [(3, "long"), (2, "short")]
+    """
+
+    def __init__(self):
+        self._roots = {False: _Node(), True: _Node()}
+
+    @staticmethod
+    def _key(part: str, windows: bool) -> str:
+        return part.lower() if windows else part
+
+    def add(
+        self,
+        windows: bool,
+        parts: typing.Sequence[str],
+        value: typing.Any,
+        sort_key: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+    ):
+        """
+        Args:
+            windows (bool): whether root path is Windows style path.
+            parts (typing.Sequence[str]): components of root path.
+            value (typing.Any): value returned for paths placed under given root.
+                Values stored under the same root are returned in insertion order.
+            sort_key (typing.Optional[typing.Callable[[typing.Any], typing.Any]]):
+                If given, value is inserted after values with lower or equal key,
+                instead of being appended.
+        """
+        node = self._roots[windows]
+        for part in parts:
+            node = node.children.setdefault(self._key(part, windows), _Node())
+
+        # Values lists are replaced, not modified, since lookups iterate them lazily.
+        values = node.values
+        position = len(values)
+        if sort_key is not None:
+            key = sort_key(value)
+            while position and sort_key(values[position - 1]) > key:
+                position -= 1
+        node.values = [*values[:position], value, *values[position:]]
+
+    def _find_nodes(
+        self, windows: bool, parts: typing.Sequence[str], value: typing.Any
+    ) -> typing.List[_Node]:
+        nodes = [self._roots[windows]]
+        for part in parts:
+            node = nodes[-1].children.get(self._key(part, windows))
+            if node is None:
+                break
+            nodes.append(node)
+
+        if len(nodes) != len(parts) + 1 or value not in nodes[-1].values:
+            raise ValueError(f"Value {value} is not stored under root {parts}")
+        return nodes
+
+    def remove(self, windows: bool, parts: typing.Sequence[str], value: typing.Any):
+        """
+        Args:
+            windows (bool): whether root path is Windows style path.
+            parts (typing.Sequence[str]): components of root path.
+            value (typing.Any): value stored under given root to remove.
+        """
+        nodes = self._find_nodes(windows, parts, value)
+        values = list(nodes[-1].values)
+        values.remove(value)
+        nodes[-1].values = values
+
+        # Nodes left without values and children are pruned, starting from the deepest.
+        for part, parent, node in reversed(list(zip(parts, nodes, nodes[1:]))):
+            if node.values or node.children:
+                break
+            del parent.children[self._key(part, windows)]
+
+    def replace(
+        self,
+        windows: bool,
+        parts: typing.Sequence[str],
+        value: typing.Any,
+        new_value: typing.Any,
+    ):
+        """
+        Replaces value at its position, so concurrent lookups find old or new value.
+
+        Args:
+            windows (bool): whether root path is Windows style path.
+            parts (typing.Sequence[str]): components of root path.
+            value (typing.Any): value stored under given root to replace.
+            new_value (typing.Any): new value.
+        """
+        node = self._find_nodes(windows, parts, value)[-1]
+        values = list(node.values)
+        values[values.index(value)] = new_value
+        node.values = values
+
+    def iter_roots(
+        self,
+    ) -> typing.Iterator[typing.Tuple[bool, typing.Tuple[str, ...]]]:
+        """
+        Yields roots with stored values. Components of Windows roots are lowercase.
+
+        Yields:
+            typing.Tuple[bool, typing.Tuple[str, ...]]: whether root is Windows style path
+                and its components.
+
+        """
+        for windows, parts, _ in self.iter_entries():
+            yield windows, parts
+
+    def iter_entries(
+        self,
+    ) -> typing.Iterator[typing.Tuple[bool, typing.Tuple[str, ...], typing.List]]:
+        """
+        Yields roots with their values, see iter_roots. Adding values of each root
+        in given order to empty index builds the same index.
+
+        Yields:
+            typing.Tuple[bool, typing.Tuple[str, ...], typing.List]: whether root
+                is Windows style path, its components and values stored under it.
+
+        """
+        for windows, root in self._roots.items():
+            nodes = [((), root)]
+            while nodes:
+                parts, node = nodes.pop()
+                if node.values:
+                    yield windows, parts, node.values
+                nodes.extend(
+                    (parts + (part,), child) for part, child in node.children.items()
+                )
+
+    def iter_matches(
+        self, windows: bool, parts: typing.Sequence[str]
+    ) -> typing.Iterator[typing.Tuple[int, typing.Any]]:
+        """
+        Yields values of roots which are parents of path with given components,
+        starting from the longest root. Path itself is not treated as its own parent.
+
+        Args:
+            windows (bool): whether path is Windows style path.
+            parts (typing.Sequence[str]): components of path to look up.
+
+        Yields:
+            typing.Tuple[int, typing.Any]: number of components of matched root and its value.
+
+        """
+        node = self._roots[windows]
+        matched = []
+        for depth, part in enumerate(parts[:-1], 1):
+            node = node.children.get(self._key(part, windows))
+            if node is None:
+                break
+            if node.values:
+                matched.append((depth, node.values))
+
+        for depth, values in reversed(matched):
+            for value in values:
+                yield depth, value
@@ -0,0 +1,326 @@
+import hashlib
+import json
+import sqlite3
+import time
+import typing
+
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .simple_remap import SimpleRemap
+
+# Version of stored results, it should be changed whenever remapping results change.
+STORE_VERSION = 2
+# Number of paths looked up with single query, below default SQLite limit
+# of 999 query parameters.
+LOOKUP_SIZE = 900
+# Stored results are read all at once, when there are at most SCAN_RATIO times more
+# of them than looked up paths, which is much faster than looking up each path.
+SCAN_RATIO = 4
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    fingerprint_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    result TEXT,
+    PRIMARY KEY (fingerprint_id, path)
+) WITHOUT ROWID;
+"""
+
+Remap = typing.Union[SimpleRemap, MixedPlatformRemap]
+
+
+def mapping_fingerprint(remap: Remap, *args) -> str:
+    """
+    Examples:
+        >>> remap = MixedPlatformRemap({"Windows": ["L:\\"], "Mac": ["/Volumes"]})
+        >>> mapping_fingerprint(remap, "Mac")
+        "5d1b0c..."
+
+    Args:
+    remap (Remap): SimpleRemap or MixedPlatformRemap.
+    *args: additional arguments of remapper call, e.g. destination platform.
+
+    Returns:
+        str: digest of remapper type, its mapping and call arguments,
+            which identifies results of remapping.
+
+    """
+    # Order of mapping items matters, e.g. platforms listed first take precedence.
+    data = json.dumps([STORE_VERSION, type(remap).__name__, remap.mapping, args])
+    return hashlib.sha256(data.encode("ascii")).hexdigest()
+
+
+def _is_storable(path: str) -> bool:
+    # SQLite stores UTF-8 text, surrogates of undecodable bytes can't be encoded.
+    if path.isascii():
+        return True
+    try:
+        path.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+class ResultStore:
+    """SQLite database of remapping results, persisted between runs.
+
+    Results are stored for fingerprints of mappings (see mapping_fingerprint),
+    so results of changed mapping are never used. Fingerprints which were not used
+    for a long time can be removed with prune. Paths which are not changed
+    by remapping are stored without results, to keep database small.
+    Database can be shared by several processes.
+
+    Examples:
+        >>> with ResultStore("results.db") as store:
+        ...     fingerprint_id = store.get_fingerprint_id(mapping_fingerprint(remap))
+        ...     store.insert(fingerprint_id, [("L:\\temp", "X:\\temp")])
+        ...     store.lookup(fingerprint_id, ["L:\\temp", "L:\\temp2"])
+        {"L:\\temp": "X:\\temp"}
+
+    Attributes:
+        path (str): Path of database file.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Args:
+            path (str): Path of database file, it's created if it doesn't exist.
+            timeout (float): Number of seconds to wait for database locked
+                by other process.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=timeout)
+        # Readers are not blocked by writers and results are cheap to recompute,
+        # so they don't have to be synced on every transaction.
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def get_fingerprint_id(self, fingerprint: str) -> int:
+        """
+        Args:
+            fingerprint (str): Fingerprint of mapping, see mapping_fingerprint.
+
+        Returns:
+            int: Identifier of results stored for the fingerprint.
+                Fingerprint is added if it's not stored yet.
+
+        """
+        with self._connection as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO fingerprints (fingerprint, last_used)"
+                " VALUES (?, ?)",
+                (fingerprint, time.time()),
+            )
+            connection.execute(
+                "UPDATE fingerprints SET last_used = ? WHERE fingerprint = ?",
+                (time.time(), fingerprint),
+            )
+            (fingerprint_id,) = connection.execute(
+                "SELECT id FROM fingerprints WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return fingerprint_id
+
+    def lookup(
+        self, fingerprint_id: int, paths: typing.Sequence[str]
+    ) -> typing.Dict[str, str]:
+        """
+        Args:
+            fingerprint_id (int): Identifier of fingerprint of mapping.
+            paths (typing.Sequence[str]): Unique input paths to look up.
+
+        Returns:
+            typing.Dict[str, str]: Stored results of input paths,
+                paths without stored results are missing. There are no results
+                for removed fingerprint (e.g. pruned by other process).
+
+        """
+        execute = self._connection.execute
+        row = execute(
+            "SELECT size FROM fingerprints WHERE id = ?", (fingerprint_id,)
+        ).fetchone()
+        if row is None:
+            return {}
+        (size,) = row
+        if size <= len(paths) * SCAN_RATIO:
+            stored_results = dict(
+                execute(
+                    "SELECT path, coalesce(result, path) FROM results"
+                    " WHERE fingerprint_id = ?",
+                    (fingerprint_id,),
+                )
+            )
+            return {
+                path: stored_results[path] for path in paths if path in stored_results
+            }
+
+        results = {}
+        query = None
+        for start in range(0, len(paths), LOOKUP_SIZE):
+            chunk = paths[start : start + LOOKUP_SIZE]
+            if query is None or len(chunk) != LOOKUP_SIZE:
+                query = (
+                    "SELECT path, coalesce(result, path) FROM results"
+                    " WHERE fingerprint_id = ?"
+                    f" AND path IN ({', '.join('?' * len(chunk))})"
+                )
+            results.update(execute(query, (fingerprint_id, *chunk)))
+        return results
+
+    def insert(
+        self, fingerprint_id: int, results: typing.Iterable[typing.Tuple[str, str]]
+    ):
+        """
+        Args:
+            fingerprint_id (int): Identifier of fingerprint of mapping.
+            results (typing.Iterable[typing.Tuple[str, str]]): Input paths
+                and their results. They are not inserted for removed fingerprint,
+                since they would never be used nor pruned.
+        """
+        with self._connection as connection:
+            # Write transaction is started first, so the fingerprint can't be removed
+            # by other process meanwhile.
+            if not connection.execute(
+                "UPDATE fingerprints SET size = size WHERE id = ?", (fingerprint_id,)
+            ).rowcount:
+                return
+            # Results of the same mapping never change, so stored ones are kept.
+            inserted_count = connection.executemany(
+                "INSERT OR IGNORE INTO results VALUES (?, ?, ?)",
+                (
+                    (fingerprint_id, path, None if result == path else result)
+                    for path, result in results
+                ),
+            ).rowcount
+            connection.execute(
+                "UPDATE fingerprints SET size = size + ? WHERE id = ?",
+                (inserted_count, fingerprint_id),
+            )
+
+    def prune(self, max_age: float) -> int:
+        """
+        Removes results of fingerprints which were not used for given time.
+
+        Args:
+            max_age (float): Number of seconds since last use of fingerprint.
+
+        Returns:
+            int: Number of removed fingerprints.
+
+        """
+        last_used = time.time() - max_age
+        with self._connection as connection:
+            connection.execute(
+                "DELETE FROM results WHERE fingerprint_id IN"
+                " (SELECT id FROM fingerprints WHERE last_used < ?)",
+                (last_used,),
+            )
+            return connection.execute(
+                "DELETE FROM fingerprints WHERE last_used < ?", (last_used,)
+            ).rowcount
+
+
+class PersistentRemap:
+    """Class for remapping paths with results memoized in ResultStore between runs.
+
+    Unique input paths are looked up in the store in bulk, only missing paths
+    are remapped (with remap_batch of wrapped remapper) and their results
+    are inserted, so repeated runs over mostly the same paths remap only new ones.
+    Mapping changes of wrapped remapper change fingerprint of results,
+    so results of previous mapping are never used.
+    Lookup costs about as much as remapping of simple POSIX paths, so it pays off
+    for paths which are expensive to remap, e.g. Windows style paths.
+    Paths with undecodable bytes (surrogates) are remapped, but never stored.
+
+    Examples:
+        >>> with ResultStore("results.db") as store:
+        ...     remap = PersistentRemap(MixedPlatformRemap(mapping), store)
+        ...     remap(["L:\\temp"], "Mac")
+        ["/Volumes/storage1/temp"]
+
+    Attributes:
+        remap (Remap): Wrapped remapper, SimpleRemap or MixedPlatformRemap.
+        store (ResultStore): Store of remapping results.
+        hits (int): Number of unique input paths found in the store.
+        misses (int): Number of unique input paths remapped and inserted to the store.
+    """
+
+    def __init__(self, remap: Remap, store: ResultStore):
+        """
+        Args:
+            remap (Remap): Remapper used to remap paths missing in the store.
+            store (ResultStore): Store of remapping results.
+        """
+        self.remap = remap
+        self.store = store
+        self.hits = self.misses = 0
+        self._mapping = None
+        self._fingerprints = {}
+
+    def __call__(self, input_paths: typing.Sequence[str], *args) -> typing.List[str]:
+        """
+        Args:
+            input_paths (typing.Sequence[str]): Input paths to remap.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            typing.List[str]: List of remapped input paths
+
+        """
+        fingerprint_id = self._get_fingerprint_id(args)
+        unique_paths = list(dict.fromkeys(input_paths))
+        results = self.store.lookup(
+            fingerprint_id, [path for path in unique_paths if _is_storable(path)]
+        )
+        missing_paths = [path for path in unique_paths if path not in results]
+        if missing_paths:
+            missing_results = self.remap.remap_batch(missing_paths, *args)
+            self.store.insert(
+                fingerprint_id,
+                (
+                    (path, result)
+                    for path, result in zip(missing_paths, missing_results)
+                    if _is_storable(path) and _is_storable(result)
+                ),
+            )
+            results.update(zip(missing_paths, missing_results))
+
+        self.hits += len(unique_paths) - len(missing_paths)
+        self.misses += len(missing_paths)
+        return [results[path] for path in input_paths]
+
+    def _get_fingerprint_id(self, args: tuple) -> int:
+        if isinstance(self.remap, MixedPlatformRemap):
+            if len(args) != 1:
+                raise ValueError(f"Destination platform should be given, given: {args}")
+            self.remap._validate_dst_platform(args[0])
+        elif args:
+            raise ValueError(
+                f"SimpleRemap takes no additional arguments, given: {args}"
+            )
+
+        # Mapping is replaced whenever it's updated.
+        if self.remap.mapping is not self._mapping:
+            self._mapping = self.remap.mapping
+            self._fingerprints = {}
+        fingerprint = self._fingerprints.get(args)
+        if fingerprint is None:
+            fingerprint = mapping_fingerprint(self.remap, *args)
+            self._fingerprints[args] = fingerprint
+        # Identifier is not cached, since fingerprint might be pruned (and its
+        # identifier reused) by other process. It's also marked as used this way.
+        return self.store.get_fingerprint_id(fingerprint)
@@ -0,0 +1,275 @@
+import mmap
+import os
+import pathlib
+import re
+import shutil
+import string
+import tempfile
+import typing
+
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .multi_pattern import MultiPatternAutomaton
+from .patterns import is_pattern, literal_root
+from .simple_remap import SimpleRemap
+from .utils import normalize_path, split_path
+
+ENCODING = "utf-8"
+ENCODING_ERRORS = "surrogateescape"
+CHUNK_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+# Bytes ending embedded path, e.g. quotes in Maya scenes or "@" in USD layers.
+# Space ends paths in formats without quotes (EDLs, command lines), so paths
+# containing spaces are cut (see TextRewrite).
+DEFAULT_TERMINATORS = b" \t\r\n\0\"'@<>|*?"
+# Path can't start right after these bytes, e.g. "/mnt" inside "/data/mnt".
+PATH_BYTES = frozenset((string.ascii_letters + string.digits + "_-.~$:/\\").encode())
+# Windows paths are matched case-insensitively and with both separators.
+FOLD_TABLE = bytes.maketrans(
+    (string.ascii_uppercase + "/").encode(), (string.ascii_lowercase + "\\").encode()
+)
+
+
+def _iter_roots(
+    remap: typing.Union[SimpleRemap, MixedPlatformRemap],
+    dst_platform: typing.Optional[str],
+) -> typing.Iterator[typing.Optional[str]]:
+    # Patterns are represented by their leading literal components,
+    # None is yielded for patterns starting with wildcards.
+    if isinstance(remap, MixedPlatformRemap):
+        remap.iter_remap((), dst_platform)
+        dst_paths = remap.mapping[dst_platform]
+        for platform, paths in remap.mapping.items():
+            if platform == dst_platform:
+                continue
+            yield from (
+                path for path, dst_path in zip(paths, dst_paths) if path and dst_path
+            )
+    else:
+        if dst_platform is not None:
+            raise ValueError(
+                "Destination platform can be used only with MixedPlatformRemap."
+            )
+        for sub_path, replacement in remap.mapping.items():
+            if not sub_path or not replacement:
+                continue
+            if is_pattern(sub_path):
+                yield literal_root(sub_path) or None
+            else:
+                yield sub_path
+
+
+class TextRewrite:
+    """Class for remapping paths embedded in text, e.g. scene files, EDLs or USD layers.
+
+    Text is scanned once, in chunks, for mapping roots with Aho-Corasick automaton
+    built from the mapping, so scanning cost doesn't depend on number of roots.
+    Windows roots are found in any case and with any separators ("L:\\", "l:/"),
+    POSIX roots are case-sensitive. Root is used only at the beginning of path,
+    i.e. "/mnt" in "/data/mnt" is not matched. Embedded path lasts until
+    one of terminators (quotes, whitespace, "@", ...) and is remapped by given remapper,
+    so results are the same as for separate paths. Paths which are not changed
+    by remapping (except for normalization) are left as they are.
+    Paths containing default terminators are cut, e.g. "P:\\My Project\\a.png"
+    lasts until the space, so with mapping to other path style the rest
+    of path keeps its separators ("/mnt/p/My Project\\a.png"). Terminators
+    without space should be given for text where paths are always quoted.
+    Pattern keys of SimpleRemap are found by their leading literal components,
+    so patterns starting with wildcards are not searched for.
+    Text is processed as bytes, so encoding of the rest of file is preserved.
+
+    Examples:
+        >>> rewrite = TextRewrite(SimpleRemap({"L:\\": "X:\\"}))
+        >>> rewrite(b'setAttr ".ftn" -type "string" "l:/textures/grass.tga";')
+        b'setAttr ".ftn" -type "string" "X:\\textures\\grass.tga";'
+        >>> rewrite.rewrite_file("scene.ma")
+        12
+
+    Attributes:
+        remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper used for remapping.
+        dst_platform (typing.Optional[str]): Destination platform for MixedPlatformRemap.
+        terminators (bytes): Bytes ending embedded paths.
+    """
+
+    def __init__(
+        self,
+        remap: typing.Union[SimpleRemap, MixedPlatformRemap],
+        dst_platform: typing.Optional[str] = None,
+        terminators: bytes = DEFAULT_TERMINATORS,
+    ):
+        """
+        Args:
+            remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Remapper to use.
+            dst_platform (typing.Optional[str]): Destination platform,
+                required by MixedPlatformRemap.
+            terminators (bytes): Bytes ending embedded paths. Space is among default
+                terminators, so paths with spaces are remapped only partially.
+        """
+        self.remap = remap
+        self.dst_platform = dst_platform
+        self.terminators = terminators
+        self._args = () if dst_platform is None else (dst_platform,)
+        self._terminator_pattern = re.compile(b"[" + re.escape(terminators) + b"]")
+
+        patterns = {}
+        for root in _iter_roots(remap, dst_platform):
+            if root is None:
+                continue
+            windows, parts = split_path(root)
+            if not parts:
+                continue
+            if windows:
+                pattern = str(pathlib.PureWindowsPath(*parts)).encode(ENCODING)
+                # Folded pattern is enough, there is nothing to verify.
+                patterns[(pattern.translate(FOLD_TABLE), None)] = None
+            else:
+                pattern = str(pathlib.PurePosixPath(*parts)).encode(ENCODING)
+                patterns[(pattern.translate(FOLD_TABLE), pattern)] = None
+
+        self._patterns = list(patterns)
+        self._automaton = MultiPatternAutomaton(
+            [folded_pattern for folded_pattern, _ in self._patterns]
+        )
+        self._first_byte_pattern = re.compile(
+            b"[" + re.escape(self._automaton.first_bytes) + b"]"
+            if self._patterns
+            else b"(?!)"
+        )
+
+    def __call__(self, data: bytes) -> bytes:
+        """
+        Args:
+            data (bytes): Text with embedded paths.
+
+        Returns:
+            bytes: Text with remapped paths.
+
+        """
+        return b"".join(self.iter_rewrite(data))
+
+    def iter_rewrite(
+        self, data: typing.Union[bytes, mmap.mmap]
+    ) -> typing.Iterator[bytes]:
+        """
+        Lazily rewrites text, so big (e.g. memory mapped) files can be written
+        to output without keeping whole result in memory.
+
+        Args:
+            data (typing.Union[bytes, mmap.mmap]): Text with embedded paths.
+
+        Yields:
+            bytes: consecutive fragments of rewritten text.
+
+        """
+        for text, replacement in self._iter_fragments(data):
+            yield text
+            if replacement is not None:
+                yield replacement
+
+    def rewrite_file(
+        self, input_path: str, output_path: typing.Optional[str] = None
+    ) -> int:
+        """
+        Rewrites memory mapped file. Result is written to temporary file first
+        and then moved to output path, so file can be safely rewritten in place.
+
+        Args:
+            input_path (str): Path of file to rewrite.
+            output_path (typing.Optional[str]): Path of output file,
+                by default input file is rewritten in place.
+
+        Returns:
+            int: Number of remapped paths.
+
+        """
+        output_path = input_path if output_path is None else output_path
+        remapped_count = 0
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(output_path))
+        )
+        try:
+            with open(
+                file_descriptor, "wb", buffering=WRITE_BUFFER_SIZE
+            ) as output, open(input_path, "rb") as file:
+                if os.fstat(file.fileno()).st_size:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        for text, replacement in self._iter_fragments(data):
+                            output.write(text)
+                            if replacement is not None:
+                                output.write(replacement)
+                                remapped_count += 1
+            shutil.copymode(input_path, temporary_path)
+            os.replace(temporary_path, output_path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        return remapped_count
+
+    def _iter_fragments(
+        self, data: typing.Union[bytes, mmap.mmap]
+    ) -> typing.Iterator[typing.Tuple[bytes, typing.Optional[bytes]]]:
+        # Yields unchanged text followed by replacement of path found after it.
+        transitions = self._automaton.transitions
+        outputs = self._automaton.outputs
+        initial_state = state = self._automaton.INITIAL_STATE
+        size = len(data)
+        written = position = 0
+
+        while position < size:
+            offset = position
+            folded = data[offset : offset + CHUNK_SIZE].translate(FOLD_TABLE)
+            length = len(folded)
+            position = offset + length
+            index = 0
+            while index < length:
+                if state == initial_state:
+                    match = self._first_byte_pattern.search(folded, index)
+                    if match is None:
+                        break
+                    index = match.start()
+
+                state = transitions[state].get(folded[index], initial_state)
+                index += 1
+                if not outputs[state]:
+                    continue
+
+                hit = self._find_path(data, outputs[state], offset + index)
+                if hit is None:
+                    continue
+
+                start, end, replacement = hit
+                yield data[written:start], replacement
+                written = end
+                state = initial_state
+                if end - offset >= length:
+                    # Path ends in one of next chunks.
+                    position = end
+                    break
+                index = end - offset
+
+        yield data[written:size], None
+
+    def _find_path(
+        self,
+        data: typing.Union[bytes, mmap.mmap],
+        pattern_ids: typing.List[int],
+        pattern_end: int,
+    ) -> typing.Optional[typing.Tuple[int, int, bytes]]:
+        for pattern_id in pattern_ids:
+            folded_pattern, pattern = self._patterns[pattern_id]
+            start = pattern_end - len(folded_pattern)
+            if start and data[start - 1] in PATH_BYTES:
+                continue
+            if pattern is not None and data[start:pattern_end] != pattern:
+                continue
+
+            terminator = self._terminator_pattern.search(data, pattern_end)
+            end = len(data) if terminator is None else terminator.start()
+            path = data[start:end].decode(ENCODING, ENCODING_ERRORS)
+            result = next(self.remap.iter_remap((path,), *self._args))
+            # SimpleRemap returns normalized path if it's not remapped.
+            if result == path or result == normalize_path(path):
+                continue
+            return start, end, result.encode(ENCODING, ENCODING_ERRORS)
+
+        return None
@@ -1,6 +1,23 @@
+import functools
+import time
 import typing
 
-from .utils import get_resolved_path, normalize_path, build_dst_path
+from .batch import BatchStats, remap_batch
+from .bytes_paths import BytesPath, BytesRoots, iter_remap_bytes, remap_buffer
+from .cache import LRUCache, CacheInfo, MISSING
+from .compact_result import CompactRemapResult
+from .instrumentation import Instrumentation
+from .patterns import PatternIndex, is_pattern
+from .prefix_index import PrefixIndex
+from .utils import (
+    get_resolved_path,
+    normalize_path,
+    is_windows_style_path,
+    is_relative_path,
+    split_path,
+    join_path,
+    _split_normalized_path,
+)
 
 
 class SimpleRemap:
@@ -12,10 +29,22 @@ class SimpleRemap:
     listed in mapping.
     It does not support relative paths on host machine, so only absolute paths are supported.
     Paths style and platform is recognised based on beginning of absolute path.
-    Windows style paths begins with "DISC_LETTER:\".
+    Windows style paths begins with "DISC_LETTER:\" or "\\\\SERVER\\SHARE" (UNC paths).
     POSIX (Linux/Mac/...) paths should begin with "/...", paths in form "~/dir" are not supported.
     Parent statements in input and mapping paths are be resolved, e.g. "/mnt/../mnt2" -> "/mnt2".
     It does support windows style multiplications of folders separator like "G:\\\\\\dir"
+    If several sub paths from mapping are parents of input path, the longest one is used.
+    Remapped paths have style of replacement, i.e. with Windows sub path mapped
+    to POSIX replacement "P:\\a\\b.tga" is remapped to "/mnt/a/b.tga" (and not
+    "/mnt/a\\b.tga" like in previous versions), just like in MixedPlatformRemap.
+
+    Keys with "glob:" prefix are glob patterns (see PatternIndex), e.g. per-show roots
+    "glob:P:\\show_{show}" with replacement "/mnt/shows/{show}". Literal keys are
+    matched with prefix index and patterns with single regex pass, which is skipped
+    when matched literal key is at least as long as all patterns. The longest
+    matching key (in number of components) is used, literal keys take precedence
+    over patterns of the same length and patterns of the same length are tried
+    in mapping order.
 
     Examples:
         >>> remap = SimpleRemap({"L:\": "X:\"})
@@ -24,16 +53,75 @@ class SimpleRemap:
 
     Attributes:
         mapping (typing.Dict[str, str]): Paths mapping. More information in __init__ doc.
+        instrumentation (typing.Optional[Instrumentation]): Collector of remapping statistics.
     """
 
-    def __init__(self, mapping: typing.Dict[str, str]):
+    def __init__(
+        self,
+        mapping: typing.Dict[str, str],
+        cache_size: int = 0,
+        instrumentation: typing.Optional[Instrumentation] = None,
+        *,
+        index: typing.Optional[PrefixIndex] = None,
+    ):
         """
         Args:
             mapping (typing.Dict[str, str]): Paths mapping.
                 Each key and value should represent sub path and it's replacement respectively,
                 i.e. { desired-sub-path-to-replace: replacement, ... }
+            cache_size (int): Maximum number of memoized results, 0 disables caching.
+                Results are memoized separately for whole input paths and for
+                mapping lookups of their parent directories, least recently used
+                results are evicted first.
+            instrumentation (typing.Optional[Instrumentation]): Collector of remapping
+                statistics, it can be also attached and detached later.
+                Without it no statistics are collected and remapping is not slowed down.
+            index (typing.Optional[PrefixIndex]): Prebuilt index of literal keys
+                of the mapping (e.g. loaded by load_compiled), by default it's built
+                from the mapping.
         """
         self.mapping = mapping
+        self.instrumentation = instrumentation
+        self._path_cache = LRUCache(cache_size) if cache_size else None
+        self._directory_cache = LRUCache(cache_size) if cache_size else None
+        self._patterns = self._build_patterns(mapping)
+        self._bytes_roots = {}
+        self._index = self._build_index(mapping) if index is None else index
+
+    @classmethod
+    def _build_index(cls, mapping: typing.Dict[str, str]) -> PrefixIndex:
+        index = PrefixIndex()
+        for sub_path, replacement in mapping.items():
+            if is_pattern(sub_path):
+                continue
+            value = cls._index_value(sub_path, replacement)
+            if value is not None:
+                index.add(*split_path(sub_path), value)
+        return index
+
+    @staticmethod
+    def _build_patterns(
+        mapping: typing.Dict[str, str]
+    ) -> typing.Optional[PatternIndex]:
+        entries = [
+            (sub_path, replacement)
+            for sub_path, replacement in mapping.items()
+            if is_pattern(sub_path) and replacement
+        ]
+        return PatternIndex(entries) if entries else None
+
+    @staticmethod
+    def _index_value(
+        sub_path: str, replacement: typing.Optional[str]
+    ) -> typing.Optional[typing.Tuple[str, str, bool]]:
+        if not sub_path or not replacement:
+            return None
+        replacement = normalize_path(replacement)
+        return (
+            sub_path,
+            str(get_resolved_path(replacement)),
+            is_windows_style_path(replacement),
+        )
 
     def __call__(self, input_paths: typing.List[str]) -> typing.List[str]:
         """
@@ -44,23 +132,340 @@ class SimpleRemap:
             typing.List[str]: List of remapped input paths
 
         """
-        result = []
+        return list(self.iter_remap(input_paths))
+
+    def iter_remap(self, input_paths: typing.Iterable[str]) -> typing.Iterator[str]:
+        """
+        Lazily remaps paths from any iterable, so whole input never has to be kept in memory.
+        Note that items are used as they are, e.g. lines read from file should be
+        stripped from line breaks first.
+
+        Examples:
+            >>> with open("paths.txt") as file:
+            ...     for path in remap.iter_remap(line.rstrip("\\n") for line in file):
+            ...         print(path)
+
+        Args:
+            input_paths (typing.Iterable[str]): Input paths to remap.
+
+        Yields:
+            str: remapped input paths, in the same order as input paths.
+
+        """
+        remap_path = (
+            self._remap_path
+            if self.instrumentation is None
+            else self._remap_instrumented_path
+        )
+        if self._path_cache is not None:
+            remap_path = functools.partial(self._remap_cached_path, remap_path)
+        return map(remap_path, input_paths)
+
+    def remap_batch(
+        self,
+        input_paths: typing.Sequence[str],
+        stats: typing.Optional[BatchStats] = None,
+    ) -> typing.List[str]:
+        """
+        Remaps big lists with repeated paths and many files in the same directories.
+        Each unique path is remapped once and mapping is looked up once
+        for each parent directory, then basenames are appended to its result.
+        Results are the same as results of __call__.
+        Path cache and instrumentation are not used in batch mode.
+
+        Args:
+            input_paths (typing.Sequence[str]): Input paths to remap.
+            stats (typing.Optional[BatchStats]): Collector of deduplication statistics.
+
+        Returns:
+            typing.List[str]: List of remapped input paths
+
+        """
+        return remap_batch(input_paths, self._remap_path, self._remap_directory, stats)
 
+    def remap_compact(self, input_paths: typing.Sequence[str]) -> CompactRemapResult:
+        """
+        Remaps paths, but instead of list of strings returns compact sequence,
+        which builds remapped paths only when they are accessed.
+        It uses a fraction of memory needed for list of remapped paths,
+        when only part of them is used or they are streamed somewhere.
+        Path cache and instrumentation are not used.
+
+        Args:
+            input_paths (typing.Sequence[str]): Input paths to remap.
+                The sequence is referenced by result, so it should not be modified.
+
+        Returns:
+            CompactRemapResult: Sequence of remapped input paths
+
+        """
+        result = CompactRemapResult(input_paths, self._remap_path)
         for input_path in input_paths:
-            input_path = normalize_path(input_path)
-            matching_parent_path, dst_path = next(
-                filter(
-                    lambda v: get_resolved_path(v[0])
-                    in get_resolved_path(input_path).parents,
-                    self.mapping.items(),
-                ),
-                (None, None),
+            normalized_path = normalize_path(input_path)
+            windows, parts = _split_normalized_path(normalized_path)
+            match = self._find_match(windows, parts)
+            if match is None:
+                if normalized_path == input_path:
+                    result.append_unchanged()
+                else:
+                    result.append_remapped_on_access()
+            else:
+                depth, (_, dst_path, dst_windows) = match
+                result.append_match(
+                    input_path, windows, parts[depth:], dst_path, dst_windows
+                )
+        return result
+
+    def remap_bytes(
+        self, input_paths: typing.Iterable[BytesPath]
+    ) -> typing.List[bytes]:
+        """
+        Remaps paths given as bytes (e.g. POSIX file names), without decoding them.
+        Results are the same as results of __call__ for paths decoded
+        from UTF-8 (undecodable bytes are kept unchanged) and encoded back.
+        Mapping is looked up once per directory and path cache
+        and instrumentation are not used.
+
+        Args:
+            input_paths (typing.Iterable[BytesPath]): Input paths to remap,
+                bytes, bytearray or memoryview objects (copied to bytes).
+
+        Returns:
+            typing.List[bytes]: List of remapped input paths
+
+        """
+        return list(
+            iter_remap_bytes(input_paths, self._get_bytes_roots(), self._remap_path)
+        )
+
+    def remap_buffer(
+        self, buffer: BytesPath, output: typing.Optional[bytearray] = None
+    ) -> bytearray:
+        """
+        Remaps NUL delimited paths, e.g. output of "find -print0", see remap_bytes.
+
+        Examples:
+            >>> remap = SimpleRemap({"/mnt/storage1": "/mnt2"})
+            >>> remap.remap_buffer(b"/mnt/storage1/a\\0/mnt/storage1/b\\0")
+            bytearray(b"/mnt2/a\\x00/mnt2/b\\x00")
+
+        Args:
+            buffer (BytesPath): NUL delimited input paths.
+            output (typing.Optional[bytearray]): Buffer to which remapped paths
+                are appended, new buffer is created by default.
+
+        Returns:
+            bytearray: Output buffer with NUL delimited remapped paths.
+
+        """
+        return remap_buffer(buffer, self._get_bytes_roots(), self._remap_path, output)
+
+    def _get_bytes_roots(self) -> BytesRoots:
+        # Dictionary is bound before the index is read, see _reset_caches.
+        bytes_roots = self._bytes_roots
+        roots = bytes_roots.get(None)
+        if roots is None:
+            patterns = self._patterns
+            roots = bytes_roots[None] = BytesRoots(
+                self._index,
+                self._lookup_posix,
+                fallback=patterns is not None and patterns.max_depths[False] > 0,
             )
-            if not matching_parent_path or not dst_path:
-                result.append(input_path)
-                continue
+        return roots
+
+    def _lookup_posix(
+        self, parts: typing.Tuple[str, ...]
+    ) -> typing.Optional[typing.Tuple[int, str, bool]]:
+        match = self._lookup_match(False, parts)
+        return None if match is None else (match[0], *match[1][1:])
+
+    def add_entry(self, sub_path: str, replacement: str):
+        """
+        Adds mapping entry. Lookup structures are updated incrementally,
+        in single step, so concurrent remapping sees either previous or updated
+        mapping. Caches are cleared, since results of remapping might change.
+
+        Args:
+            sub_path (str): Sub path to replace, which is not in mapping yet.
+            replacement (str): Its replacement.
+        """
+        if sub_path in self.mapping:
+            raise ValueError(f"Sub path '{sub_path}' is already in mapping.")
+        self._update_entry(sub_path, replacement)
+
+    def replace_entry(self, sub_path: str, replacement: str):
+        """
+        Replaces replacement of mapping entry, see add_entry.
+
+        Args:
+            sub_path (str): Sub path from mapping.
+            replacement (str): Its new replacement.
+        """
+        if sub_path not in self.mapping:
+            raise ValueError(f"Sub path '{sub_path}' is not in mapping.")
+        self._update_entry(sub_path, replacement)
+
+    def remove_entry(self, sub_path: str):
+        """
+        Removes mapping entry, see add_entry.
+
+        Args:
+            sub_path (str): Sub path from mapping.
+        """
+        if sub_path not in self.mapping:
+            raise ValueError(f"Sub path '{sub_path}' is not in mapping.")
+        self._update_entry(sub_path, None)
+
+    def _update_entry(self, sub_path: str, replacement: typing.Optional[str]):
+        mapping = dict(self.mapping)
+        if replacement is None:
+            del mapping[sub_path]
+        else:
+            mapping[sub_path] = replacement
+
+        if is_pattern(sub_path):
+            # Patterns are compiled together, so they are built again.
+            self._patterns = self._build_patterns(mapping)
+        else:
+            value = self._index_value(sub_path, self.mapping.get(sub_path))
+            new_value = self._index_value(sub_path, replacement)
+            windows, parts = split_path(sub_path)
+            if value is not None and new_value is not None:
+                self._index.replace(windows, parts, value, new_value)
+            elif new_value is not None:
+                self._index.add(windows, parts, new_value)
+            elif value is not None:
+                self._index.remove(windows, parts, value)
+
+        self.mapping = mapping
+        self._reset_caches()
+
+    def _reset_caches(self):
+        # Caches are replaced after the index, and remapping reads them before
+        # the index, so results of previous mapping never get into new caches.
+        self._bytes_roots = {}
+        if self._path_cache is not None:
+            self._directory_cache = LRUCache(self._directory_cache.max_size)
+            self._path_cache = LRUCache(self._path_cache.max_size)
+
+    def cache_info(self) -> typing.Dict[str, CacheInfo]:
+        """
+        Returns:
+            typing.Dict[str, CacheInfo]: Statistics of "paths" and "directories" caches.
+                Empty if caching is disabled.
+
+        """
+        if self._path_cache is None:
+            return {}
+        return {
+            "paths": self._path_cache.info(),
+            "directories": self._directory_cache.info(),
+        }
+
+    def cache_clear(self):
+        if self._path_cache is not None:
+            self._path_cache.clear()
+            self._directory_cache.clear()
+
+    def _remap_cached_path(
+        self, remap_path: typing.Callable[[str], str], input_path: str
+    ) -> str:
+        path_cache = self._path_cache
+        result = path_cache.get(input_path)
+        if result is None:
+            result = remap_path(input_path)
+            path_cache.put(input_path, result)
+        return result
+
+    def _find_match(
+        self, windows: bool, parts: typing.Tuple[str, ...]
+    ) -> typing.Optional[typing.Tuple[int, typing.Tuple[str, str, bool]]]:
+        directory_cache = self._directory_cache
+        if directory_cache is None:
+            return self._lookup_match(windows, parts)
+
+        # Matching mapping entry depends only on parent directory of path.
+        key = (windows, parts[:-1])
+        match = directory_cache.get(key, MISSING)
+        if match is MISSING:
+            match = self._lookup_match(windows, parts)
+            directory_cache.put(key, match)
+        return match
+
+    def _lookup_match(
+        self, windows: bool, parts: typing.Tuple[str, ...]
+    ) -> typing.Optional[typing.Tuple[int, typing.Tuple[str, str, bool]]]:
+        patterns = self._patterns
+        match = next(self._index.iter_matches(windows, parts), None)
+        if patterns is None:
+            return match
+        # Literal keys take precedence over patterns of the same length.
+        pattern_match = patterns.match(windows, parts, 0 if match is None else match[0])
+        return match if pattern_match is None else pattern_match
+
+    def _iter_matches(
+        self, windows: bool, parts: typing.Tuple[str, ...]
+    ) -> typing.Iterator[typing.Tuple[int, typing.Tuple[str, str, bool]]]:
+        # All matching keys, in order of precedence (see _lookup_match).
+        matches = self._index.iter_matches(windows, parts)
+        patterns = self._patterns
+        if patterns is None:
+            return matches
+        return iter(
+            sorted(
+                [*matches, *patterns.iter_matches(windows, parts)],
+                key=lambda match: (-match[0], is_pattern(match[1][0])),
+            )
+        )
+
+    def _remap_path(self, input_path: str) -> str:
+        input_path = normalize_path(input_path)
+        windows, parts = _split_normalized_path(input_path)
+        match = self._find_match(windows, parts)
+        if match is None:
+            return input_path
+
+        depth, (_, dst_path, dst_windows) = match
+        return join_path(dst_path, parts[depth:], dst_windows)
+
+    def _remap_directory(
+        self, directory: str, basenames: typing.List[str]
+    ) -> typing.List[str]:
+        directory = normalize_path(directory)
+        windows, parts = _split_normalized_path(directory)
+        # Basename placeholder, matching entries are parents of the basename.
+        match = self._find_match(windows, parts + ("",))
+        if match is None:
+            return [directory + basename for basename in basenames]
+
+        depth, (_, dst_path, dst_windows) = match
+        sub_parts = parts[depth:]
+        return [
+            join_path(dst_path, sub_parts + (basename,), dst_windows)
+            for basename in basenames
+        ]
+
+    def _remap_instrumented_path(self, input_path: str) -> str:
+        # Timed copy of _remap_path, so there is no overhead when instrumentation is off.
+        clock = time.perf_counter
+        start = clock()
+        normalized_path = normalize_path(input_path)
+        windows, parts = _split_normalized_path(normalized_path)
+        normalized = clock()
+        match = self._find_match(windows, parts)
+        matched = clock()
 
-            dst_path = normalize_path(dst_path)
-            result.append(build_dst_path(input_path, matching_parent_path, dst_path))
+        if match is None:
+            result, sub_path = normalized_path, None
+        else:
+            depth, (sub_path, dst_path, dst_windows) = match
+            result = join_path(dst_path, parts[depth:], dst_windows)
 
+        self.instrumentation.record(
+            input_path,
+            result,
+            sub_path,
+            is_relative_path(windows, parts),
+            (normalized - start, matched - normalized, clock() - matched),
+        )
         return result
@@ -1,15 +1,128 @@
 import pathlib
 import re
+import string
+import typing
 
 WINDOWS_PARENT_PATH_PATTERN = re.compile(r"(/|\\).[^\.\./\\]*(/|\\)\.\.")
 POSIX_PARENT_PATH_PATTERN = re.compile(r"(/).[^\.\./]*(/)\.\.")
+WINDOWS_MULTIPLE_SEPARATORS_PATTERN = re.compile(r"[/\\]{2}")
 MULTIPLE_BACKSLASHES_PATTERN = re.compile(r"\\+")
 MULTIPLE_SLASHES_PATTERN = re.compile(r"/+")
 WINDOWS_PATH_INDICATOR = re.compile(r"[\w]\:")
+# Server and share of UNC path, e.g. "\\\\server\\share", separators might be
+# multiplied or mixed, just like in the rest of path.
+UNC_ANCHOR_PATTERN = re.compile(r"\\\\([^/\\]+)[/\\]+([^/\\]+)")
+
+WINDOWS_SEPARATORS = "/\\"
+POSIX_SEPARATORS = "/"
+DRIVE_LETTERS = frozenset(string.ascii_letters)
 
 
 def is_windows_style_path(path: str) -> bool:
-    return bool(WINDOWS_PATH_INDICATOR.search(path))
+    # Substring checks are much faster than regex search for POSIX paths.
+    if ":" in path and WINDOWS_PATH_INDICATOR.search(path):
+        return True
+    return path[:2] == "\\\\" and bool(UNC_ANCHOR_PATTERN.match(path))
+
+
+def _collapse_parent_statements(path: str, separators: str) -> str:
+    # Single pass equivalent of repeatedly removing all matches of
+    # "(sep).[^.sep]*(sep)\.\." from path, until there is nothing left to remove.
+    # Text is copied to output and every time ".." appears in output (also as a result
+    # of previous removal), the preceding part of output is checked for the
+    # "(sep).[^.sep]*(sep)" part of pattern. It is already free of matches,
+    # so checking only the end of output is enough. Removed text never contains
+    # dots of not removed ".." statement, so every char is scanned at most twice.
+    output = []
+    chunks = path.split(".")
+    output.extend(chunks[0])
+
+    for chunk in chunks[1:]:
+        end = len(output) - 2
+        start = None
+        if end > 0 and output[end + 1] == "." and output[end] in separators:
+            name_start = end
+            while name_start and (
+                output[name_start - 1] not in separators
+                and output[name_start - 1] != "."
+            ):
+                name_start -= 1
+            # Just like in regex search, the leftmost possible beginning
+            # of match is chosen. Both "." and "[^.sep]" match new line chars,
+            # only the "." does not.
+            if name_start >= 2 and output[name_start - 2] in separators:
+                start = name_start - 2
+            elif (
+                end > name_start >= 1
+                and output[name_start - 1] in separators
+                and output[name_start] != "\n"
+            ):
+                start = name_start - 1
+
+        if start is None:
+            output.append(".")
+        else:
+            del output[start:]
+        output.extend(chunk)
+
+    return "".join(output)
+
+
+def _collapse_parent_statements_in_rounds(path: str, separators: str) -> str:
+    # Variant of _collapse_parent_statements for paths with multiplied separators.
+    # There "(sep)(sep)name(sep).." might also match without its first separator
+    # and regex picks the longer match only if both are present within the same
+    # substitution. For every char of output the round of substitution, after which
+    # it follows the preceding char, is stored, so the choice can be repeated.
+    output = []
+    rounds = []
+    joined = 0
+    chunks = path.split(".")
+    output.extend(chunks[0])
+    rounds.extend([0] * len(chunks[0]))
+
+    for chunk in chunks[1:]:
+        end = len(output) - 2
+        start = None
+        if end > 0 and output[end + 1] == "." and output[end] in separators:
+            name_start = end
+            while name_start and (
+                output[name_start - 1] not in separators
+                and output[name_start - 1] != "."
+            ):
+                name_start -= 1
+            longer = name_start >= 2 and output[name_start - 2] in separators
+            shorter = (
+                end > name_start >= 1
+                and output[name_start - 1] in separators
+                and output[name_start] != "\n"
+            )
+            if longer and shorter:
+                shorter_round = max(max(rounds[name_start:]), joined) + 1
+                longer = rounds[name_start - 1] < shorter_round
+            if longer:
+                start = name_start - 2
+            elif shorter:
+                start = name_start - 1
+
+        if start is None:
+            output.append(".")
+            rounds.append(joined)
+            joined = 0
+        else:
+            # Chars around the removed text follow each other after its removal,
+            # but not earlier than the first removed char followed the preceding one.
+            removal_round = max(max(rounds[start + 1 :]), joined) + 1
+            joined = max(rounds[start], removal_round)
+            del output[start:]
+            del rounds[start:]
+        if chunk:
+            output.extend(chunk)
+            rounds.append(joined)
+            rounds.extend([0] * (len(chunk) - 1))
+            joined = 0
+
+    return "".join(output)
 
 
 # This method was defined to resolve parent path symbols regardless of host system
@@ -19,6 +132,8 @@ def normalize_path(path: str) -> str:
     Resolves parent path symbols in path (e.g. "/mnt/../some_path") and
     normalizes multiplied slashes and backslashes (e.g. G:\\\\\\some_dir)
     Please not that relative paths like "../some_pah/" won't be resolved.
+    Server and share of UNC paths (e.g. "\\\\server\\share\\..") are kept,
+    just like drive of other Windows paths.
 
     Args:
     path (str): input path, in which parent paths should be normalized.
@@ -27,21 +142,44 @@ def normalize_path(path: str) -> str:
         str: resolved path
 
     """
+    if path[:2] == "\\\\":
+        anchor = UNC_ANCHOR_PATTERN.match(path)
+        if anchor is not None:
+            # The rest of path starts with separator (or is empty),
+            # so parent statements never remove the share.
+            return "\\\\{}\\{}".format(*anchor.groups()) + _normalize_path(
+                path[anchor.end() :], True
+            )
+    return _normalize_path(path)
 
-    parent_path_pattern = (
-        WINDOWS_PARENT_PATH_PATTERN
-        if is_windows_style_path(path)
-        else POSIX_PARENT_PATH_PATTERN
-    )
 
-    # This could be done by pathlib.Path.resolve method but it would be impossible
-    # to handle paths from different platforms than host.
-    while parent_path_pattern.search(path):
-        path = parent_path_pattern.sub("", path)
+def _normalize_path(path: str, windows: typing.Optional[bool] = None) -> str:
+    if ".." in path:
+        if windows is None:
+            windows = is_windows_style_path(path)
+        if windows:
+            separators = WINDOWS_SEPARATORS
+            regular = not WINDOWS_MULTIPLE_SEPARATORS_PATTERN.search(path)
+        else:
+            separators = POSIX_SEPARATORS
+            regular = "//" not in path
 
-    path = MULTIPLE_BACKSLASHES_PATTERN.sub(
-        r"\\", MULTIPLE_SLASHES_PATTERN.sub("/", path)
-    )
+        # Both give the same result as repeated substitution of parent path pattern
+        # (WINDOWS_PARENT_PATH_PATTERN or POSIX_PARENT_PATH_PATTERN) in linear time.
+        # This could be done by pathlib.Path.resolve method but it would be impossible
+        # to handle paths from different platforms than host.
+        if regular:
+            path = _collapse_parent_statements(path, separators)
+        else:
+            # With multiplied separators result depends on order of removal.
+            path = _collapse_parent_statements_in_rounds(path, separators)
+
+    # Substring checks are much cheaper than regex substitution for majority of paths,
+    # which do not contain multiplied separators at all.
+    if "//" in path:
+        path = MULTIPLE_SLASHES_PATTERN.sub("/", path)
+    if "\\\\" in path:
+        path = MULTIPLE_BACKSLASHES_PATTERN.sub(r"\\", path)
 
     return path
 
@@ -66,6 +204,175 @@ def get_resolved_path(path: str) -> pathlib.PurePath:
     return resolver(normalize_path(path))
 
 
+def _split_windows_path(path: str) -> typing.Tuple[str, typing.Tuple[str, ...]]:
+    path = path.replace("/", "\\")
+    if path[:2] == "\\\\" or (path[1:2] == ":" and path[:1] not in DRIVE_LETTERS):
+        # UNC paths and unusual drives are parsed differently across python versions.
+        resolved_path = pathlib.PureWindowsPath(path)
+        parts = resolved_path.parts
+        return resolved_path.anchor, parts[1:] if resolved_path.anchor else parts
+
+    anchor = ""
+    if path[1:2] == ":":
+        anchor, path = path[:2], path[2:]
+    if path[:1] == "\\":
+        anchor += "\\"
+        path = path.lstrip("\\")
+
+    parts = path.split("\\")
+    if "" in parts or "." in parts:
+        parts = [part for part in parts if part and part != "."]
+    return anchor, tuple(parts)
+
+
+def _split_posix_path(path: str) -> typing.Tuple[str, typing.Tuple[str, ...]]:
+    anchor = ""
+    if path[:1] == "/":
+        anchor = "//" if path[:2] == "//" and path[:3] != "///" else "/"
+        path = path.lstrip("/")
+
+    parts = path.split("/")
+    if "" in parts or "." in parts:
+        parts = [part for part in parts if part and part != "."]
+    return anchor, tuple(parts)
+
+
+def _split_path(path: str) -> typing.Tuple[bool, str, typing.Tuple[str, ...]]:
+    windows = is_windows_style_path(path)
+    path = normalize_path(path)
+    return (windows, *(_split_windows_path if windows else _split_posix_path)(path))
+
+
+def split_path(path: str) -> typing.Tuple[bool, typing.Tuple[str, ...]]:
+    """
+    String based equivalent of get_resolved_path, which does not create PurePath objects.
+    Examples:
+        >>> split_path("p:/project1/../project2\\textures")
+        (True, ("p:\\", "project2", "textures"))
+
+    Args:
+    path (str): path to resolve.
+
+    Returns:
+        typing.Tuple[bool, typing.Tuple[str, ...]]: whether path is Windows style path
+            and components of resolved path, the same as PurePath.parts.
+
+    """
+    windows, anchor, parts = _split_path(path)
+    return windows, (anchor,) + parts if anchor else parts
+
+
+def _split_normalized_path(path: str) -> typing.Tuple[bool, typing.Tuple[str, ...]]:
+    # split_path of path, which was already normalized and must not be normalized
+    # again. Second normalization might remove parent statements left by the first
+    # one (e.g. "/mnt/a//../b" -> "/mnt/a/../b" -> "/mnt/b").
+    windows = is_windows_style_path(path)
+    anchor, parts = (_split_windows_path if windows else _split_posix_path)(path)
+    return windows, (anchor,) + parts if anchor else parts
+
+
+def split_bytes_path(path: bytes) -> typing.Optional[typing.Tuple[bytes, ...]]:
+    """
+    Bytes equivalent of split_path for POSIX style paths, which are not changed
+    by normalization, so path is split without decoding.
+    Examples:
+        >>> split_bytes_path(b"/mnt/storage1/./temp/")
+        (b"/", b"mnt", b"storage1", b"temp")
+        >>> split_bytes_path(b"/mnt/storage1/../temp")
+
+    Args:
+    path (bytes): path to split.
+
+    Returns:
+        typing.Optional[typing.Tuple[bytes, ...]]: components of path, None if path
+            contains colons, parent statements or multiplied separators,
+            so it should be decoded and split as str.
+
+    """
+    if b":" in path or b".." in path or b"//" in path or b"\\\\" in path:
+        return None
+
+    anchor = ()
+    if path[:1] == b"/":
+        anchor, path = (b"/",), path[1:]
+    parts = path.split(b"/")
+    if b"" in parts or b"." in parts:
+        parts = [part for part in parts if part and part != b"."]
+    return (*anchor, *parts)
+
+
+def is_relative_path(windows: bool, parts: typing.Sequence[str]) -> bool:
+    """
+    Args:
+    windows (bool): whether path is Windows style path.
+    parts (typing.Sequence[str]): components of resolved path (see split_path).
+
+    Returns:
+        bool: whether path is relative, i.e. it has no drive nor root.
+
+    """
+    if not parts:
+        return True
+    if windows:
+        return parts[0][-1:] != "\\" and parts[0][1:2] != ":"
+    return parts[0][-1:] != "/"
+
+
+def is_unusual_windows_path(path: str) -> bool:
+    """
+    Args:
+    path (str): resolved Windows style path.
+
+    Returns:
+        bool: whether path is relative to drive, UNC path or path with unusual drive,
+            which are joined with components by PureWindowsPath in join_path
+            (the condition is inlined there, since join_path is called for every path).
+
+    """
+    return (
+        path[1:2] == ":" and (path[:1] not in DRIVE_LETTERS or path[2:3] != "\\")
+    ) or path[:2] == "\\\\"
+
+
+def join_path(path: str, sub_parts: typing.Sequence[str], windows: bool) -> str:
+    """
+    String based equivalent of str(PurePath(path).joinpath(*sub_parts)),
+    which does not create PurePath objects.
+    Please note that path should be already resolved (e.g. str(get_resolved_path(...)))
+    and sub parts should be path components (e.g. from split_path).
+
+    Args:
+    path (str): resolved path to join components to.
+    sub_parts (typing.Sequence[str]): components to append to path.
+    windows (bool): whether path is Windows style path.
+
+    Returns:
+        str: joined path
+
+    """
+    separator = "\\" if windows else "/"
+    sub_path = separator.join(sub_parts)
+    if windows and (
+        ":" in sub_path
+        or "/" in sub_path
+        or sub_path.count("\\") != max(len(sub_parts) - 1, 0)
+        or (path[1:2] == ":" and (path[:1] not in DRIVE_LETTERS or path[2:3] != "\\"))
+        or path[:2] == "\\\\"
+    ):
+        # Such values would be parsed as drives or paths by PureWindowsPath.
+        # Relative to drive, UNC paths and unusual drives are also parsed differently
+        # across python versions.
+        return str(pathlib.PureWindowsPath(path).joinpath(*sub_parts))
+
+    if not sub_parts:
+        return path
+    if path == ".":
+        return sub_path
+    if path[-1:] == separator:
+        return path + sub_path
+    return path + separator + sub_path
+
+
 def build_dst_path(input_path: str, part_to_replace: str, replacement_path: str) -> str:
     """
     Replaces beginning part of input path with given replacement.
@@ -88,5 +395,18 @@ def build_dst_path(input_path: str, part_to_replace: str, replacement_path: str)
     if is_windows_style_path(input_path):
         sub_path = sub_path.lstrip("\\")
 
-    replacement_path = get_resolved_path(replacement_path)
-    return str(replacement_path.joinpath(sub_path))
+    windows, anchor, parts = _split_path(replacement_path)
+    sub_anchor, sub_parts = (_split_windows_path if windows else _split_posix_path)(
+        sub_path
+    )
+    separator = "\\" if windows else "/"
+    path = anchor + separator.join(parts) if anchor else separator.join(parts) or "."
+    if sub_anchor or (
+        windows
+        and (":" in sub_path or (not anchor and ":" in path) or anchor[:2] == "\\\\")
+    ):
+        # Such paths would be parsed as drives or absolute paths by PureWindowsPath
+        # and UNC path can't be safely formatted and parsed again.
+        return str(get_resolved_path(replacement_path).joinpath(sub_path))
+
+    return join_path(path, sub_parts, windows)
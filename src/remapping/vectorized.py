@@ -0,0 +1,427 @@
+"""Vectorized remapping of NumPy string arrays, available only when NumPy is installed."""
+import itertools
+import typing
+
+import numpy as np
+
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .simple_remap import SimpleRemap
+from .utils import DRIVE_LETTERS, is_unusual_windows_path
+
+# Number of paths processed at once, it bounds memory used by intermediate arrays.
+CHUNK_SIZE = 1 << 14
+# Entries of roots, which are not described by destination prefix and suffix offset.
+NO_MATCH = -1
+FALLBACK = -2
+SLASH, BACKSLASH, COLON, DOT = map(ord, "/\\:.")
+
+
+def _build_categories() -> np.ndarray:
+    categories = np.full(0x110000, _NON_ASCII, dtype=np.uint16)
+    categories[:0x80] = _OTHER
+    categories[0] = _END
+    categories[[SLASH, BACKSLASH, DOT, COLON]] = [_SLASH, _BACKSLASH, _DOT, _COLON]
+    return categories
+
+
+def _build_irregular_triples() -> np.ndarray:
+    # Whether character (b) with its neighbours (a, c) makes path irregular,
+    # i.e. changed by normalization, split differently than by separators
+    # or not handled by vectorized lookup. Index has style bit and 3 bits per category.
+    irregular = np.zeros(1 << 10, dtype=bool)
+    for windows in (False, True):
+        separators = {_SLASH, _BACKSLASH} if windows else {_SLASH}
+        for a, b, c in itertools.product(range(8), repeat=3):
+            irregular[windows << 9 | a << 6 | b << 3 | c] = (
+                b == _COLON
+                or (windows and b == _NON_ASCII)
+                # Empty path, NUL character, parent statement.
+                or (a == _START and b == _END)
+                or (b == _END and c != _END)
+                or (b == _DOT and c == _DOT)
+                # Multiplied or trailing separators.
+                or (b in separators and (c in separators or c == _END))
+                or (b == _BACKSLASH and c == _BACKSLASH)
+                # "." component.
+                or (
+                    b == _DOT
+                    and (a in separators or a == _START)
+                    and (c in separators or c == _END)
+                )
+            )
+    return irregular
+
+
+_OTHER, _SLASH, _BACKSLASH, _DOT, _COLON, _NON_ASCII, _START, _END = range(8)
+# Category of each code point, path end is marked by padding NUL characters.
+_CATEGORIES = _build_categories()
+_IRREGULAR_TRIPLES = _build_irregular_triples()
+# Lowercase with backslashes, for ASCII Windows paths.
+_WINDOWS_KEY_CODES = np.arange(0x80, dtype=np.uint32)
+_WINDOWS_KEY_CODES[ord("A") : ord("Z") + 1] += 0x20
+_WINDOWS_KEY_CODES[SLASH] = BACKSLASH
+
+Remap = typing.Union[SimpleRemap, MixedPlatformRemap]
+
+
+class _Roots(typing.NamedTuple):
+    # Sorted keys of mapping roots and their entries.
+    keys: np.ndarray
+    key_codes: np.ndarray
+    key_lengths: np.ndarray
+    entries: np.ndarray
+    # Destination prefix, offset of remapped suffix in input path
+    # and destination style of each entry.
+    prefix_codes: np.ndarray
+    prefix_lengths: np.ndarray
+    offsets: np.ndarray
+    dst_windows: np.ndarray
+    # Whether Windows and POSIX paths are matched by patterns of SimpleRemap.
+    windows_patterns: bool
+    posix_patterns: bool
+
+
+def _root_key(windows: bool, parts: typing.Sequence[str]) -> typing.Optional[str]:
+    # Key is the root with trailing separator, so it's a prefix of keys of all paths
+    # placed under the root. Roots which never match simple paths have no key.
+    if not parts:
+        return None
+    if windows:
+        anchor = parts[0]
+        if len(anchor) != 3 or anchor[0] not in DRIVE_LETTERS or anchor[1:] != ":\\":
+            return None
+        return anchor + "".join(part + "\\" for part in parts[1:])
+    if parts[0][:1] == "/":
+        if parts[0] != "/":
+            return None
+        return "/" + "".join(part + "/" for part in parts[1:])
+    return "".join(part + "/" for part in parts)
+
+
+def _to_codes(strings: typing.List[str]) -> np.ndarray:
+    width = max(map(len, strings), default=0) or 1
+    array = np.array(strings, dtype=f"<U{width}")
+    return array.view(np.uint32).reshape(len(strings), width)
+
+
+class VectorizedRemap:
+    """Class for remapping NumPy arrays of paths with vectorized operations.
+
+    It gives exactly the same results as wrapped remapper, but most paths
+    are remapped without looping over them in Python:
+
+    - paths which are not changed by normalization (no parent statements,
+      multiplied separators, "." components etc.) are recognised in bulk,
+    - mapping roots are sorted and the longest root of each path is found
+      with binary search (numpy.searchsorted) over the whole array at once,
+    - remapped paths are built by copying destination prefix and translated
+      suffix of input path between character arrays.
+
+    Remaining paths (e.g. "p:/project1/../textures", UNC paths) and paths of styles
+    matched by pattern keys of SimpleRemap are remapped by the wrapped remapper.
+    Mapping changes of wrapped remapper are taken into account.
+    Please note that NumPy string arrays can't store trailing NUL characters.
+
+    Examples:
+        >>> remap = VectorizedRemap(MixedPlatformRemap(mapping))
+        >>> remap(numpy.array(["L:\\temp", "cache\\Tree.abc"]), "Linux")
+        array(['/mnt/storage1/temp', 'cache\\Tree.abc'], dtype='<U18')
+
+    Attributes:
+        remap (Remap): Wrapped remapper, SimpleRemap or MixedPlatformRemap.
+    """
+
+    def __init__(self, remap: Remap):
+        """
+        Args:
+            remap (Remap): Remapper used to prepare lookup arrays and
+                to remap paths which are not handled by vectorized operations.
+        """
+        self.remap = remap
+        self._mapping = None
+        self._roots = {}
+
+    def __call__(self, input_paths: typing.Sequence[str], *args) -> np.ndarray:
+        """
+        Args:
+            input_paths (typing.Sequence[str]): Input paths to remap,
+                e.g. NumPy array of strings or objects, pandas Series or list.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            np.ndarray: Array of remapped input paths.
+
+        """
+        roots = self._get_roots(args)
+        if isinstance(input_paths, np.ndarray) and input_paths.dtype.kind == "U":
+            paths, originals = input_paths.ravel(), None
+        else:
+            # Original strings are kept, since they might not fit in array exactly.
+            originals = list(input_paths)
+            paths = np.array(originals, dtype=str).ravel()
+
+        results = [
+            self._remap_chunk(
+                paths[start : start + CHUNK_SIZE],
+                None if originals is None else originals[start : start + CHUNK_SIZE],
+                roots,
+                args,
+            )
+            for start in range(0, len(paths), CHUNK_SIZE)
+        ]
+        if not results:
+            return np.array([], dtype=str)
+        return np.concatenate(results)
+
+    def _lookup(
+        self, windows: bool, parts: typing.Tuple[str, ...], args: tuple
+    ) -> typing.Optional[typing.Tuple[int, str, bool]]:
+        if isinstance(self.remap, MixedPlatformRemap):
+            (dst_platform,) = args
+            match = self.remap._lookup_match(
+                windows, parts, dst_platform, self.remap._dst_paths[dst_platform]
+            )
+            return None if match is None else (match[0], *match[2])
+
+        match = self.remap._lookup_match(windows, parts)
+        return None if match is None else (match[0], *match[1][1:])
+
+    def _get_roots(self, args: tuple) -> _Roots:
+        if isinstance(self.remap, MixedPlatformRemap):
+            if len(args) != 1:
+                raise ValueError(f"Destination platform should be given, given: {args}")
+            self.remap._validate_dst_platform(args[0])
+        elif args:
+            raise ValueError(f"SimpleRemap takes no additional arguments, given: {args}")
+
+        # Mapping is replaced whenever it's updated.
+        if self.remap.mapping is not self._mapping:
+            self._mapping = self.remap.mapping
+            self._roots = {}
+        roots = self._roots.get(args)
+        if roots is None:
+            roots = self._roots[args] = self._prepare_roots(args)
+        return roots
+
+    def _prepare_roots(self, args: tuple) -> _Roots:
+        keys, entries, prefixes, offsets, dst_windows = [], [], [], [], []
+        for windows, parts in self.remap._index.iter_roots():
+            key = _root_key(windows, parts)
+            if key is None:
+                continue
+            keys.append(key)
+            # Placeholder component, matching roots are parents of paths under the root.
+            match = self._lookup(windows, parts + ("",), args)
+            if match is None:
+                entries.append(NO_MATCH)
+                continue
+            depth, dst_path, dst_path_windows = match
+            if dst_path_windows and is_unusual_windows_path(dst_path):
+                entries.append(FALLBACK)
+                continue
+
+            separator = "\\" if dst_path_windows else "/"
+            if dst_path == ".":
+                prefix = ""
+            elif dst_path[-1:] == separator:
+                prefix = dst_path
+            else:
+                prefix = dst_path + separator
+            entries.append(len(prefixes))
+            prefixes.append(prefix)
+            offsets.append(len(_root_key(windows, parts[:depth])))
+            dst_windows.append(dst_path_windows)
+
+        sorted_keys = np.array(keys, dtype=str)
+        order = np.argsort(sorted_keys, kind="stable")
+        patterns = (
+            None if isinstance(self.remap, MixedPlatformRemap) else self.remap._patterns
+        )
+        return _Roots(
+            keys=sorted_keys[order],
+            key_codes=_to_codes(keys)[order],
+            key_lengths=np.array(list(map(len, keys)), dtype=np.intp)[order],
+            entries=np.array(entries, dtype=np.intp)[order],
+            prefix_codes=_to_codes(prefixes),
+            prefix_lengths=np.array(list(map(len, prefixes)), dtype=np.intp),
+            offsets=np.array(offsets, dtype=np.intp),
+            dst_windows=np.array(dst_windows, dtype=bool),
+            windows_patterns=patterns is not None and patterns.max_depths[True] > 0,
+            posix_patterns=patterns is not None and patterns.max_depths[False] > 0,
+        )
+
+    def _remap_chunk(
+        self,
+        paths: np.ndarray,
+        originals: typing.Optional[typing.List[str]],
+        roots: _Roots,
+        args: tuple,
+    ) -> np.ndarray:
+        count = len(paths)
+        # Characters are handled as code points, padded with zeros
+        # at least to the length of the longest root key.
+        path_width = paths.dtype.itemsize // 4
+        width = max(path_width, roots.key_codes.shape[1], 3) + 1
+        codes = np.empty((count, width), dtype=np.uint32)
+        codes[:, :path_width] = (
+            np.ascontiguousarray(paths).view(np.uint32).reshape(count, path_width)
+        )
+        codes[:, path_width:] = 0
+        lengths = np.char.str_len(paths)
+
+        # Paths with drive letter are Windows style paths, paths without colons
+        # are POSIX style paths (see is_windows_style_path), other paths are irregular.
+        drives = codes[:, 0] | 0x20
+        windows = (
+            (drives >= ord("a"))
+            & (drives <= ord("z"))
+            & (codes[:, 1] == COLON)
+            & ((codes[:, 2] == SLASH) | (codes[:, 2] == BACKSLASH))
+        )
+        categories = _CATEGORIES[codes]
+        categories[windows, 1] = _OTHER
+        styles = windows.astype(np.uint16) << 9
+        triples = (
+            categories[:, :-2] << 6
+            | categories[:, 1:-1] << 3
+            | categories[:, 2:]
+            | styles[:, None]
+        )
+        first_triples = _START << 6 | categories[:, 0] << 3 | categories[:, 1] | styles
+        regular = ~(
+            _IRREGULAR_TRIPLES[first_triples]
+            | _IRREGULAR_TRIPLES[triples].any(axis=1)
+        )
+        if originals is not None:
+            # Trailing NUL characters are lost in NumPy strings.
+            regular &= lengths == np.fromiter(map(len, originals), np.intp, count)
+        # Paths which might be matched by patterns are remapped by wrapped remapper.
+        if roots.windows_patterns:
+            regular &= ~windows
+        if roots.posix_patterns:
+            regular &= windows
+
+        # Keys are compared with keys of roots: lowercase Windows paths
+        # with backslashes only, POSIX paths as they are.
+        regular_rows = np.flatnonzero(regular)
+        keys = codes[regular_rows]
+        regular_windows = windows[regular_rows]
+        keys[regular_windows] = _WINDOWS_KEY_CODES[keys[regular_windows]]
+        entries = np.full(count, NO_MATCH, dtype=np.intp)
+        entries[regular_rows] = self._match_roots(
+            keys, lengths[regular_rows], regular_windows, roots
+        )
+
+        matched = entries >= 0
+        dst_windows = np.zeros(count, dtype=bool)
+        dst_windows[matched] = roots.dst_windows[entries[matched]]
+        fallback = ~regular | (entries == FALLBACK)
+        # Backslashes of POSIX paths are not separators, but would be on Windows.
+        posix_rows = np.flatnonzero(dst_windows & ~windows)
+        fallback[posix_rows] |= (codes[posix_rows] == BACKSLASH).any(axis=1)
+        matched &= ~fallback
+
+        fallback_rows = np.flatnonzero(fallback)
+        fallback_paths = (
+            paths[fallback_rows].tolist()
+            if originals is None
+            else [originals[row] for row in fallback_rows]
+        )
+        fallback_results = self.remap(fallback_paths, *args)
+        result_width = max(
+            width + (roots.prefix_codes.shape[1] if matched.any() else 0),
+            max(map(len, fallback_results), default=0),
+        )
+
+        result = np.zeros((count, result_width), dtype=np.uint32)
+        result[:, :width] = codes
+        matched_rows = np.flatnonzero(matched)
+        if matched_rows.size:
+            matched_codes = codes[matched_rows]
+            translated = np.where(
+                (matched_codes == SLASH)
+                | ((matched_codes == BACKSLASH) & windows[matched_rows, None]),
+                np.where(dst_windows[matched_rows], BACKSLASH, SLASH)[:, None],
+                matched_codes,
+            )
+            # Paths of the same entry get the same prefix and the same suffix offset.
+            matched_entries = entries[matched_rows]
+            order = np.argsort(matched_entries, kind="stable")
+            starts = np.flatnonzero(np.diff(matched_entries[order], prepend=-1))
+            for group in np.split(order, starts[1:]):
+                entry = matched_entries[group[0]]
+                offset = roots.offsets[entry]
+                prefix_length = roots.prefix_lengths[entry]
+                suffix_end = prefix_length + width - offset
+                group_rows = matched_rows[group]
+                result[group_rows, :prefix_length] = roots.prefix_codes[
+                    entry, :prefix_length
+                ]
+                result[group_rows, prefix_length:suffix_end] = translated[group, offset:]
+                result[group_rows, suffix_end:] = 0
+
+        result = result.view(f"<U{result_width}").reshape(count)
+        result[fallback_rows] = fallback_results
+        return result
+
+    @staticmethod
+    def _match_roots(
+        keys: np.ndarray, lengths: np.ndarray, windows: np.ndarray, roots: _Roots
+    ) -> np.ndarray:
+        """
+        Finds entries of the longest roots, which are parents of paths.
+        The greatest root key not greater than the path key is found with binary search.
+        If it's not a prefix of the path key, the longest root can't be longer than
+        the common prefix of both keys, so search is repeated for the common prefix
+        truncated to separator. Each repetition removes at least one component.
+
+        Args:
+            keys (np.ndarray): code points of path keys, padded with zeros.
+            lengths (np.ndarray): lengths of path keys.
+            windows (np.ndarray): whether paths are Windows style paths.
+            roots (_Roots): prepared mapping roots.
+
+        Returns:
+            np.ndarray: entries of matched roots, NO_MATCH for other paths.
+
+        """
+        entries = np.full(len(keys), NO_MATCH, dtype=np.intp)
+        if not len(roots.keys):
+            return entries
+
+        width = keys.shape[1]
+        columns = np.arange(width)
+        root_width = roots.key_codes.shape[1]
+        rows = np.arange(len(keys))
+        queries = keys
+        while rows.size:
+            found = (
+                np.searchsorted(
+                    roots.keys,
+                    np.ascontiguousarray(queries).view(f"<U{width}").reshape(-1),
+                    side="right",
+                )
+                - 1
+            )
+            rows, found = rows[found >= 0], found[found >= 0]
+            key_lengths = roots.key_lengths[found]
+            mismatches = (roots.key_codes[found] != keys[rows, :root_width]) & (
+                columns[:root_width] < key_lengths[:, None]
+            )
+            different = mismatches.any(axis=1)
+            matched = ~different & (lengths[rows] > key_lengths)
+            entries[rows[matched]] = roots.entries[found[matched]]
+
+            rows, mismatches = rows[different], mismatches[different]
+            common_lengths = np.argmax(mismatches, axis=1)
+            row_keys = keys[rows]
+            separators = np.where(
+                windows[rows, None], row_keys == BACKSLASH, row_keys == SLASH
+            ) & (columns < common_lengths[:, None])
+            # Position after the last separator in common prefix, 0 if there is none.
+            query_lengths = width - np.argmax(separators[:, ::-1], axis=1)
+            query_lengths[~separators.any(axis=1)] = 0
+            rows = rows[query_lengths > 0]
+            queries = keys[rows] * (columns < query_lengths[query_lengths > 0, None])
+        return entries
@@ -0,0 +1,275 @@
+import os
+import time
+import typing
+
+from .cache import LRUCache, CacheInfo, MISSING
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .simple_remap import SimpleRemap
+from .utils import join_path, split_path
+
+# Statuses of verified paths.
+PATH_EXISTS = "exists"
+PATH_MISSING = "missing"
+DIRECTORY_MISSING = "directory missing"
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_TTL = 30.0
+# Listing of directory which exists, but can't be listed (e.g. without read permission).
+UNLISTABLE = object()
+
+Remap = typing.Union[SimpleRemap, MixedPlatformRemap]
+Listing = typing.Union[None, object, typing.FrozenSet[str]]
+
+
+class VerifiedPath(typing.NamedTuple):
+    path: str
+    status: str
+
+
+def _scan_directory(directory: str) -> Listing:
+    try:
+        with os.scandir(directory) as entries:
+            names = []
+            for entry in entries:
+                # Broken symbolic links don't exist for os.path.exists.
+                if entry.is_symlink() and not os.path.exists(entry.path):
+                    continue
+                names.append(os.path.normcase(entry.name))
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except OSError:
+        return UNLISTABLE
+    return frozenset(names)
+
+
+class DirectoryListingCache:
+    """Cache of names of directory entries, listed with os.scandir.
+
+    Listings expire after given time, so changes of filesystem are eventually
+    noticed, and least recently used listings are evicted first,
+    so memory usage stays bounded.
+
+    Examples:
+        >>> listings = DirectoryListingCache(max_size=1024, ttl=10.0)
+        >>> listings.get("/mnt/storage1/temp")
+        frozenset({"a.tga", "b.tga"})
+        >>> listings.get("/mnt/storage1/missing") is None
+        True
+
+    Attributes:
+        ttl (float): Number of seconds after which listing is read again.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            max_size (int): Maximum number of cached listings, should be positive.
+            ttl (float): Number of seconds after which listing is read again,
+                0 disables caching between calls.
+        """
+        if ttl < 0:
+            raise ValueError(f"Listing TTL should not be negative, given: {ttl}")
+
+        self.ttl = ttl
+        self._listings = LRUCache(max_size)
+        self._expirations = 0
+
+    def get(self, directory: str) -> Listing:
+        """
+        Args:
+            directory (str): Path of directory.
+
+        Returns:
+            Listing: Names of directory entries, normalized with os.path.normcase,
+                None if directory doesn't exist, UNLISTABLE if it can't be listed.
+
+        """
+        now = time.monotonic()
+        cached_listing = self._listings.get(directory)
+        if cached_listing is not None:
+            expiry, listing = cached_listing
+            if now < expiry:
+                return listing
+            self._expirations += 1
+
+        listing = _scan_directory(directory)
+        self._listings.put(directory, (now + self.ttl, listing))
+        return listing
+
+    def clear(self):
+        self._listings.clear()
+        self._expirations = 0
+
+    def info(self) -> CacheInfo:
+        # Expired listings are read again, so they are counted as misses.
+        info = self._listings.info()
+        return info._replace(
+            hits=info.hits - self._expirations,
+            misses=info.misses + self._expirations,
+        )
+
+
+class VerifiedRemap:
+    """Class for remapping paths and checking whether remapped paths exist on host.
+
+    Instead of calling os.path.exists for each remapped path (a stat call per path,
+    which is slow on network filesystems), remapped paths are grouped by their
+    parent directories and each directory is listed once with os.scandir.
+    Listings are cached (see DirectoryListingCache), so next batches of paths
+    from the same directories don't touch filesystem until listings expire.
+
+    Each path is reported as existing, missing or missing together with its
+    parent directory. With fallback enabled, paths which don't exist are remapped
+    with next matching mapping roots (e.g. shorter roots) and the first existing
+    candidate is used. If none of candidates exists, the first one is reported.
+
+    Examples:
+        >>> remap = SimpleRemap({"L:\\": "/mnt/storage1", "L:\\cache": "/mnt/cache"})
+        >>> verified_remap = VerifiedRemap(remap, fallback=True)
+        >>> verified_remap(["L:\\cache\\a.abc", "L:\\temp\\b.abc"])
+        [VerifiedPath(path="/mnt/storage1/cache/a.abc", status="exists"),
+         VerifiedPath(path="/mnt/storage1/temp/b.abc", status="directory missing")]
+
+    Attributes:
+        remap (Remap): Wrapped remapper, SimpleRemap or MixedPlatformRemap.
+        fallback (bool): Whether next matching mapping roots are tried
+            for paths which don't exist.
+        listings (DirectoryListingCache): Cache of directory listings.
+    """
+
+    def __init__(
+        self,
+        remap: Remap,
+        fallback: bool = False,
+        listings: typing.Optional[DirectoryListingCache] = None,
+    ):
+        """
+        Args:
+            remap (Remap): Remapper to use.
+            fallback (bool): Whether next matching mapping roots should be tried
+                for paths which don't exist.
+            listings (typing.Optional[DirectoryListingCache]): Cache of directory
+                listings, it can be shared between verifiers. New cache
+                with default size and TTL is created by default.
+        """
+        self.remap = remap
+        self.fallback = fallback
+        self.listings = DirectoryListingCache() if listings is None else listings
+
+    def __call__(
+        self, input_paths: typing.Sequence[str], *args
+    ) -> typing.List[VerifiedPath]:
+        """
+        Args:
+            input_paths (typing.Sequence[str]): Input paths to remap.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            typing.List[VerifiedPath]: Remapped input paths with their statuses.
+
+        """
+        self._validate_args(args)
+        paths = self.remap.remap_batch(input_paths, *args)
+        directories = {}
+        statuses = self._verify(paths, directories)
+        if self.fallback:
+            fallbacks = {}
+            for index, status in enumerate(statuses):
+                if status == PATH_EXISTS:
+                    continue
+                input_path = input_paths[index]
+                result = fallbacks.get(input_path, MISSING)
+                if result is MISSING:
+                    result = fallbacks[input_path] = self._find_existing_candidate(
+                        input_path, paths[index], args, directories
+                    )
+                if result is not None:
+                    paths[index] = result
+                    statuses[index] = PATH_EXISTS
+
+        return list(map(VerifiedPath, paths, statuses))
+
+    def verify(self, paths: typing.Iterable[str]) -> typing.List[str]:
+        """
+        Checks already remapped paths, see __call__.
+
+        Args:
+            paths (typing.Iterable[str]): Paths to check.
+
+        Returns:
+            typing.List[str]: PATH_EXISTS, PATH_MISSING or DIRECTORY_MISSING
+                for each path.
+
+        """
+        return self._verify(paths, {})
+
+    def _verify(
+        self, paths: typing.Iterable[str], directories: typing.Dict[str, Listing]
+    ) -> typing.List[str]:
+        # Listings are looked up once for each directory, also in the cache.
+        statuses = []
+        for path in paths:
+            if not path:
+                statuses.append(PATH_MISSING)
+                continue
+
+            directory, name = os.path.split(path)
+            listing = directories.get(directory, MISSING)
+            if listing is MISSING:
+                listing = directories[directory] = self.listings.get(
+                    directory or os.curdir
+                )
+
+            if listing is None:
+                statuses.append(DIRECTORY_MISSING)
+            elif listing is UNLISTABLE or name in ("", os.curdir, os.pardir):
+                # Rare cases, e.g. root directory, are checked directly.
+                statuses.append(PATH_EXISTS if os.path.exists(path) else PATH_MISSING)
+            elif os.path.normcase(name) in listing:
+                statuses.append(PATH_EXISTS)
+            else:
+                statuses.append(PATH_MISSING)
+        return statuses
+
+    def _find_existing_candidate(
+        self,
+        input_path: str,
+        path: str,
+        args: tuple,
+        directories: typing.Dict[str, Listing],
+    ) -> typing.Optional[str]:
+        # The first candidate is the remapped path, which was already checked.
+        checked_paths = {path}
+        for candidate in self._iter_candidates(input_path, args):
+            if candidate in checked_paths:
+                continue
+            checked_paths.add(candidate)
+            if self._verify((candidate,), directories)[0] == PATH_EXISTS:
+                return candidate
+        return None
+
+    def _iter_candidates(self, input_path: str, args: tuple) -> typing.Iterator[str]:
+        # Results of all matching mapping roots, starting from the longest one.
+        windows, parts = split_path(input_path)
+        if isinstance(self.remap, MixedPlatformRemap):
+            (dst_platform,) = args
+            dst_paths = self.remap._dst_paths[dst_platform]
+            matches = self.remap._index.iter_matches(windows, parts)
+            for depth, (platform, path_id) in matches:
+                dst_path = dst_paths[path_id]
+                if platform != dst_platform and dst_path:
+                    yield join_path(dst_path[0], parts[depth:], dst_path[1])
+        else:
+            matches = self.remap._iter_matches(windows, parts)
+            for depth, (_, dst_path, dst_windows) in matches:
+                yield join_path(dst_path, parts[depth:], dst_windows)
+
+    def _validate_args(self, args: tuple):
+        if isinstance(self.remap, MixedPlatformRemap):
+            if len(args) != 1:
+                raise ValueError(f"Destination platform should be given, given: {args}")
+            self.remap._validate_dst_platform(args[0])
+        elif args:
+            raise ValueError(
+                f"SimpleRemap takes no additional arguments, given: {args}"
+            )
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import typing
+
+from .instrumentation import Instrumentation
+from .mixed_platforms_resolver import MixedPlatformRemap
+from .simple_remap import SimpleRemap
+
+
+def load_remap(
+    mapping_path: str,
+    cache_size: int = 0,
+    instrumentation: typing.Optional[Instrumentation] = None,
+) -> typing.Union[SimpleRemap, MixedPlatformRemap]:
+    """
+    Creates remapper for mapping stored in JSON file. Mapping with list values
+    (e.g. {"Windows": ["L:\\"], "Linux": ["/mnt/storage1"]}) is used with
+    MixedPlatformRemap, mapping with string values (e.g. {"L:\\": "X:\\"}) with SimpleRemap.
+
+    Args:
+    mapping_path (str): path to JSON file with mapping.
+    cache_size (int): cache size passed to remapper.
+    instrumentation (typing.Optional[Instrumentation]): instrumentation passed to remapper.
+
+    Returns:
+        typing.Union[SimpleRemap, MixedPlatformRemap]: remapper for given mapping.
+
+    """
+    with open(mapping_path, encoding="utf-8") as file:
+        mapping = json.load(file)
+
+    if not isinstance(mapping, dict):
+        raise ValueError(
+            f"Incorrect format of input mapping: '{mapping}'. Should be JSON object."
+        )
+
+    if mapping and all(isinstance(paths, list) for paths in mapping.values()):
+        remap_class = MixedPlatformRemap
+        paths = [path for platform_paths in mapping.values() for path in platform_paths]
+    else:
+        remap_class = SimpleRemap
+        paths = list(mapping.values())
+    if not all(path is None or isinstance(path, str) for path in paths):
+        raise ValueError(
+            f"Incorrect format of input mapping: '{mapping}'. Paths should be"
+            f" strings or nulls, platform paths should be lists of them."
+        )
+    return remap_class(mapping, cache_size, instrumentation)
+
+
+class MappingWatcher:
+    """Class for remapping with mapping file, which is reloaded when it changes.
+
+    New remapper is created from changed file and replaces the current one
+    at once, so concurrent calls use either whole previous or whole new mapping.
+    Changes are detected by polling file status (modification time, size and inode),
+    either on demand with check or periodically by background thread.
+    If reloading fails (e.g. file is being written), previous remapper is kept
+    and the file is loaded again on next change.
+
+    Examples:
+        >>> with MappingWatcher("mapping.json", interval=5.0) as watcher:
+        ...     watcher(["L:\\temp"], "Linux")
+        ["/mnt/storage1/temp"]
+
+    Attributes:
+        mapping_path (str): Path to JSON file with mapping.
+        remap (typing.Union[SimpleRemap, MixedPlatformRemap]): Current remapper.
+        interval (float): Number of seconds between checks of background thread.
+        last_error (typing.Optional[Exception]): Error of the last failed reload.
+    """
+
+    def __init__(
+        self,
+        mapping_path: str,
+        interval: float = 1.0,
+        cache_size: int = 0,
+        instrumentation: typing.Optional[Instrumentation] = None,
+        loader: typing.Callable[
+            ..., typing.Union[SimpleRemap, MixedPlatformRemap]
+        ] = load_remap,
+    ):
+        """
+        Args:
+            mapping_path (str): Path to JSON file with mapping. It's loaded immediately,
+                so errors of initial mapping are raised.
+            interval (float): Number of seconds between checks of background thread.
+            cache_size (int): Cache size of created remappers.
+            instrumentation (typing.Optional[Instrumentation]): Instrumentation
+                attached to created remappers.
+            loader (typing.Callable): Function creating remapper from mapping path,
+                cache size and instrumentation.
+        """
+        if interval <= 0:
+            raise ValueError(f"Interval should be positive, given: {interval}")
+
+        self.mapping_path = mapping_path
+        self.interval = interval
+        self.last_error = None
+        self._cache_size = cache_size
+        self._instrumentation = instrumentation
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._file_status = self._get_file_status()
+        self.remap = loader(mapping_path, cache_size, instrumentation)
+
+    def __call__(self, input_paths: typing.List[str], *args) -> typing.List[str]:
+        """
+        Args:
+            input_paths (typing.List[str]): Input paths to remap.
+            *args: Additional arguments of remapper call, e.g. destination platform
+                for MixedPlatformRemap.
+
+        Returns:
+            typing.List[str]: List of remapped input paths
+
+        """
+        return self.remap(input_paths, *args)
+
+    def _get_file_status(self) -> typing.Optional[typing.Tuple[int, int, int]]:
+        try:
+            status = os.stat(self.mapping_path)
+        except OSError:
+            return None
+        return status.st_mtime_ns, status.st_size, status.st_ino
+
+    def check(self) -> bool:
+        """
+        Reloads mapping if file has changed since it was loaded.
+
+        Returns:
+            bool: Whether remapper was replaced.
+
+        """
+        with self._lock:
+            file_status = self._get_file_status()
+            if file_status is None or file_status == self._file_status:
+                return False
+
+            self._file_status = file_status
+            try:
+                remap = self._loader(
+                    self.mapping_path, self._cache_size, self._instrumentation
+                )
+            except (OSError, ValueError) as error:
+                self.last_error = error
+                return False
+
+            self.last_error = None
+            self.remap = remap
+            return True
+
+    def start(self):
+        """Starts background thread checking mapping file every interval seconds."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="remapping-mapping-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stops background thread."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as error:
+                # Thread keeps polling, so corrected file is loaded on next change.
+                self.last_error = error
+
+    def __enter__(self) -> "MappingWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
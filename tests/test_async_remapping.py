@@ -0,0 +1,114 @@
+import asyncio
+import concurrent.futures
+import threading
+import unittest
+from unittest import mock
+
+from src import remapping
+
+
+async def produce(paths):
+    for path in paths:
+        await asyncio.sleep(0)
+        yield path
+
+
+class TestAsyncMapping(unittest.IsolatedAsyncioTestCase):
+    input_mapping = {
+        "Windows": ["L:\\", "P:\\"],
+        "Linux": ["/mnt/storage1", "/mnt/storage2"],
+    }
+
+    async def test_remap_paths_from_async_iterable(self):
+        input_paths = ["L:\\temp", "cache\\Tree.abc", "p:/project1/textures"]
+        remap = remapping.AsyncRemap(
+            remapping.MixedPlatformRemap(self.input_mapping), batch_size=2
+        )
+
+        result = [path async for path in remap.iter_remap(produce(input_paths), "Linux")]
+
+        self.assertEqual(
+            ["/mnt/storage1/temp", "cache\\Tree.abc", "/mnt/storage2/project1/textures"],
+            result,
+        )
+
+    async def test_iter_remap_with_missing_target_platform_should_raise(self):
+        remap = remapping.AsyncRemap(remapping.MixedPlatformRemap(self.input_mapping))
+
+        with self.assertRaises(ValueError):
+            async for _ in remap.iter_remap(produce(["L:\\temp"]), "Mac"):
+                pass
+
+    async def test_remap_list_in_batches_and_in_executor(self):
+        input_paths = [f"L:\\shot{i}" for i in range(50)]
+        expected_result = [f"/mnt/storage1/shot{i}" for i in range(50)]
+        mixed_remap = remapping.MixedPlatformRemap(self.input_mapping)
+
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            for executor_threshold in (None, 20):
+                remap = remapping.AsyncRemap(
+                    mixed_remap,
+                    batch_size=8,
+                    executor=executor,
+                    executor_threshold=executor_threshold,
+                )
+                self.assertEqual(expected_result, await remap(input_paths, "Linux"))
+
+    async def test_iter_remap_remaps_ready_paths_in_batches(self):
+        wrapped_remap = mock.Mock(
+            wraps=remapping.MixedPlatformRemap(self.input_mapping)
+        )
+        remap = remapping.AsyncRemap(wrapped_remap, batch_size=8)
+        input_paths = [f"L:\\shot{i}" for i in range(50)]
+
+        async def produce_at_once(paths):
+            for path in paths:
+                yield path
+
+        paths = produce_at_once(input_paths)
+        result = [path async for path in remap.iter_remap(paths, "Linux")]
+
+        self.assertEqual([f"/mnt/storage1/shot{i}" for i in range(50)], result)
+        self.assertEqual(
+            [8] * 6 + [2],
+            [len(args[0]) for args, _ in wrapped_remap.call_args_list],
+        )
+
+    async def test_iter_remap_raises_errors_of_producer(self):
+        async def produce_with_error():
+            yield "L:\\temp"
+            raise OSError("connection lost")
+
+        remap = remapping.AsyncRemap(remapping.MixedPlatformRemap(self.input_mapping))
+        result = []
+        with self.assertRaises(OSError):
+            async for path in remap.iter_remap(produce_with_error(), "Linux"):
+                result.append(path)
+        self.assertEqual(["/mnt/storage1/temp"], result)
+
+    async def test_small_lists_wait_in_executor_while_remapper_is_busy(self):
+        mixed_remap = remapping.MixedPlatformRemap(self.input_mapping, cache_size=4)
+        started, release = threading.Event(), threading.Event()
+        calling_threads = []
+
+        def remap_slowly(input_paths, dst_platform):
+            calling_threads.append(threading.get_ident())
+            if len(input_paths) > 1:
+                started.set()
+                release.wait(5)
+            return mixed_remap(input_paths, dst_platform)
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            remap = remapping.AsyncRemap(
+                remap_slowly, batch_size=1, executor=executor, executor_threshold=2
+            )
+            big_call = asyncio.ensure_future(remap(["L:\\a", "L:\\b"], "Linux"))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            small_call = asyncio.ensure_future(remap(["P:\\c"], "Linux"))
+            await asyncio.sleep(0.01)
+            self.assertFalse(small_call.done())
+            release.set()
+
+            self.assertEqual(["/mnt/storage1/a", "/mnt/storage1/b"], await big_call)
+            self.assertEqual(["/mnt/storage2/c"], await small_call)
+        self.assertNotIn(threading.get_ident(), calling_threads)
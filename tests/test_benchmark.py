@@ -0,0 +1,52 @@
+import unittest
+
+from src import remapping
+from src.remapping import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_generated_workloads_are_reproducible(self):
+        first_workloads = benchmark.default_workloads(50)
+        second_workloads = benchmark.default_workloads(50)
+
+        for first, second in zip(first_workloads, second_workloads):
+            self.assertEqual(first.input_paths, second.input_paths)
+            self.assertEqual(first.remap.mapping, second.remap.mapping)
+            self.assertEqual(50, len(first.input_paths))
+
+    def test_run_workload_and_compare_with_baseline(self):
+        mapping = benchmark.mixed_platforms_mapping(3)
+        workload = benchmark.Workload(
+            "mixed",
+            remapping.MixedPlatformRemap(mapping),
+            benchmark.mixed_style_paths(mapping, 100),
+            ("Linux",),
+        )
+
+        result = benchmark.run_workload(workload, latency_samples=10)
+
+        self.assertEqual(
+            [
+                "paths_per_second",
+                "latency_p50_us",
+                "latency_p90_us",
+                "latency_p99_us",
+                "peak_memory_bytes",
+            ],
+            list(result),
+        )
+        self.assertGreater(result["paths_per_second"], 0)
+        self.assertEqual(
+            ["mixed: throughput x1.00, peak memory x1.00", "other: no baseline"],
+            benchmark.compare_with_baseline(
+                {"mixed": result, "other": result}, {"mixed": result}
+            ),
+        )
+
+        zero_duration_result = dict(result, paths_per_second=0.0, peak_memory_bytes=0)
+        self.assertEqual(
+            ["mixed: throughput x0.00, peak memory x0.00"],
+            benchmark.compare_with_baseline(
+                {"mixed": zero_duration_result}, {"mixed": zero_duration_result}
+            ),
+        )
@@ -0,0 +1,171 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.remapping import cli
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _write(self, name: str, content) -> str:
+        path = os.path.join(self.directory.name, name)
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    def _run(self, mapping: dict, input_data: bytes, *arguments) -> bytes:
+        mapping_path = self._write("mapping.json", json.dumps(mapping))
+        input_path = self._write("input.txt", input_data)
+        output_path = os.path.join(self.directory.name, "output.txt")
+        exit_code = cli.main(
+            ["-m", mapping_path, "-o", output_path, *arguments, input_path]
+        )
+        self.assertEqual(0, exit_code)
+        with open(output_path, "rb") as file:
+            return file.read()
+
+    def test_simple_mapping_newline_delimited(self):
+        output = self._run(
+            {"L:\\": "X:\\"}, b"L:\\temp\r\nl:/a/b\ncache\\Tree.abc\n"
+        )
+        self.assertEqual(b"X:\\temp\r\nX:\\a\\b\ncache\\Tree.abc\n", output)
+
+    def test_crlf_line_endings_are_kept(self):
+        input_data = b"L:\\temp\r\nl:/a/b\ncache\\Tree.abc\r\nL:\\\r\r\n"
+        expected_output = b"X:\\temp\r\nX:\\a\\b\ncache\\Tree.abc\r\nX:\\\r\r\n"
+        for arguments in ([], ["--dedup"], ["-j", "2"]):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                output = self._run({"L:\\": "X:\\"}, input_data, "--stats", *arguments)
+            self.assertEqual(expected_output, output, arguments)
+            self.assertIn("paths: 4, changed: 3", stderr.getvalue(), arguments)
+
+    def test_mixed_mapping_nul_delimited(self):
+        mapping = {"Windows": ["L:\\"], "Linux": ["/mnt/storage1"]}
+        output = self._run(
+            mapping, b"L:\\temp\0/mnt/storage1/a\nb\0", "-0", "-p", "Linux"
+        )
+        self.assertEqual(b"/mnt/storage1/temp\0/mnt/storage1/a\nb\0", output)
+
+    def test_memory_mapped_input(self):
+        input_data = "".join(f"L:\\dir{i}\\file.tga\n" for i in range(1000))
+        with mock.patch.object(cli, "MMAP_MIN_SIZE", 1):
+            output = self._run({"L:\\": "X:\\"}, input_data)
+
+        self.assertEqual(input_data.replace("L:\\", "X:\\").encode("utf-8"), output)
+
+    def test_undecodable_bytes_are_preserved(self):
+        output = self._run({"/mnt/storage1": "/mnt2"}, b"/mnt/storage1/\xff.tga\n")
+        self.assertEqual(b"/mnt2/\xff.tga\n", output)
+
+    def test_stats(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self._run({"L:\\": "X:\\"}, b"L:\\temp\ncache\\Tree.abc\n", "--stats")
+
+        self.assertIn("paths: 2, changed: 1", stderr.getvalue())
+
+    def test_dedup_stats(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            output = self._run(
+                {"L:\\": "X:\\"},
+                b"L:\\a\nL:\\a\nL:\\b\nL:\\a\n",
+                "--dedup",
+                "--stats",
+            )
+
+        self.assertEqual(b"X:\\a\nX:\\a\nX:\\b\nX:\\a\n", output)
+        self.assertIn("unique: 2, directories: 1, dedup ratio: 2.00", stderr.getvalue())
+
+    def test_rewrite(self):
+        mapping_path = self._write("mapping.json", json.dumps({"L:\\": "X:\\"}))
+        scene_path = self._write("scene.ma", b'setAttr ".ftn" "L:/a.tga";\n')
+        exit_code = cli.main(["-m", mapping_path, "--rewrite", scene_path])
+
+        self.assertEqual(0, exit_code)
+        with open(scene_path, "rb") as file:
+            self.assertEqual(b'setAttr ".ftn" "X:\\a.tga";\n', file.read())
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(
+                ["-m", mapping_path, "-j", "2", "--rewrite", scene_path]
+            )
+        self.assertEqual(2, exit_code)
+        self.assertIn("--rewrite works only in single process", stderr.getvalue())
+
+    def test_manifest(self):
+        mapping = {"Windows": ["L:\\"], "Linux": ["/mnt/storage1"]}
+        output = self._run(
+            mapping,
+            b'{"path": "L:\\\\a.abc", "frame": 1}\n{"path": "/mnt/a.abc"}\n',
+            "--manifest",
+            "jsonl",
+            "--field",
+            "path",
+            "-p",
+            "Linux",
+        )
+        self.assertEqual(
+            b'{"path": "/mnt/storage1/a.abc", "frame": 1}\n{"path": "/mnt/a.abc"}\n',
+            output,
+        )
+
+        mapping_path = self._write("mapping.json", "{}")
+        input_path = self._write("input.txt", b"")
+        with contextlib.redirect_stderr(io.StringIO()):
+            exit_code = cli.main(["-m", mapping_path, "--manifest", "csv", input_path])
+        self.assertEqual(2, exit_code)
+
+    def test_result_cache(self):
+        database_path = os.path.join(self.directory.name, "results.db")
+        input_data = b"L:\\temp\n/mnt/storage1/\xff\nL:\\temp\n"
+        for mapping, expected_output in (
+            ({"L:\\": "X:\\"}, b"X:\\temp\n/mnt/storage1/\xff\nX:\\temp\n"),
+            ({"L:\\": "Y:\\"}, b"Y:\\temp\n/mnt/storage1/\xff\nY:\\temp\n"),
+        ):
+            for _ in range(2):
+                output = self._run(mapping, input_data, "--result-cache", database_path)
+                self.assertEqual(expected_output, output)
+
+    def test_incorrect_destination_platform(self):
+        mapping_path = self._write(
+            "mapping.json", json.dumps({"Windows": ["L:\\"], "Linux": ["/mnt"]})
+        )
+        input_path = self._write("input.txt", b"L:\\temp\n")
+        for arguments in ([], ["-p", "Mac"]):
+            with contextlib.redirect_stderr(io.StringIO()):
+                exit_code = cli.main(["-m", mapping_path, *arguments, input_path])
+            self.assertEqual(2, exit_code)
+
+    def test_file_and_mapping_errors(self):
+        mapping_path = self._write("mapping.json", json.dumps({"L:\\": "X:\\"}))
+        input_path = self._write("input.txt", b"L:\\temp\n")
+        missing_path = os.path.join(self.directory.name, "missing", "file.txt")
+        for arguments in (
+            ["-m", mapping_path, missing_path],
+            ["-m", mapping_path, "-o", missing_path, input_path],
+            ["-m", mapping_path, "--manifest", "csv", "--field", "path", missing_path],
+            ["-m", mapping_path, "--rewrite", missing_path],
+            ["-m", self._write("invalid.json", json.dumps({"a": 1})), input_path],
+            ["-m", mapping_path, "--result-cache", self.directory.name, input_path],
+        ):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                exit_code = cli.main(arguments)
+            self.assertEqual(2, exit_code, arguments)
+            self.assertTrue(stderr.getvalue().startswith("remap: "), arguments)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import remapping
+from src.remapping import compiled
+
+
+class TestCompiled(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.artifact_path = os.path.join(directory.name, "mapping.remap")
+        self.mapping = {
+            "Windows": ["L:\\", "P:\\project1\\textures"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2/textures"],
+            "Mac": ["/Volumes/storage1", None],
+        }
+        self.input_paths = ["L:\\temp", "p:/project1/textures/grass.tga", "cache\\a"]
+
+    def test_compiled_remap_gives_the_same_results(self):
+        remap = compiled.load_or_compile(
+            remapping.MixedPlatformRemap, self.mapping, self.artifact_path
+        )
+        self.assertTrue(os.path.exists(self.artifact_path))
+
+        loaded_remap = compiled.load_compiled(
+            self.artifact_path,
+            remapping.MixedPlatformRemap,
+            self.mapping,
+            cache_size=10,
+        )
+        self.assertIsInstance(loaded_remap, remapping.MixedPlatformRemap)
+        self.assertEqual(self.mapping, loaded_remap.mapping)
+        for platform in self.mapping:
+            self.assertEqual(
+                remap(self.input_paths, platform),
+                loaded_remap(self.input_paths, platform),
+            )
+        self.assertEqual(9, loaded_remap.cache_info()["paths"].size)
+
+    def test_simple_remap(self):
+        mapping = {"L:\\": "X:\\", "/mnt/storage1": "/Volumes/storage1"}
+        compiled.save_compiled(remapping.SimpleRemap(mapping), self.artifact_path)
+        instrumentation = remapping.Instrumentation()
+        remap = compiled.load_compiled(
+            self.artifact_path,
+            remapping.SimpleRemap,
+            mapping,
+            instrumentation=instrumentation,
+        )
+
+        self.assertEqual(["X:\\temp"], remap(["L:\\temp"]))
+        self.assertEqual({"L:\\": 1}, instrumentation.snapshot()["entry_hits"])
+        self.assertIsNone(
+            compiled.load_compiled(
+                self.artifact_path, remapping.MixedPlatformRemap, mapping
+            )
+        )
+
+    def test_artifact_is_plain_data_readable_by_other_users(self):
+        mapping = {"L:\\": "X:\\", "glob:P:\\show_{show}": "/mnt/shows/{show}"}
+        compiled.save_compiled(remapping.SimpleRemap(mapping), self.artifact_path)
+
+        umask = os.umask(0o022)
+        os.umask(umask)
+        self.assertEqual(0o666 & ~umask, os.stat(self.artifact_path).st_mode & 0o777)
+        self.assertEqual(
+            [os.path.basename(self.artifact_path)],
+            os.listdir(os.path.dirname(self.artifact_path)),
+        )
+        with open(self.artifact_path, "rb") as file:
+            self.assertIsInstance(json.loads(file.read()[compiled.HEADER_SIZE :]), dict)
+
+        remap = compiled.load_compiled(
+            self.artifact_path, remapping.SimpleRemap, mapping
+        )
+        self.assertEqual(
+            ["X:\\temp", "/mnt/shows/abc/a.abc"],
+            remap(["L:\\temp", "p:/show_abc/a.abc"]),
+        )
+
+    def test_loaded_remap_is_created_with_prebuilt_index(self):
+        simple_mapping = {"L:\\": "X:\\", "glob:P:\\show_{show}": "/mnt/{show}"}
+        for remap_class, mapping in (
+            (remapping.MixedPlatformRemap, self.mapping),
+            (remapping.SimpleRemap, simple_mapping),
+        ):
+            remap = remap_class(mapping, cache_size=10)
+            compiled.save_compiled(remap, self.artifact_path)
+            with mock.patch.object(
+                remap_class, "_build_index", side_effect=AssertionError
+            ):
+                loaded_remap = compiled.load_compiled(
+                    self.artifact_path, remap_class, mapping, cache_size=10
+                )
+
+            self.assertEqual(sorted(vars(remap)), sorted(vars(loaded_remap)))
+            self.assertEqual(
+                sorted(remap._index.iter_entries()),
+                sorted(loaded_remap._index.iter_entries()),
+            )
+
+    def test_stale_artifact_is_rebuilt(self):
+        compiled.load_or_compile(
+            remapping.MixedPlatformRemap, self.mapping, self.artifact_path
+        )
+        changed_mapping = dict(self.mapping, Mac=["/Volumes/storage3", None])
+        self.assertIsNone(
+            compiled.load_compiled(
+                self.artifact_path, remapping.MixedPlatformRemap, changed_mapping
+            )
+        )
+
+        remap = compiled.load_or_compile(
+            remapping.MixedPlatformRemap, changed_mapping, self.artifact_path
+        )
+        self.assertEqual(["/Volumes/storage3/temp"], remap(["L:\\temp"], "Mac"))
+        self.assertIsNotNone(
+            compiled.load_compiled(
+                self.artifact_path, remapping.MixedPlatformRemap, changed_mapping
+            )
+        )
+
+    def test_damaged_or_incompatible_artifact_is_rebuilt(self):
+        compiled.load_or_compile(
+            remapping.MixedPlatformRemap, self.mapping, self.artifact_path
+        )
+        with open(self.artifact_path, "rb") as file:
+            content = file.read()
+
+        version_offset = len(compiled.MAGIC)
+        for damaged_content in (
+            b"",
+            content[: len(content) // 2],
+            content[:version_offset] + b"\xff\xff" + content[version_offset + 2 :],
+        ):
+            with open(self.artifact_path, "wb") as file:
+                file.write(damaged_content)
+
+            self.assertIsNone(
+                compiled.load_compiled(
+                    self.artifact_path, remapping.MixedPlatformRemap, self.mapping
+                )
+            )
+            remap = compiled.load_or_compile(
+                remapping.MixedPlatformRemap, self.mapping, self.artifact_path
+            )
+            self.assertEqual(["/mnt/storage1/temp"], remap(["L:\\temp"], "Linux"))
+            with open(self.artifact_path, "rb") as file:
+                self.assertEqual(content, file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
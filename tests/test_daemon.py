@@ -0,0 +1,130 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from src import remapping
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires Unix sockets")
+class TestRemapDaemon(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.socket_path = os.path.join(directory.name, "remapping.sock")
+        self.mixed_remap = remapping.MixedPlatformRemap(
+            {
+                "Windows": ["L:\\", "P:\\"],
+                "Linux": ["/mnt/storage1", "/mnt/storage2"],
+                "Mac": ["/Volumes/storage1", None],
+            },
+            cache_size=16,
+        )
+        self.simple_remap = remapping.SimpleRemap({"L:\\": "X:\\"})
+        self.input_paths = [
+            "L:\\temp\\a.tga",
+            "p:/project1/textures\\grass.tga",
+            "/mnt/storage2/project1/assets/prop/Box",
+            "cache\\Tree.abc",
+            "/mnt/storage1/\udcff.abc",
+            "",
+        ]
+
+    def start_server(self):
+        server = remapping.RemapServer(
+            self.socket_path, {"": self.mixed_remap, "simple": self.simple_remap}
+        )
+        server.start()
+        self.addCleanup(server.close)
+        return server
+
+    def test_remap_paths_with_server(self):
+        self.start_server()
+
+        with remapping.RemapClient(self.socket_path) as remap:
+            for platform in ("Windows", "Linux", "Mac"):
+                self.assertEqual(
+                    self.mixed_remap(self.input_paths, platform),
+                    remap(self.input_paths, platform),
+                )
+            self.assertEqual([], remap([], "Linux"))
+        with remapping.RemapClient(self.socket_path, "simple") as remap:
+            self.assertEqual(self.simple_remap(self.input_paths), remap(self.input_paths))
+
+    def test_pipeline_big_batches(self):
+        self.start_server()
+        batches = [
+            [f"L:\\project{i}\\shot{j:05d}.exr" for j in range(20000)] for i in range(8)
+        ]
+
+        with remapping.RemapClient(self.socket_path) as remap:
+            result = remap.pipeline(batches, "Mac")
+
+        self.assertEqual([self.mixed_remap(batch, "Mac") for batch in batches], result)
+
+    def test_remap_paths_concurrently_with_connection_pool(self):
+        self.start_server()
+        expected_result = self.mixed_remap(self.input_paths * 100, "Linux")
+        results = []
+
+        with remapping.RemapClient(self.socket_path, pool_size=2) as remap:
+
+            def remap_paths():
+                for _ in range(20):
+                    results.append(remap(self.input_paths * 100, "Linux"))
+
+            threads = [threading.Thread(target=remap_paths) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertLessEqual(len(remap._idle_connections), 2)
+
+        self.assertEqual([expected_result] * 80, results)
+
+    def test_remap_errors_are_raised_by_client(self):
+        self.start_server()
+
+        with remapping.RemapClient(self.socket_path) as remap:
+            with self.assertRaises(ValueError) as e:
+                remap.pipeline([self.input_paths, self.input_paths], "Solaris")
+            self.assertIn("Solaris", str(e.exception))
+            with self.assertRaises(ValueError):
+                remap(["L:\\temp\0"], "Linux")
+            # Connection is still usable after errors.
+            self.assertEqual(["/mnt/storage1/temp"], remap(["L:\\temp"], "Linux"))
+
+        with remapping.RemapClient(self.socket_path, "missing") as remap:
+            with self.assertRaises(ValueError):
+                remap(self.input_paths)
+
+    def test_reconnect_after_server_restart(self):
+        server = self.start_server()
+
+        with remapping.RemapClient(self.socket_path) as remap:
+            self.assertEqual(["/mnt/storage1/temp"], remap(["L:\\temp"], "Linux"))
+            server.close()
+            self.start_server()
+            self.assertEqual(["/mnt/storage1/temp"], remap(["L:\\temp"], "Linux"))
+
+    def test_replace_stale_socket(self):
+        stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale_socket.bind(self.socket_path)
+        stale_socket.close()
+
+        self.start_server()
+
+        with remapping.RemapClient(self.socket_path) as remap:
+            self.assertEqual(["/mnt/storage1/temp"], remap(["L:\\temp"], "Linux"))
+        with self.assertRaises(OSError):
+            remapping.RemapServer(self.socket_path, {"": self.mixed_remap})
+
+    def test_other_files_are_not_replaced(self):
+        with open(self.socket_path, "w") as file:
+            file.write("{}")
+
+        with self.assertRaises(FileExistsError):
+            remapping.RemapServer(self.socket_path, {"": self.mixed_remap})
+        with open(self.socket_path) as file:
+            self.assertEqual("{}", file.read())
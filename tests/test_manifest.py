@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import remapping
+from src.remapping import manifest
+
+
+class TestManifestRewrite(unittest.TestCase):
+    def setUp(self):
+        self.remap = remapping.SimpleRemap(
+            {
+                "L:\\": "X:\\",
+                "P:\\project1\\textures": "Z:\\library\\textures",
+                "/mnt/storage1": "/Volumes/storage1",
+            }
+        )
+
+    def test_json_lines(self):
+        records = [
+            {"path": "L:\\temp\\a.abc", "frame": 1, "note": "L:\\not\\selected"},
+            {"path": "p:/project1/textures/grass.tga", "textures": ["l:/b.tga"]},
+            {"layers": [{"path": "/mnt/storage1/a.usd"}, {"path": 3}, "x"]},
+            {"textures": [["/mnt/storage1/ż.tga"], "/mnt/storage2/b.tga", None]},
+            {"outputs": {"beauty": "L:\\beauty.exr", "depth": "L:\\depth.exr"}},
+            {"path": "L:\\temp\\..\\b.abc"},
+            [1, 2],
+        ]
+        data = b"".join(
+            json.dumps(record).encode("utf-8") + b"\n" for record in records
+        )
+        manifest_rewrite = manifest.ManifestRewrite(
+            self.remap, ["path", "textures", "layers.*.path", "outputs.*"]
+        )
+
+        result = [json.loads(line) for line in manifest_rewrite(data).splitlines()]
+
+        self.assertEqual(
+            [
+                {"path": "X:\\temp\\a.abc", "frame": 1, "note": "L:\\not\\selected"},
+                {"path": "Z:\\library\\textures\\grass.tga", "textures": ["X:\\b.tga"]},
+                {"layers": [{"path": "/Volumes/storage1/a.usd"}, {"path": 3}, "x"]},
+                {
+                    "textures": [
+                        ["/Volumes/storage1/ż.tga"],
+                        "/mnt/storage2/b.tga",
+                        None,
+                    ]
+                },
+                {"outputs": {"beauty": "X:\\beauty.exr", "depth": "X:\\depth.exr"}},
+                {"path": "X:\\b.abc"},
+                [1, 2],
+            ],
+            result,
+        )
+
+    def test_records_without_remapped_paths_are_not_changed(self):
+        data = (
+            b'{"path":"/mnt/storage2/a.abc" ,"id": 1}\n'
+            b'{"path":"/data/storage1//not/../normalized"}\r\n'
+            b'{"path":"/mnt/storage1\\u002fb.abc"}\r\n'
+            b"\n"
+            b"not a JSON record\n"
+            b'{"path":"l:/a.abc"}'
+        )
+        self.assertEqual(
+            b'{"path":"/mnt/storage2/a.abc" ,"id": 1}\n'
+            b'{"path":"/data/storage1//not/../normalized"}\r\n'
+            b'{"path": "/Volumes/storage1/b.abc"}\r\n'
+            b"\n"
+            b"not a JSON record\n"
+            b'{"path": "X:\\\\a.abc"}',
+            manifest.ManifestRewrite(self.remap, ["path"])(data),
+        )
+        with self.assertRaises(ValueError):
+            manifest.ManifestRewrite(self.remap, ["path"])(b'{"path": "L:\\\\a"\n')
+
+    def test_escaped_surrogates_and_undecodable_bytes(self):
+        data = (
+            b'{"path": "L:\\\\a", "n": "\\udcff", "m": "\\ud800"}\n'
+            b'{"path": "L:\\\\b\xff", "n": "\\ud800"}\n'
+        )
+        self.assertEqual(
+            b'{"path": "X:\\\\a", "n": "\\udcff", "m": "\\ud800"}\n'
+            b'{"path": "X:\\\\b\xff", "n": "\\ud800"}\n',
+            manifest.ManifestRewrite(self.remap, ["path"])(data),
+        )
+
+    def test_csv(self):
+        data = (
+            b"name,path,texture\r\n"
+            b'grass,"L:\\a,b.abc",p:/project1/textures/grass.tga\r\n'
+            b'tree,"/mnt/storage1/tree\n.abc",\r\n'
+            b"rock,/mnt/storage2/rock.abc,L:\\rock.tga\r\n"
+            b"short\r\n"
+            b"L:\\x,L:\\y"
+        )
+        self.assertEqual(
+            b"name,path,texture\r\n"
+            b'grass,"X:\\a,b.abc",Z:\\library\\textures\\grass.tga\r\n'
+            b'tree,"/Volumes/storage1/tree\n.abc",\r\n'
+            b"rock,/mnt/storage2/rock.abc,X:\\rock.tga\r\n"
+            b"short\r\n"
+            b"L:\\x,X:\\y",
+            manifest.ManifestRewrite(
+                self.remap, ["path", "texture"], manifest_format="csv"
+            )(data),
+        )
+        csv_rewrite = manifest.ManifestRewrite(
+            self.remap, ["path"], manifest_format="csv"
+        )
+        self.assertEqual(b"", csv_rewrite(b""))
+        with self.assertRaises(ValueError):
+            csv_rewrite(b"name,texture\r\n")
+
+    def test_records_are_written_in_chunks(self):
+        data = b"".join(
+            b'{"id": %d, "path": "L:\\\\dir%d\\\\file.tga"}\n' % (i, i % 7)
+            for i in range(1000)
+        )
+        expected = manifest.ManifestRewrite(self.remap, ["path"])(data)
+        with mock.patch.object(manifest, "CHUNK_SIZE", 100):
+            remap_batch = mock.Mock(wraps=self.remap.remap_batch)
+            with mock.patch.object(self.remap, "remap_batch", remap_batch):
+                self.assertEqual(
+                    expected, manifest.ManifestRewrite(self.remap, ["path"])(data)
+                )
+        self.assertGreater(remap_batch.call_count, 100)
+        self.assertEqual(1000, expected.count(b"X:\\\\dir"))
+
+    def test_mixed_platforms_remap(self):
+        remap = remapping.MixedPlatformRemap(
+            {"Windows": ["L:\\", "P:\\"], "Linux": ["/mnt/storage1", None]}
+        )
+        data = b'{"path": "L:\\\\a.tga"}\n{"path": "P:\\\\b.tga"}\n'
+        self.assertEqual(
+            b'{"path": "/mnt/storage1/a.tga"}\n{"path": "P:\\\\b.tga"}\n',
+            manifest.ManifestRewrite(remap, ["path"], "Linux")(data),
+        )
+        with self.assertRaises(ValueError):
+            manifest.ManifestRewrite(remap, ["path"])
+        with self.assertRaises(ValueError):
+            manifest.ManifestRewrite(remap, ["path"], "Linux", "xml")
+        with self.assertRaises(ValueError):
+            manifest.ManifestRewrite(remap, [], "Linux")
+
+    def test_rewrite_file_in_place(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "assets.csv")
+            with open(path, "wb") as file:
+                file.write(b"path\n/mnt/storage1/tree.usd\nL:\\a\n")
+
+            manifest_rewrite = remapping.ManifestRewrite(
+                self.remap, ["path"], manifest_format="csv"
+            )
+            self.assertEqual(2, manifest_rewrite.rewrite_file(path))
+
+            with open(path, "rb") as file:
+                self.assertEqual(
+                    b"path\n/Volumes/storage1/tree.usd\nX:\\a\n", file.read()
+                )
+            self.assertEqual(["assets.csv"], os.listdir(directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -56,6 +56,32 @@ class TestMapping(unittest.TestCase):
 
         self.assertEqual(expected_result, result)
 
+    def test_remap_unc_paths_from_different_platforms(self):
+        input_mapping = {
+            "Windows": ["\\\\fs01\\projects", "L:\\"],
+            "Linux": ["/mnt/projects", "/mnt/library"],
+        }
+        remap = remapping.MixedPlatformRemap(input_mapping)
+        input_paths = [
+            "\\\\FS01\\Projects\\a\\b.tga",
+            "\\\\fs01\\\\projects/a/../c.tga",
+            "\\\\fs02\\projects\\a.tga",
+        ]
+        expected_result = [
+            "/mnt/projects/a/b.tga",
+            "/mnt/projects/c.tga",
+            "\\\\fs02\\projects\\a.tga",
+        ]
+
+        self.assertEqual(expected_result, remap(input_paths, "Linux"))
+        self.assertEqual(
+            expected_result * 2, remap.remap_batch(input_paths * 2, "Linux")
+        )
+        self.assertEqual(
+            ["\\\\fs01\\projects\\a\\b.tga", "L:\\b.tga"],
+            remap(["/mnt/projects/a/b.tga", "/mnt/library/b.tga"], "Windows"),
+        )
+
     def test_remap_from_mixed_platforms(self):
         input_mapping = {
             "Windows": ["L:\\", "P:\\"],
@@ -177,6 +203,45 @@ class TestMapping(unittest.TestCase):
 
         self.assertEqual(expected_result, result)
 
+    def test_remap_paths_from_mixed_platforms_with_nested_paths_in_mapping(self):
+        input_mapping = {
+            "Windows": ["L:\\", "l:\\project1", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/projects/project1", "/mnt/storage1/p"],
+        }
+        input_paths = [
+            "L:\\temp",
+            "L:\\PROJECT1\\shots\\sh010",
+            "/mnt/storage1/p/project2",
+            "/mnt/storage1/project2",
+            "/mnt/projects/project1/shots",
+        ]
+        expected_result = [
+            "/mnt/storage1/temp",
+            "/mnt/projects/project1/shots/sh010",
+            "P:\\project2",
+            "L:\\project2",
+            "l:\\project1\\shots",
+        ]
+        remap = remapping.MixedPlatformRemap(input_mapping)
+
+        self.assertEqual(expected_result[:2], remap(input_paths[:2], "Linux"))
+        self.assertEqual(expected_result[2:], remap(input_paths[2:], "Windows"))
+
+    def test_remap_paths_with_nested_paths_of_different_platforms_uses_longest(self):
+        # The longest path takes precedence over paths of platforms listed earlier
+        # (previously "/mnt/storage1/a" was remapped with "/mnt" to "M:\\storage1\\a").
+        # Equal paths of different platforms are still used in order of platforms.
+        input_mapping = {
+            "Linux": ["/mnt", None, "/mnt/shared", None],
+            "Mac": [None, "/mnt/storage1", None, "/mnt/shared"],
+            "Windows": ["M:\\", "S:\\", "Z:\\", "Y:\\"],
+        }
+        input_paths = ["/mnt/storage1/a", "/mnt/shared/b", "/mnt/other/c"]
+        expected_result = ["S:\\a", "Z:\\b", "M:\\other\\c"]
+        remap = remapping.MixedPlatformRemap(input_mapping)
+
+        self.assertEqual(expected_result, remap(input_paths, "Windows"))
+
     def test_remap_with_paths_from_mixed_platforms_with_missing_target_platform_should_raise(
         self,
     ):
@@ -205,6 +270,278 @@ class TestMapping(unittest.TestCase):
             str(e.exception),
         )
 
+    def test_iter_remap_paths_from_mixed_platforms_lazily(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+        }
+        input_paths = iter(["L:\\temp", "cache\\Tree.abc", "p:/project1/textures"])
+
+        remap = remapping.MixedPlatformRemap(input_mapping)
+        result = remap.iter_remap(input_paths, "Linux")
+
+        self.assertEqual("/mnt/storage1/temp", next(result))
+        self.assertEqual(
+            ["cache\\Tree.abc", "/mnt/storage2/project1/textures"], list(result)
+        )
+
+    def test_iter_remap_with_missing_target_platform_should_raise_immediately(self):
+        input_mapping = {"Windows": ["L:\\"], "Linux": ["/mnt/storage1"]}
+        remap = remapping.MixedPlatformRemap(input_mapping)
+
+        with self.assertRaises(ValueError):
+            remap.iter_remap(iter([]), "Mac")
+
+    def test_remap_paths_from_mixed_platforms_with_cache(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+            "Mac": ["/Volumes/storage1", None],
+        }
+        input_paths = [
+            "L:\\temp",
+            "p:/project1/textures\\grass.tga",
+            "p:/project1/textures\\wood.tga",
+            "L:\\temp",
+            "/mnt/storage2/project1/assets/prop/Box",
+        ]
+        remap = remapping.MixedPlatformRemap(input_mapping, cache_size=16)
+
+        for dst_platform in ("Mac", "Linux", "Mac"):
+            self.assertEqual(
+                remapping.MixedPlatformRemap(input_mapping)(input_paths, dst_platform),
+                remap(input_paths, dst_platform),
+            )
+
+        cache_info = remap.cache_info()
+        self.assertEqual((7, 8), cache_info["paths"][:2])
+        self.assertEqual((2, 6), cache_info["directories"][:2])
+
+    def test_remap_paths_from_mixed_platforms_with_instrumentation(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+            "Mac": ["/Volumes/storage1", "/Volumes/storage2"],
+        }
+        input_paths = [
+            "L:\\temp",
+            "p:/project1/textures\\grass.tga",
+            "cache\\Tree.abc",
+            "g:\\nope",
+            "/mnt/storage2/project1/assets/prop/Box",
+            "/Volumes/storage1/project2/shots",
+        ]
+        instrumentation = remapping.Instrumentation()
+        remap = remapping.MixedPlatformRemap(input_mapping, cache_size=8)
+        remap.instrumentation = instrumentation
+
+        remap(input_paths, "Linux")
+        remap(input_paths, "Linux")  # Cached paths are not counted again.
+
+        self.assertEqual(
+            {
+                "entry_hits": {("Windows", 0): 1, ("Windows", 1): 1, ("Mac", 0): 1},
+                "unmatched": 2,
+                "passed_through": 1,
+            },
+            {
+                key: value
+                for key, value in instrumentation.snapshot().items()
+                if key != "timings"
+            },
+        )
+
+    def test_remap_paths_to_all_platforms(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\", "P:\\project1\\textures"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2", None],
+            "Mac": ["/Volumes/storage1", "/Volumes/storage2", "/Volumes/textures"],
+        }
+        input_paths = [
+            "L:\\temp",
+            "p:/project1/textures\\grass.tga",
+            "cache\\Tree.abc",
+            "g:\\nope",
+            "/mnt/storage2/project1/assets/prop/Box",
+            "/Volumes/textures/sand.tga",
+        ]
+        for cache_size in (0, 8):
+            remap = remapping.MixedPlatformRemap(input_mapping, cache_size=cache_size)
+            expected_result = {
+                platform: remap(input_paths, platform) for platform in input_mapping
+            }
+
+            self.assertEqual(expected_result, remap.remap_all(input_paths))
+            self.assertEqual(
+                {"Mac": expected_result["Mac"], "Linux": expected_result["Linux"]},
+                remap.remap_all(input_paths, ["Mac", "Linux"]),
+            )
+            self.assertEqual(
+                list(zip(expected_result["Linux"], expected_result["Windows"])),
+                list(remap.iter_remap_all(input_paths, ("Linux", "Windows"))),
+            )
+            self.assertEqual(
+                {platform: [] for platform in input_mapping}, remap.remap_all([])
+            )
+
+    def test_remap_paths_to_missing_platform_should_raise_immediately(self):
+        remap = remapping.MixedPlatformRemap({"Windows": ["L:\\"], "Linux": ["/mnt"]})
+
+        with self.assertRaises(ValueError):
+            remap.iter_remap_all(iter(()), ["Linux", "Mac"])
+
+    def test_remap_batch_with_repeated_paths(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+            "Mac": ["/Volumes/storage1", None],
+        }
+        unique_paths = [
+            "L:\\temp\\a.tga",
+            "l:/temp\\b.tga",
+            "P:\\\\\\project1\\assets\\env\\Forest",
+            "p:/project1/../project2/a.abc",
+            "/mnt/storage2/project1/assets/prop/Box",
+            "/mnt/storage2/project1/assets/prop/Tree",
+            "cache\\Tree.abc",
+            "g:\\nope",
+        ]
+        input_paths = unique_paths * 2 + unique_paths[:4]
+        remap = remapping.MixedPlatformRemap(input_mapping, cache_size=4)
+        stats = remapping.BatchStats()
+
+        for platform in input_mapping:
+            self.assertEqual(
+                remap(input_paths, platform),
+                remap.remap_batch(input_paths, platform, stats),
+            )
+        self.assertEqual((60, 24), (stats.paths, stats.unique_paths))
+        self.assertEqual(2.5, stats.dedup_ratio)
+        with self.assertRaises(ValueError):
+            remap.remap_batch(input_paths, "Solaris")
+
+    def test_remap_compact(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+            "Mac": ["/Volumes/storage1", None],
+        }
+        input_paths = [
+            "L:\\temp\\a.tga",
+            "l:/temp\\b.tga",
+            "P:\\\\\\project1\\assets\\env\\Forest",
+            "p:/project1/../project2/a.abc",
+            "/mnt/storage2/project1//assets/prop/Box",
+            "/Volumes/storage1/a:b\\c",
+            "cache\\Tree.abc",
+            "g:\\nope",
+        ]
+        remap = remapping.MixedPlatformRemap(input_mapping)
+
+        for platform in input_mapping:
+            result = remap.remap_compact(input_paths, platform)
+            self.assertEqual(remap(input_paths, platform), list(result))
+            self.assertEqual(remap(input_paths[2:5], platform), result[2:5])
+
+    def test_remap_bytes(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+            "Mac": ["/Volumes/storage1", None],
+        }
+        input_paths = [
+            b"/mnt/storage1/temp/a.tga",
+            b"/mnt/storage2/project1//assets/prop/Box",
+            b"/mnt/storage2/project1/assets/prop/Box",
+            b"/mnt/storage2/a\\b.tga",
+            b"/Volumes/storage1/a:b\\c",
+            b"/Volumes/storage1/\xff.abc",
+            b"L:\\temp",
+            b"cache/Tree.abc",
+        ]
+        remap = remapping.MixedPlatformRemap(input_mapping)
+
+        for platform in input_mapping:
+            expected_result = [
+                path.encode("utf-8", "surrogateescape")
+                for path in remap(
+                    [path.decode("utf-8", "surrogateescape") for path in input_paths],
+                    platform,
+                )
+            ]
+            self.assertEqual(expected_result, remap.remap_bytes(input_paths, platform))
+            self.assertEqual(
+                b"\0".join(expected_result),
+                remap.remap_buffer(b"\0".join(input_paths), platform),
+            )
+        with self.assertRaises(ValueError):
+            remap.remap_bytes(input_paths, "Solaris")
+
+    def test_update_mapping_paths_incrementally(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+            "Mac": ["/Volumes/storage1", None],
+        }
+        input_paths = [
+            "L:\\temp\\a.tga",
+            "P:\\project1\\assets\\env\\Forest",
+            "/mnt/storage2/project1/assets/prop/Box",
+            "/mnt/storage3/textures/grass.tga",
+            "/Volumes/storage1/a.abc",
+            "/Volumes/storage2/b.abc",
+            "q:/temp",
+            "cache\\Tree.abc",
+        ]
+        expected_mapping = {
+            "Windows": ["L:\\", None, "Q:\\", "P:\\project1"],
+            "Linux": ["/mnt/storage1", None, "/mnt/storage3", "/mnt/storage2"],
+            "Mac": ["/Volumes/storage1", None, None, "/Volumes/storage2"],
+        }
+        expected_remap = remapping.MixedPlatformRemap(expected_mapping)
+
+        for cache_size in (0, 8):
+            remap = remapping.MixedPlatformRemap(input_mapping, cache_size=cache_size)
+            for platform in input_mapping:
+                remap(input_paths, platform)
+
+            self.assertEqual(
+                2, remap.add_paths({"Windows": "Q:\\", "Linux": "/mnt/storage3"})
+            )
+            self.assertEqual(
+                3,
+                remap.add_paths(
+                    {"Windows": "P:\\", "Mac": "/Volumes/storage2", "Linux": None}
+                ),
+            )
+            remap.replace_path("Windows", 3, "P:\\project1")
+            remap.replace_path("Linux", 3, "/mnt/storage2")
+            remap.remove_paths(1)
+
+            self.assertEqual(expected_mapping, remap.mapping)
+            for platform in input_mapping:
+                self.assertEqual(
+                    expected_remap(input_paths, platform),
+                    remap(input_paths, platform),
+                )
+            self.assertEqual(
+                expected_remap.remap_all(input_paths), remap.remap_all(input_paths)
+            )
+
+    def test_update_mapping_paths_with_incorrect_platform_or_index_should_raise(self):
+        input_mapping = {"Windows": ["L:\\"], "Linux": ["/mnt/storage1"]}
+        remap = remapping.MixedPlatformRemap(input_mapping)
+
+        with self.assertRaises(ValueError):
+            remap.add_paths({"Mac": "/Volumes/storage1"})
+        with self.assertRaises(ValueError):
+            remap.replace_path("Mac", 0, "/Volumes/storage1")
+        with self.assertRaises(ValueError):
+            remap.replace_path("Linux", 1, "/mnt/storage2")
+        with self.assertRaises(ValueError):
+            remap.remove_paths(-1)
+        self.assertEqual(input_mapping, remap.mapping)
+
     def test_initialize_remap_mixed_platforms_with_different_paths_number_should_raise_error(
         self,
     ):
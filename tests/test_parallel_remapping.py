@@ -0,0 +1,35 @@
+import unittest
+
+from src import remapping
+
+
+class TestParallelMapping(unittest.TestCase):
+    def test_remap_paths_in_worker_processes_preserves_order(self):
+        input_mapping = {
+            "Windows": ["L:\\", "P:\\"],
+            "Linux": ["/mnt/storage1", "/mnt/storage2"],
+        }
+        input_paths = [
+            f"{root}project{i}\\shot{i:03d}"
+            for i in range(250)
+            for root in ("L:\\", "p:/", "g:\\")
+        ]
+        remap = remapping.MixedPlatformRemap(input_mapping)
+
+        with remapping.ParallelRemap(
+            remap, workers=2, chunk_size=40, min_parallel_size=100
+        ) as parallel_remap:
+            result = parallel_remap(input_paths, "Linux")
+            self.assertIsNotNone(parallel_remap._executor)
+
+        self.assertEqual(remap(input_paths, "Linux"), result)
+        self.assertEqual("/mnt/storage2/project1/shot001", result[4])
+
+    def test_remap_small_list_in_current_process(self):
+        remap = remapping.SimpleRemap({"/mnt/storage1/": "/mnt2/storage2/"})
+
+        with remapping.ParallelRemap(remap, workers=2) as parallel_remap:
+            result = parallel_remap(["/mnt/storage1/temp", "/mnt5/nope"])
+            self.assertIsNone(parallel_remap._executor)
+
+        self.assertEqual(["/mnt2/storage2/temp", "/mnt5/nope"], result)
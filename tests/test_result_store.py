@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import remapping
+from src.remapping import result_store
+
+
+class TestPersistentRemap(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.database_path = os.path.join(self.directory.name, "results.db")
+        self.input_paths = [
+            "L:\\temp\\a.abc",
+            "l:/temp/b.abc",
+            "L:\\temp\\a.abc",
+            "/mnt/storage1/../storage1/a.usd",
+            "/mnt/storage2/\udcff.usd",
+            "cache\\Tree.abc",
+        ]
+
+    def test_results_are_reused_between_runs(self):
+        remap = remapping.SimpleRemap({"L:\\": "X:\\", "/mnt/storage1": "/Volumes"})
+        expected_result = remap(self.input_paths)
+
+        with result_store.ResultStore(self.database_path) as store:
+            persistent_remap = remapping.PersistentRemap(remap, store)
+            self.assertEqual(expected_result, persistent_remap(self.input_paths))
+            self.assertEqual((0, 5), (persistent_remap.hits, persistent_remap.misses))
+
+        with result_store.ResultStore(self.database_path) as store:
+            persistent_remap = remapping.PersistentRemap(remap, store)
+            remap_batch = mock.Mock(wraps=remap.remap_batch)
+            with mock.patch.object(remap, "remap_batch", remap_batch):
+                self.assertEqual(expected_result, persistent_remap(self.input_paths))
+                self.assertEqual(
+                    ["X:\\new"] + expected_result[:2],
+                    persistent_remap(["L:\\new"] + self.input_paths[:2]),
+                )
+            self.assertEqual(
+                [mock.call(["/mnt/storage2/\udcff.usd"]), mock.call(["L:\\new"])],
+                remap_batch.call_args_list,
+            )
+            self.assertEqual((6, 2), (persistent_remap.hits, persistent_remap.misses))
+
+    def test_results_of_changed_mapping_are_not_used(self):
+        remap = remapping.MixedPlatformRemap(
+            {"Windows": ["L:\\"], "Linux": ["/mnt/storage1"], "Mac": ["/Volumes"]}
+        )
+        with result_store.ResultStore(self.database_path) as store:
+            persistent_remap = remapping.PersistentRemap(remap, store)
+            for dst_platform in ("Linux", "Mac"):
+                self.assertEqual(
+                    remap(self.input_paths, dst_platform),
+                    persistent_remap(self.input_paths, dst_platform),
+                )
+
+            remap.replace_path("Linux", 0, "/mnt/storage2")
+            self.assertEqual(
+                remap(self.input_paths, "Linux"),
+                persistent_remap(self.input_paths, "Linux"),
+            )
+            self.assertEqual(0, persistent_remap.hits)
+
+            with self.assertRaises(ValueError):
+                persistent_remap(self.input_paths)
+            with self.assertRaises(ValueError):
+                persistent_remap(self.input_paths, "Solaris")
+
+    def test_lookup_and_prune(self):
+        remap = remapping.SimpleRemap({"L:\\": "X:\\"})
+        with result_store.ResultStore(self.database_path) as store:
+            fingerprint = result_store.mapping_fingerprint(remap)
+            fingerprint_id = store.get_fingerprint_id(fingerprint)
+            self.assertEqual(fingerprint_id, store.get_fingerprint_id(fingerprint))
+
+            paths = [f"L:\\dir{i}" for i in range(2000)]
+            store.insert(fingerprint_id, zip(paths, remap(paths)))
+            store.insert(fingerprint_id, [("L:\\dir0", "L:\\dir0"), ("cache", "cache")])
+            expected_results = {
+                "L:\\dir0": "X:\\dir0",
+                "L:\\dir1999": "X:\\dir1999",
+                "cache": "cache",
+            }
+            # Stored results are looked up in chunks or read all at once.
+            self.assertEqual(
+                expected_results,
+                store.lookup(fingerprint_id, ["L:\\dir0", "L:\\dir1999", "cache", "a"]),
+            )
+            self.assertEqual(
+                expected_results,
+                store.lookup(
+                    fingerprint_id, ["L:\\dir0", "L:\\dir1999", "cache"] * 300
+                ),
+            )
+
+            self.assertEqual(0, store.prune(60.0))
+            with mock.patch.object(result_store.time, "time", return_value=0.0):
+                other_fingerprint_id = store.get_fingerprint_id("other")
+                store.insert(other_fingerprint_id, [("L:\\a", "Y:\\a")])
+            self.assertEqual(1, store.prune(60.0))
+            other_fingerprint_id = store.get_fingerprint_id("other")
+            self.assertEqual({}, store.lookup(other_fingerprint_id, ["L:\\a"]))
+            self.assertEqual(
+                expected_results, store.lookup(fingerprint_id, list(expected_results))
+            )
+
+    def test_fingerprint_pruned_between_lookups(self):
+        remap = remapping.SimpleRemap({"L:\\": "X:\\"})
+        expected_result = remap(self.input_paths)
+        with result_store.ResultStore(self.database_path) as store:
+            persistent_remap = remapping.PersistentRemap(remap, store)
+            self.assertEqual(expected_result, persistent_remap(self.input_paths))
+            fingerprint_id = store.get_fingerprint_id(
+                result_store.mapping_fingerprint(remap)
+            )
+
+            # E.g. pruned by other process sharing the database.
+            with result_store.ResultStore(self.database_path) as other_store:
+                self.assertEqual(1, other_store.prune(-60.0))
+            self.assertEqual({}, store.lookup(fingerprint_id, self.input_paths))
+            store.insert(fingerprint_id, [("L:\\a", "X:\\a")])
+            self.assertEqual({}, store.lookup(fingerprint_id, ["L:\\a"]))
+
+            self.assertEqual(expected_result, persistent_remap(self.input_paths))
+            self.assertEqual(expected_result, persistent_remap(self.input_paths))
+            self.assertEqual((4, 11), (persistent_remap.hits, persistent_remap.misses))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import remapping
+from src.remapping import rewrite
+from src.remapping.multi_pattern import MultiPatternAutomaton
+
+
+class TestMultiPatternAutomaton(unittest.TestCase):
+    def _find(self, automaton: MultiPatternAutomaton, text: bytes) -> list:
+        found = []
+        state = automaton.INITIAL_STATE
+        for end, byte in enumerate(text, 1):
+            state = automaton.transitions[state].get(byte, automaton.INITIAL_STATE)
+            found.extend((end, pattern_id) for pattern_id in automaton.outputs[state])
+        return found
+
+    def test_overlapping_patterns(self):
+        automaton = MultiPatternAutomaton([b"he", b"she", b"his", b"hers"])
+        self.assertEqual(
+            [(4, 1), (4, 0), (6, 3)], self._find(automaton, b"ushers")
+        )
+        self.assertEqual(b"hs", automaton.first_bytes)
+
+    def test_empty_pattern(self):
+        with self.assertRaises(ValueError):
+            MultiPatternAutomaton([b"a", b""])
+
+
+class TestTextRewrite(unittest.TestCase):
+    def setUp(self):
+        self.remap = remapping.SimpleRemap(
+            {
+                "L:\\": "X:\\",
+                "P:\\project1\\textures": "Z:\\library\\textures",
+                "/mnt/storage1": "/Volumes/storage1",
+            }
+        )
+
+    def test_maya_scene(self):
+        scene = (
+            b'createNode file -n "grass";\n'
+            b'\tsetAttr ".ftn" -type "string" "l:/project1/textures/grass.tga";\n'
+            b'\tsetAttr ".ftn" -type "string" "p:/PROJECT1/textures/sand.tga";\n'
+            b'\tsetAttr ".ftn" -type "string" "P:\\project1\\models\\tree.abc";\n'
+        )
+        expected = (
+            b'createNode file -n "grass";\n'
+            b'\tsetAttr ".ftn" -type "string" "X:\\project1\\textures\\grass.tga";\n'
+            b'\tsetAttr ".ftn" -type "string" "Z:\\library\\textures\\sand.tga";\n'
+            b'\tsetAttr ".ftn" -type "string" "P:\\project1\\models\\tree.abc";\n'
+        )
+        self.assertEqual(expected, rewrite.TextRewrite(self.remap)(scene))
+
+    def test_roots_are_matched_only_at_path_beginning(self):
+        text = (
+            b"@/mnt/storage1/a.usd@ /data/mnt/storage1/b.usd /mnt/storage10/c.usd "
+            b"/MNT/storage1/d.usd XL:\\e.usd"
+        )
+        expected = (
+            b"@/Volumes/storage1/a.usd@ /data/mnt/storage1/b.usd /mnt/storage10/c.usd "
+            b"/MNT/storage1/d.usd XL:\\e.usd"
+        )
+        self.assertEqual(expected, rewrite.TextRewrite(self.remap)(text))
+
+    def test_not_remapped_paths_are_not_normalized(self):
+        text = b'"P:\\project1\\textures\\..\\grass.tga" "/mnt//storage2/../x"'
+        self.assertEqual(text, rewrite.TextRewrite(self.remap)(text))
+
+    def test_mixed_platforms_remap(self):
+        remap = remapping.MixedPlatformRemap(
+            {"Windows": ["L:\\", "P:\\"], "Linux": ["/mnt/storage1", None]}
+        )
+        text = b'"L:\\temp\\a b.tga" "P:\\b.tga" "/mnt/storage1/c.tga"'
+        self.assertEqual(
+            b'"/mnt/storage1/temp/a b.tga" "P:\\b.tga" "/mnt/storage1/c.tga"',
+            rewrite.TextRewrite(remap, "Linux")(text),
+        )
+        with self.assertRaises(ValueError):
+            rewrite.TextRewrite(remap)
+
+    def test_paths_with_spaces(self):
+        remap = remapping.SimpleRemap({"P:\\": "/mnt/p"})
+        text = b'"P:\\My Project\\tex.png"\n'
+        # Space is among default terminators, so only the beginning of path
+        # is remapped, the rest keeps its separators.
+        self.assertEqual(
+            b'"/mnt/p/My Project\\tex.png"\n', rewrite.TextRewrite(remap)(text)
+        )
+        self.assertEqual(
+            b'"/mnt/p/My Project/tex.png"\n',
+            rewrite.TextRewrite(remap, terminators=b'"\n')(text),
+        )
+
+    def test_paths_crossing_chunks(self):
+        text = b"\n".join(
+            b"%d L:\\dir%d\\file.tga /mnt/storage1/x%d" % (i, i, i) for i in range(200)
+        )
+        expected = rewrite.TextRewrite(self.remap)(text)
+        for chunk_size in (1, 2, 3, 7, 64):
+            with mock.patch.object(rewrite, "CHUNK_SIZE", chunk_size):
+                self.assertEqual(expected, rewrite.TextRewrite(self.remap)(text))
+        self.assertEqual(400, expected.count(b"X:\\") + expected.count(b"/Volumes"))
+
+    def test_rewrite_file_in_place(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "layer.usda")
+            with open(path, "wb") as file:
+                file.write(b'asset file = @/mnt/storage1/tree.usd@\nx = "L:\\a"\n')
+            empty_path = os.path.join(directory, "empty.usda")
+            open(empty_path, "wb").close()
+
+            text_rewrite = rewrite.TextRewrite(self.remap)
+            self.assertEqual(2, text_rewrite.rewrite_file(path))
+            self.assertEqual(0, text_rewrite.rewrite_file(empty_path))
+
+            with open(path, "rb") as file:
+                self.assertEqual(
+                    b'asset file = @/Volumes/storage1/tree.usd@\nx = "X:\\a"\n',
+                    file.read(),
+                )
+            self.assertEqual(["empty.usda", "layer.usda"], sorted(os.listdir(directory)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import itertools
 import unittest
 
 from src import remapping
@@ -70,6 +71,29 @@ class TestMapping(unittest.TestCase):
 
         self.assertEqual(expected_result, result)
 
+    def test_remap_paths_with_mapping_to_other_path_style(self):
+        # Separators of remapped sub path are converted to style of replacement,
+        # previously "P:\\project1\\textures\\a\\b.tga" was remapped
+        # to "/Volumes/textures/a\\b.tga".
+        input_mapping = {
+            "P:\\project1\\textures": "/Volumes/textures",
+            "/mnt/storage1": "X:\\storage1",
+        }
+        input_paths = [
+            "P:\\project1\\textures\\a\\b.tga",
+            "p:/project1/textures/grass.tga",
+            "/mnt/storage1/a/b.tga",
+        ]
+        expected_result = [
+            "/Volumes/textures/a/b.tga",
+            "/Volumes/textures/grass.tga",
+            "X:\\storage1\\a\\b.tga",
+        ]
+        remap = remapping.SimpleRemap(input_mapping)
+
+        self.assertEqual(expected_result, remap(input_paths))
+        self.assertEqual(expected_result, list(remap.remap_compact(input_paths)))
+
     def test_remap_paths_from_linux_with_parent_stmt_in_mapping(self):
         input_mapping = {
             "/mnt/storage1/": "/mnt2/../home/user/something/",
@@ -91,3 +115,400 @@ class TestMapping(unittest.TestCase):
         result = remap(input_paths)
 
         self.assertEqual(expected_result, result)
+
+    def test_parent_stmt_left_by_normalization_is_kept_in_matched_paths(self):
+        # Parent statement preceded by multiplied separators is not resolved,
+        # no matter if path matches mapping or not.
+        input_mapping = {"/mnt/": "/x", "/data/storage1/": "/y"}
+        input_paths = [
+            "/mnt/storage1//../a",
+            "/other/storage1//../a",
+            "/data/storage1///b//a\\//..",
+        ]
+        expected_result = [
+            "/x/storage1/../a",
+            "/other/storage1/../a",
+            "/y/b/a\\/..",
+        ]
+        remap = remapping.SimpleRemap(input_mapping)
+
+        self.assertEqual(expected_result, remap(input_paths))
+        self.assertEqual(expected_result, remap.remap_batch(input_paths))
+        self.assertEqual(expected_result, list(remap.remap_compact(input_paths)))
+        self.assertEqual(
+            [path.encode() for path in expected_result],
+            remap.remap_bytes(path.encode() for path in input_paths),
+        )
+
+    def test_remap_paths_with_overlapping_mapping_uses_longest_sub_path(self):
+        input_mapping = {
+            "/mnt/": "/mnt2/",
+            "/mnt/storage1/": "/Volumes/storage1/",
+            "l:\\": "X:\\",
+            "L:\\project1": "Z:\\project1",
+        }
+        input_paths = [
+            "/mnt/storage1/temp",
+            "/mnt/storage2/temp",
+            "/mnt/storage1",
+            "L:\\Project1\\textures\\grass.tga",
+            "L:\\project2\\textures\\grass.tga",
+        ]
+        expected_result = [
+            "/Volumes/storage1/temp",
+            "/mnt2/storage2/temp",
+            "/mnt2/storage1",
+            "Z:\\project1\\textures\\grass.tga",
+            "X:\\project2\\textures\\grass.tga",
+        ]
+        remap = remapping.SimpleRemap(input_mapping)
+        result = remap(input_paths)
+
+        self.assertEqual(expected_result, result)
+        self.assertEqual(
+            expected_result,
+            remapping.SimpleRemap(dict(reversed(input_mapping.items())))(input_paths),
+        )
+
+    def test_remap_unc_paths(self):
+        input_mapping = {
+            "\\\\fs01\\projects": "/mnt/projects",
+            "\\\\fs01\\projects\\cache": "C:\\cache",
+            "L:\\": "\\\\FS02\\Library",
+        }
+        input_paths = [
+            "\\\\FS01\\Projects\\a\\b.tga",
+            "\\\\fs01/projects//a\\..\\c.tga",
+            "\\\\fs01\\projects\\cache\\x.abc",
+            "\\\\fs01\\projects",
+            "\\\\fs01\\other\\a.tga",
+            "L:\\textures\\a.tga",
+            "//fs01/projects/a.tga",
+        ]
+        expected_result = [
+            "/mnt/projects/a/b.tga",
+            "/mnt/projects/c.tga",
+            "C:\\cache\\x.abc",
+            "\\\\fs01\\projects",
+            "\\\\fs01\\other\\a.tga",
+            "\\\\FS02\\Library\\textures\\a.tga",
+            "/fs01/projects/a.tga",
+        ]
+        remap = remapping.SimpleRemap(input_mapping)
+
+        self.assertEqual(expected_result, remap(input_paths))
+        self.assertEqual(expected_result * 2, remap.remap_batch(input_paths * 2))
+        self.assertEqual(expected_result, list(remap.remap_compact(input_paths)))
+
+    def test_remap_paths_with_pattern_mapping(self):
+        input_mapping = {
+            "glob:P:\\show_{show}\\publish": "/mnt/shows/{show}",
+            "glob:P:\\show_*\\publish\\v[0-9]*\\{name}": "/mnt/latest/{name}",
+            "P:\\show_abc\\publish": "/mnt/abc",
+            "P:\\": "X:\\",
+            "glob:/mnt/tools/{tool}-[!a-z]*": "/opt/{tool}",
+            "glob:/mnt/tools/maya-*": "/opt/maya",
+            "glob:cache*": ".",
+        }
+        input_paths = [
+            "p:/Show_xyz/publish/asset/a.usd",
+            "P:\\show_xyz\\Publish\\v012\\hero\\b.usd",
+            "P:\\show_xyz\\publish\\vx\\hero\\b.usd",
+            "P:\\show_abc\\publish\\asset\\a.usd",
+            "P:\\show_abc\\publish",
+            "P:\\show_xyz\\..\\show_q\\publish\\a.usd",
+            "P:\\other\\a.usd",
+            "/mnt/tools/maya-2024/bin/maya",
+            "/mnt/tools/houdini-20.5/bin/houdini",
+            "/mnt/tools/nuke-x/bin/nuke",
+            "/mnt/tools/Maya-2024",
+            "cache_01/Tree.abc",
+        ]
+        expected_result = [
+            "/mnt/shows/xyz/asset/a.usd",
+            "/mnt/latest/hero/b.usd",
+            "/mnt/shows/xyz/vx/hero/b.usd",
+            "/mnt/abc/asset/a.usd",
+            "X:\\show_abc\\publish",
+            "/mnt/shows/q/a.usd",
+            "X:\\other\\a.usd",
+            "/opt/maya/bin/maya",
+            "/opt/houdini/bin/houdini",
+            "/mnt/tools/nuke-x/bin/nuke",
+            "/mnt/tools/Maya-2024",
+            "Tree.abc",
+        ]
+        for cache_size in (0, 8):
+            remap = remapping.SimpleRemap(input_mapping, cache_size=cache_size)
+            self.assertEqual(expected_result, remap(input_paths))
+            self.assertEqual(
+                expected_result * 2, remap.remap_batch(input_paths * 2)
+            )
+            self.assertEqual(expected_result, list(remap.remap_compact(input_paths)))
+
+        self.assertEqual(
+            [b"/opt/maya/bin/maya", b"/mnt/tools/nuke-x/bin/nuke"],
+            remap.remap_bytes(
+                [b"/mnt/tools/maya-2024/bin/maya", b"/mnt/tools/nuke-x/bin/nuke"]
+            ),
+        )
+
+        remap.add_entry("glob:/mnt/tools/nuke-*", "/opt/nuke")
+        remap.replace_entry("glob:cache*", "/cache")
+        remap.remove_entry("glob:P:\\show_{show}\\publish")
+        self.assertEqual(
+            [
+                "X:\\Show_xyz\\publish\\asset\\a.usd",
+                "/opt/nuke/bin/nuke",
+                "/cache/Tree.abc",
+            ],
+            remap([input_paths[0], input_paths[9], input_paths[11]]),
+        )
+
+    def test_incorrect_pattern_mapping_should_raise(self):
+        for input_mapping in (
+            {"glob:P:\\show_{show}": "/mnt/shows/{name}"},
+            {"glob:P:\\{show}_{show}": "/mnt/shows/{show}"},
+            {"glob:P:\\show_*": "/mnt/shows/{0}"},
+            {"glob:": "/mnt/shows"},
+        ):
+            with self.assertRaises(ValueError):
+                remapping.SimpleRemap(input_mapping)
+
+    def test_iter_remap_paths_lazily_from_generator(self):
+        input_mapping = {"/mnt/storage1/": "/mnt2/storage2/"}
+        input_paths = (f"/mnt/storage1/shot{i:04d}" for i in itertools.count())
+
+        remap = remapping.SimpleRemap(input_mapping)
+        result = remap.iter_remap(input_paths)
+
+        self.assertEqual(
+            ["/mnt2/storage2/shot0000", "/mnt2/storage2/shot0001"],
+            list(itertools.islice(result, 2)),
+        )
+        self.assertEqual("/mnt2/storage2/shot0002", next(result))
+
+    def test_remap_paths_with_cache(self):
+        input_mapping = {
+            "L:\\": "X:\\",
+            "P:\\project1\\textures": "Z:\\library\\textures",
+        }
+        input_paths = [
+            "L:\\temp",
+            "p:///////project1/textures\\grass.tga",
+            "L:\\temp",
+            "p:/project1/textures/wood.tga",
+            "g:\\nope",
+            "L:\\temp",
+        ]
+        remap = remapping.SimpleRemap(input_mapping, cache_size=2)
+
+        self.assertEqual(
+            remapping.SimpleRemap(input_mapping)(input_paths), remap(input_paths)
+        )
+        self.assertEqual(
+            {
+                "paths": remapping.CacheInfo(
+                    hits=1, misses=5, evictions=3, size=2, max_size=2
+                ),
+                "directories": remapping.CacheInfo(
+                    hits=1, misses=4, evictions=2, size=2, max_size=2
+                ),
+            },
+            remap.cache_info(),
+        )
+
+        remap.cache_clear()
+        self.assertEqual(0, remap.cache_info()["paths"].size)
+        self.assertEqual({}, remapping.SimpleRemap(input_mapping).cache_info())
+
+    def test_remap_paths_with_instrumentation(self):
+        input_mapping = {
+            "L:\\": "X:\\",
+            "P:\\project1\\textures": "Z:\\library\\textures",
+        }
+        input_paths = [
+            "L:\\temp",
+            "p:///////project1/textures\\grass.tga",
+            "P:\\project1\\assets\\env\\Forest",
+            "cache\\Tree.abc",
+            "L:\\temp2",
+        ]
+        remapped_paths = []
+        instrumentation = remapping.Instrumentation(
+            callback=lambda *args: remapped_paths.append(args)
+        )
+        remap = remapping.SimpleRemap(input_mapping, instrumentation=instrumentation)
+
+        result = remap(input_paths)
+        snapshot = instrumentation.snapshot()
+
+        self.assertEqual(remapping.SimpleRemap(input_mapping)(input_paths), result)
+        self.assertEqual({"L:\\": 2, "P:\\project1\\textures": 1}, snapshot["entry_hits"])
+        self.assertEqual(1, snapshot["unmatched"])
+        self.assertEqual(1, snapshot["passed_through"])
+        self.assertEqual(
+            ["normalization", "matching", "building"], list(snapshot["timings"])
+        )
+        self.assertEqual(("L:\\temp", "X:\\temp", "L:\\"), remapped_paths[0])
+        self.assertEqual(("cache\\Tree.abc", "cache\\Tree.abc", None), remapped_paths[3])
+
+        instrumentation.reset()
+        self.assertEqual({}, instrumentation.snapshot()["entry_hits"])
+
+    def test_remap_batch_with_repeated_paths(self):
+        input_mapping = {
+            "L:\\": "X:\\",
+            "P:\\project1\\textures": "/Volumes/textures",
+            "/mnt/storage1": "/mnt2",
+        }
+        unique_paths = [
+            "L:\\temp\\a.tga",
+            "l:/temp\\b.tga",
+            "L:\\\\\\temp\\c.tga",
+            "p:/project1/textures/../textures/grass.tga",
+            "P:\\project1\\textures\\sand.tga",
+            "/mnt/storage1/a/../b/c.abc",
+            "/mnt/storage1//b/d.abc",
+            "/mnt/storage1/b/..",
+            "/mnt/storage3/e.abc",
+            "cache\\Tree.abc",
+            "L:\\",
+            "",
+        ]
+        input_paths = unique_paths * 3
+        remap = remapping.SimpleRemap(input_mapping)
+        stats = remapping.BatchStats()
+
+        self.assertEqual(remap(input_paths), remap.remap_batch(input_paths, stats))
+        self.assertEqual(36, stats.paths)
+        self.assertEqual(12, stats.unique_paths)
+        self.assertEqual(3.0, stats.dedup_ratio)
+        self.assertIn("dedup ratio: 3.00", stats.report())
+
+    def test_remap_compact(self):
+        input_mapping = {
+            "L:\\": "X:\\",
+            "P:\\project1\\textures": "/Volumes/textures/",
+            "/mnt/storage1": "\\\\server\\share",
+        }
+        input_paths = [
+            "L:\\temp\\a.tga",
+            "l:/temp\\b.tga",
+            "p:/project1/textures/../textures/grass.tga",
+            "P:\\\\project1\\textures\\sand.tga",
+            "/mnt/storage1/a.abc",
+            "/mnt/storage3//e.abc",
+            "cache\\Tree.abc",
+        ]
+        remap = remapping.SimpleRemap(input_mapping)
+        expected_result = remap(input_paths)
+        result = remap.remap_compact(input_paths)
+
+        self.assertEqual(expected_result, list(result))
+        self.assertEqual(len(expected_result), len(result))
+        self.assertEqual(expected_result[-3:], result[-3:])
+        self.assertEqual("/Volumes/textures/sand.tga", result[3])
+        self.assertLess(result.nbytes(), 10 * len(input_paths))
+        with self.assertRaises(IndexError):
+            result[len(input_paths)]
+
+    def test_remap_bytes(self):
+        input_mapping = {
+            "/mnt/storage1": "/mnt2/storage2",
+            "/mnt/storage1/textures": "Z:\\library\\textures",
+            "/mnt/\udcff": "/mnt3",
+        }
+        input_paths = [
+            b"/mnt/storage1/temp/a.tga",
+            b"/mnt/storage1/./temp/b.tga",
+            b"/mnt/storage1/textures/grass.tga",
+            b"/mnt/storage1/textures/a\\b.tga",
+            b"/mnt/storage1/temp/../c.tga",
+            b"/mnt//storage1/d.tga",
+            b"/mnt/\xff/\xc5\xbc.abc",
+            b"/mnt/storage1/temp/",
+            b"L:\\temp",
+            b"cache/Tree.abc",
+            b"",
+        ]
+        remap = remapping.SimpleRemap(input_mapping)
+        expected_result = [
+            path.encode("utf-8", "surrogateescape")
+            for path in remap(
+                [path.decode("utf-8", "surrogateescape") for path in input_paths]
+            )
+        ]
+
+        self.assertEqual(expected_result, remap.remap_bytes(input_paths))
+        self.assertEqual(
+            expected_result, remap.remap_bytes(map(memoryview, input_paths))
+        )
+        self.assertEqual(b"/mnt3/\xc5\xbc.abc", expected_result[6])
+        self.assertEqual(
+            b"\0".join(expected_result) + b"\0",
+            remap.remap_buffer(b"\0".join(input_paths) + b"\0"),
+        )
+        output = bytearray(b"header\0")
+        self.assertIs(output, remap.remap_buffer(b"/mnt/storage1/a", output))
+        self.assertEqual(b"header\0/mnt2/storage2/a", output)
+        self.assertEqual(b"", remap.remap_buffer(b""))
+
+        remap.replace_entry("/mnt/storage1", "/mnt4")
+        self.assertEqual([b"/mnt4/a"], remap.remap_bytes([b"/mnt/storage1/a"]))
+
+    def test_update_mapping_entries_incrementally(self):
+        input_mapping = {
+            "L:\\": "X:\\",
+            "P:\\project1\\textures": "/Volumes/textures",
+            "/mnt/storage1": "/mnt2",
+        }
+        input_paths = [
+            "L:\\temp\\a.tga",
+            "l:/project1/textures\\grass.tga",
+            "P:\\project1\\textures\\sand.tga",
+            "/mnt/storage1/b/c.abc",
+            "/mnt/storage3/e.abc",
+            "cache\\Tree.abc",
+        ]
+        for cache_size in (0, 8):
+            remap = remapping.SimpleRemap(dict(input_mapping), cache_size=cache_size)
+            remap(input_paths)
+
+            remap.add_entry("l:/project1", "Q:\\")
+            remap.replace_entry("/mnt/storage1", "/mnt3")
+            remap.remove_entry("P:\\project1\\textures")
+            remap.add_entry("/mnt/storage3", "C:\\storage3")
+            expected_mapping = {
+                "L:\\": "X:\\",
+                "/mnt/storage1": "/mnt3",
+                "l:/project1": "Q:\\",
+                "/mnt/storage3": "C:\\storage3",
+            }
+
+            self.assertEqual(expected_mapping, remap.mapping)
+            self.assertEqual(
+                remapping.SimpleRemap(expected_mapping)(input_paths), remap(input_paths)
+            )
+            self.assertEqual(
+                [
+                    "X:\\temp\\a.tga",
+                    "Q:\\textures\\grass.tga",
+                    "P:\\project1\\textures\\sand.tga",
+                    "/mnt3/b/c.abc",
+                    "C:\\storage3\\e.abc",
+                    "cache\\Tree.abc",
+                ],
+                remap(input_paths),
+            )
+
+    def test_update_mapping_entries_with_incorrect_sub_path_should_raise(self):
+        remap = remapping.SimpleRemap({"L:\\": "X:\\"})
+
+        with self.assertRaises(ValueError):
+            remap.add_entry("L:\\", "Y:\\")
+        with self.assertRaises(ValueError):
+            remap.replace_entry("P:\\", "Y:\\")
+        with self.assertRaises(ValueError):
+            remap.remove_entry("P:\\")
+        self.assertEqual({"L:\\": "X:\\"}, remap.mapping)
@@ -0,0 +1,195 @@
+import itertools
+import pathlib
+import random
+import re
+import unittest
+
+from src.remapping import utils
+
+
+# Original, regex based implementations used as a reference for differential tests.
+WINDOWS_PARENT_PATH_PATTERN = re.compile(r"(/|\\).[^\.\./\\]*(/|\\)\.\.")
+POSIX_PARENT_PATH_PATTERN = re.compile(r"(/).[^\.\./]*(/)\.\.")
+UNC_ANCHOR_PATTERN = re.compile(r"\\\\([^/\\]+)[/\\]+([^/\\]+)")
+
+
+def reference_normalize_path(path):
+    unc_anchor = UNC_ANCHOR_PATTERN.match(path)
+    if unc_anchor is not None:
+        # Server and share of UNC path are never removed.
+        anchor = "\\\\{}\\{}".format(*unc_anchor.groups())
+        path = path[unc_anchor.end() :]
+        parent_path_pattern = WINDOWS_PARENT_PATH_PATTERN
+    else:
+        anchor = ""
+        parent_path_pattern = (
+            WINDOWS_PARENT_PATH_PATTERN
+            if utils.is_windows_style_path(path)
+            else POSIX_PARENT_PATH_PATTERN
+        )
+    while parent_path_pattern.search(path):
+        path = parent_path_pattern.sub("", path)
+
+    return anchor + re.sub(r"\\+", r"\\", re.sub(r"/+", "/", path))
+
+
+def reference_get_resolved_path(path):
+    resolver = (
+        pathlib.PureWindowsPath
+        if utils.is_windows_style_path(path)
+        else pathlib.PurePosixPath
+    )
+    return resolver(reference_normalize_path(path))
+
+
+def reference_build_dst_path(input_path, part_to_replace, replacement_path):
+    sub_path = input_path[len(part_to_replace) :]
+    sub_path = sub_path.lstrip("/")
+    if utils.is_windows_style_path(input_path):
+        sub_path = sub_path.lstrip("\\")
+
+    replacement_path = reference_get_resolved_path(replacement_path)
+    return str(replacement_path.joinpath(sub_path))
+
+
+def all_paths(alphabet, max_length):
+    for length in range(max_length + 1):
+        for chars in itertools.product(alphabet, repeat=length):
+            yield "".join(chars)
+
+
+def random_paths(tokens, count, max_tokens, seed=0):
+    generator = random.Random(seed)
+    for _ in range(count):
+        yield "".join(
+            generator.choice(tokens) for _ in range(generator.randint(0, max_tokens))
+        )
+
+
+TOKENS = ["/", "\\", ".", "..", "...", "a", "bc", "L:", "x.y", ".h", "\n", "//"]
+
+
+class TestUtils(unittest.TestCase):
+    def test_normalize_path_is_equal_to_reference_for_all_short_paths(self):
+        for path in all_paths("/\\.a:", 7):
+            self.assertEqual(
+                reference_normalize_path(path), utils.normalize_path(path), repr(path)
+            )
+
+    def test_normalize_path_is_equal_to_reference_for_random_paths(self):
+        for path in random_paths(TOKENS, 5000, 30):
+            self.assertEqual(
+                reference_normalize_path(path), utils.normalize_path(path), repr(path)
+            )
+
+    def test_normalize_path_with_long_parent_statements_chain(self):
+        depth = 5000
+        path = "/mnt" + "/dir" * depth + "/.." * depth + "/storage1"
+
+        self.assertEqual("/mnt/storage1", utils.normalize_path(path))
+
+    def test_normalize_path_with_multiplied_separators_is_equal_to_reference(self):
+        tokens = ["/", "//", "///", "\\\\", ".", "..", "a", "/..", "a/..", "\n"]
+        paths = ["//./a/../..///..////..a/..", "////../a/..", "//./../a/.."]
+        paths.extend(random_paths(tokens, 5000, 40, seed=2))
+        for path in paths:
+            self.assertEqual(
+                reference_normalize_path(path), utils.normalize_path(path), repr(path)
+            )
+
+    def test_normalize_path_with_long_parent_statements_chain_and_multiplied_separators(
+        self,
+    ):
+        depth = 5000
+        path = "p://mnt" + "//dir" * depth + "/.." * depth + "/storage1"
+
+        self.assertEqual("p:/mnt/storage1", utils.normalize_path(path))
+
+    def test_split_path_is_equal_to_resolved_path_parts(self):
+        for path in random_paths(TOKENS + ["1:", "x:", "Q"], 5000, 12, seed=1):
+            resolved_path = reference_get_resolved_path(path)
+            self.assertEqual(
+                (isinstance(resolved_path, pathlib.PureWindowsPath), resolved_path.parts),
+                utils.split_path(path),
+                repr(path),
+            )
+
+    def test_unc_paths_are_equal_to_reference(self):
+        tokens = TOKENS + ["srv", "Share", "x:"]
+        for path in random_paths(tokens, 3000, 10, seed=8):
+            path = "\\\\" + path
+            resolved_path = reference_get_resolved_path(path)
+            self.assertEqual(
+                reference_normalize_path(path), utils.normalize_path(path), repr(path)
+            )
+            self.assertEqual(
+                (isinstance(resolved_path, pathlib.PureWindowsPath), resolved_path.parts),
+                utils.split_path(path),
+                repr(path),
+            )
+
+        self.assertEqual(
+            (True, ("\\\\srv\\Share\\", "b")),
+            utils.split_path("\\\\srv//Share\\a\\..\\b"),
+        )
+        self.assertEqual(
+            "\\\\srv\\Share/../b", utils.normalize_path("\\\\srv/Share/a/../../b")
+        )
+        self.assertFalse(utils.is_windows_style_path("\\\\srv"))
+        self.assertFalse(utils.is_windows_style_path("\\\\\\srv\\Share"))
+
+    def test_split_bytes_path_is_equal_to_split_path(self):
+        split_count = 0
+        for path in random_paths(TOKENS + ["\udcff", "\u017c"], 5000, 12, seed=7):
+            encoded_path = path.encode("utf-8", "surrogateescape")
+            parts = utils.split_bytes_path(encoded_path)
+            if parts is None:
+                continue
+            split_count += 1
+            decoded_parts = tuple(
+                part.decode("utf-8", "surrogateescape") for part in parts
+            )
+            self.assertEqual((False, decoded_parts), utils.split_path(path), repr(path))
+        self.assertGreater(split_count, 500)
+        self.assertIsNone(utils.split_bytes_path(b"/mnt/storage1/../temp"))
+        self.assertIsNone(utils.split_bytes_path(b"l:/temp"))
+
+    def test_join_path_is_equal_to_pure_path_join(self):
+        paths = random_paths(TOKENS + ["1:", "x:", "Q"], 5000, 12, seed=2)
+        sub_paths = random_paths(TOKENS + ["1:", "x:", "Q"], 5000, 8, seed=3)
+        for path, sub_path in zip(paths, sub_paths):
+            windows, _ = utils.split_path(path)
+            path = str(reference_get_resolved_path(path))
+            sub_parts = [
+                part
+                for part in utils.split_path(sub_path)[1]
+                if "/" not in part and "\\" not in part
+            ]
+            resolver = pathlib.PureWindowsPath if windows else pathlib.PurePosixPath
+            self.assertEqual(
+                str(resolver(path).joinpath(*sub_parts)),
+                utils.join_path(path, sub_parts, windows),
+                repr((path, sub_parts)),
+            )
+
+    def test_build_dst_path_is_equal_to_reference(self):
+        generator = random.Random(4)
+        paths = random_paths(TOKENS + ["1:", "x:", "Q"], 5000, 8, seed=5)
+        replacements = random_paths(TOKENS + ["1:", "x:", "Q"], 5000, 12, seed=6)
+        for path, replacement in zip(paths, replacements):
+            path = utils.normalize_path(path)
+            part_to_replace = path[: generator.randint(0, len(path))]
+            self.assertEqual(
+                reference_build_dst_path(path, part_to_replace, replacement),
+                utils.build_dst_path(path, part_to_replace, replacement),
+                repr((path, part_to_replace, replacement)),
+            )
+
+    def test_build_dst_path_examples(self):
+        self.assertEqual("G:\\temp", utils.build_dst_path("L:\\temp", "L:\\", "G:\\"))
+        self.assertEqual(
+            "/Volumes/storage2/project1/textures",
+            utils.build_dst_path(
+                "P:/project1/textures", "P:\\", "/Volumes/storage3/../storage2"
+            ),
+        )
@@ -0,0 +1,115 @@
+import unittest
+
+from src import remapping
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from src.remapping.vectorized import VectorizedRemap
+
+
+@unittest.skipUnless(numpy, "requires NumPy")
+class TestVectorizedRemap(unittest.TestCase):
+    def setUp(self):
+        self.input_paths = [
+            "L:\\temp\\a.tga",
+            "l:/Temp/b.tga",
+            "p:/project1/textures\\grass.tga",
+            "p:///////project1/textures\\grass.tga",
+            "P:\\project1\\..\\project1\\textures\\a",
+            "P:\\project1\\assets\\env\\Forest",
+            "/mnt/storage1/temp/a.tga",
+            "/mnt/storage2/textures/a\\b.tga",
+            "/mnt/storage1/./temp//a.tga/",
+            "/Volumes/storage1/temp",
+            "cache\\Tree.abc",
+            "cache/Tree.abc",
+            "\\\\server\\share\\a",
+            "L:\\żółw",
+            "L:",
+            "",
+        ]
+
+    def test_remap_like_mixed_platform_remap(self):
+        remap = remapping.MixedPlatformRemap(
+            {
+                "Windows": ["L:\\", "P:\\project1\\textures"],
+                "Linux": ["/mnt/storage1", "/mnt/storage2/textures"],
+                "Mac": ["/Volumes/storage1", None],
+            }
+        )
+        vectorized_remap = VectorizedRemap(remap)
+
+        for platform in ("Windows", "Linux", "Mac"):
+            expected_result = remap(self.input_paths, platform)
+            self.assertEqual(
+                expected_result, vectorized_remap(self.input_paths, platform).tolist()
+            )
+            self.assertEqual(
+                expected_result,
+                vectorized_remap(numpy.array(self.input_paths), platform).tolist(),
+            )
+            self.assertEqual(
+                expected_result,
+                vectorized_remap(
+                    numpy.array(self.input_paths, dtype=object), platform
+                ).tolist(),
+            )
+
+    def test_remap_like_simple_remap(self):
+        remap = remapping.SimpleRemap(
+            {
+                "L:\\": "X:\\",
+                "P:\\project1\\textures": "Z:\\library\\textures",
+                "/mnt/storage1/": "/mnt2/storage2/",
+                "/mnt/storage2": "W:\\",
+                "cache": ".",
+            }
+        )
+        vectorized_remap = VectorizedRemap(remap)
+        input_paths = self.input_paths * 3000
+
+        self.assertEqual(remap(input_paths), vectorized_remap(input_paths).tolist())
+        self.assertEqual([], vectorized_remap([]).tolist())
+
+    def test_remap_like_simple_remap_with_patterns(self):
+        remap = remapping.SimpleRemap(
+            {
+                "L:\\": "X:\\",
+                "glob:P:\\project?\\{kind}": "Z:\\library\\{kind}",
+                "/mnt/storage1": "/mnt2/storage2",
+            }
+        )
+        vectorized_remap = VectorizedRemap(remap)
+        self.assertEqual(
+            remap(self.input_paths), vectorized_remap(self.input_paths).tolist()
+        )
+
+        remap.replace_entry("glob:P:\\project?\\{kind}", "/mnt/{kind}")
+        remap.add_entry("glob:/mnt/storage[12]", "/Volumes/storage")
+        self.assertEqual(
+            remap(self.input_paths), vectorized_remap(self.input_paths).tolist()
+        )
+
+    def test_mapping_updates_are_used(self):
+        remap = remapping.SimpleRemap({"L:\\": "X:\\"})
+        vectorized_remap = VectorizedRemap(remap)
+        self.assertEqual(["X:\\temp"], vectorized_remap(["L:\\temp"]).tolist())
+
+        remap.replace_entry("L:\\", "Y:\\")
+        self.assertEqual(["Y:\\temp"], vectorized_remap(["L:\\temp"]).tolist())
+        remap.remove_entry("L:\\")
+        self.assertEqual(["L:\\temp"], vectorized_remap(["L:\\temp"]).tolist())
+
+    def test_incorrect_arguments_should_raise(self):
+        mixed_remap = VectorizedRemap(
+            remapping.MixedPlatformRemap({"Windows": ["L:\\"], "Linux": ["/mnt"]})
+        )
+        with self.assertRaises(ValueError):
+            mixed_remap(["L:\\temp"], "Solaris")
+        with self.assertRaises(ValueError):
+            mixed_remap(["L:\\temp"])
+        with self.assertRaises(ValueError):
+            VectorizedRemap(remapping.SimpleRemap({"L:\\": "X:\\"}))(["L:\\"], "Linux")
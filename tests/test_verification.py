@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import remapping
+from src.remapping import verification
+
+
+class TestVerifiedRemap(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        for sub_path in ("storage/temp", "storage/textures", "textures"):
+            os.makedirs(os.path.join(self.root, sub_path))
+        for sub_path in ("storage/temp/a.abc", "storage/textures/grass.tga"):
+            open(os.path.join(self.root, sub_path), "w").close()
+        open(os.path.join(self.root, "textures", "rock.tga"), "w").close()
+        os.symlink(
+            os.path.join(self.root, "missing"),
+            os.path.join(self.root, "storage", "temp", "broken.abc"),
+        )
+
+        self.storage = os.path.join(self.root, "storage")
+        self.textures = os.path.join(self.root, "textures")
+        self.remap = remapping.SimpleRemap(
+            {"L:\\": self.storage, "L:\\textures": self.textures}
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_statuses(self):
+        verified_remap = remapping.VerifiedRemap(self.remap)
+        with mock.patch.object(verification.os, "scandir", wraps=os.scandir) as scandir:
+            result = verified_remap(
+                [
+                    "L:\\temp\\a.abc",
+                    "l:/temp/b.abc",
+                    "L:\\temp\\broken.abc",
+                    "L:\\temp\\a.abc\\c.abc",
+                    "L:\\textures\\rock.tga",
+                    "L:\\textures\\grass.tga",
+                    "L:\\cache\\a.abc",
+                    "L:\\temp",
+                    "",
+                ]
+            )
+
+        self.assertEqual(
+            [
+                (os.path.join(self.storage, "temp", "a.abc"), "exists"),
+                (os.path.join(self.storage, "temp", "b.abc"), "missing"),
+                (os.path.join(self.storage, "temp", "broken.abc"), "missing"),
+                (
+                    os.path.join(self.storage, "temp", "a.abc", "c.abc"),
+                    "directory missing",
+                ),
+                (os.path.join(self.textures, "rock.tga"), "exists"),
+                (os.path.join(self.textures, "grass.tga"), "missing"),
+                (os.path.join(self.storage, "cache", "a.abc"), "directory missing"),
+                (os.path.join(self.storage, "temp"), "exists"),
+                ("", "missing"),
+            ],
+            result,
+        )
+        self.assertEqual(5, scandir.call_count)
+
+    def test_fallback_to_next_matching_root(self):
+        verified_remap = remapping.VerifiedRemap(self.remap, fallback=True)
+        self.assertEqual(
+            [
+                (os.path.join(self.storage, "textures", "grass.tga"), "exists"),
+                (os.path.join(self.textures, "rock.tga"), "exists"),
+                (os.path.join(self.textures, "sand.tga"), "missing"),
+                (os.path.join(self.storage, "temp", "b.abc"), "missing"),
+            ],
+            verified_remap(
+                [
+                    "L:\\textures\\grass.tga",
+                    "L:\\textures\\rock.tga",
+                    "L:\\textures\\sand.tga",
+                    "L:\\temp\\b.abc",
+                ]
+            ),
+        )
+
+    def test_mixed_platforms_fallback(self):
+        remap = remapping.MixedPlatformRemap(
+            {
+                "Windows": ["L:\\", "L:\\textures"],
+                "Linux": [self.storage, os.path.join(self.root, "missing")],
+            }
+        )
+        verified_remap = remapping.VerifiedRemap(remap, fallback=True)
+        self.assertEqual(
+            [(os.path.join(self.storage, "textures", "grass.tga"), "exists")],
+            verified_remap(["L:\\textures\\grass.tga"], "Linux"),
+        )
+        missing_path = os.path.join(self.root, "other", "a.abc")
+        self.assertEqual(
+            [(missing_path, "directory missing")],
+            verified_remap([missing_path], "Windows"),
+        )
+        with self.assertRaises(ValueError):
+            verified_remap(["L:\\temp"])
+        with self.assertRaises(ValueError):
+            remapping.VerifiedRemap(self.remap)(["L:\\temp"], "Linux")
+
+    def test_listings_are_cached(self):
+        listings = remapping.DirectoryListingCache(max_size=1, ttl=10.0)
+        verified_remap = remapping.VerifiedRemap(self.remap, listings=listings)
+        new_path = os.path.join(self.storage, "temp", "b.abc")
+
+        with mock.patch.object(verification.time, "monotonic", return_value=100.0):
+            self.assertEqual(
+                [(new_path, "missing")], verified_remap(["L:\\temp\\b.abc"])
+            )
+            open(new_path, "w").close()
+            self.assertEqual(["missing"], verified_remap.verify([new_path]))
+
+        with mock.patch.object(verification.time, "monotonic", return_value=110.0):
+            self.assertEqual(["exists"], verified_remap.verify([new_path]))
+            self.assertEqual(["exists"], verified_remap.verify([self.textures]))
+
+        self.assertEqual((1, 3, 1, 1, 1), listings.info())
+        with self.assertRaises(ValueError):
+            remapping.DirectoryListingCache(ttl=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
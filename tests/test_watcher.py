@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from src import remapping
+from src.remapping.watcher import load_remap
+
+
+class TestMappingWatcher(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.mapping_path = os.path.join(directory.name, "mapping.json")
+        self.modification_time = time.time_ns()
+        self.write_mapping({"Windows": ["L:\\"], "Linux": ["/mnt/storage1"]})
+
+    def write_mapping(self, mapping):
+        with open(self.mapping_path, "w", encoding="utf-8") as file:
+            file.write(mapping if isinstance(mapping, str) else json.dumps(mapping))
+        # Modification time is moved forward explicitly, since consecutive writes
+        # might happen within resolution of file system timestamps.
+        self.modification_time += 10**9
+        os.utime(
+            self.mapping_path, ns=(self.modification_time, self.modification_time)
+        )
+
+    def test_reload_changed_mapping(self):
+        watcher = remapping.MappingWatcher(self.mapping_path)
+        remap = watcher.remap
+
+        self.assertEqual(["/mnt/storage1/temp"], watcher(["L:\\temp"], "Linux"))
+        self.assertFalse(watcher.check())
+        self.assertIs(remap, watcher.remap)
+
+        self.write_mapping({"Windows": ["L:\\"], "Linux": ["/mnt/storage2"]})
+        self.assertTrue(watcher.check())
+        self.assertIsNot(remap, watcher.remap)
+        self.assertEqual(["/mnt/storage2/temp"], watcher(["L:\\temp"], "Linux"))
+
+        self.write_mapping({"L:\\": "X:\\"})
+        self.assertTrue(watcher.check())
+        self.assertIsInstance(watcher.remap, remapping.SimpleRemap)
+        self.assertEqual(["X:\\temp"], watcher(["L:\\temp"]))
+
+    def test_keep_previous_mapping_when_reload_fails(self):
+        watcher = remapping.MappingWatcher(self.mapping_path)
+        remap = watcher.remap
+
+        self.write_mapping('{"Windows": ["L:\\\\"], "Linux": [')
+        self.assertFalse(watcher.check())
+        self.assertIsInstance(watcher.last_error, ValueError)
+        self.assertIs(remap, watcher.remap)
+
+        os.remove(self.mapping_path)
+        self.assertFalse(watcher.check())
+
+        self.write_mapping({"Windows": ["L:\\"], "Linux": ["/mnt/storage2"]})
+        self.assertTrue(watcher.check())
+        self.assertIsNone(watcher.last_error)
+        self.assertEqual(["/mnt/storage2/temp"], watcher(["L:\\temp"], "Linux"))
+
+    def test_mapping_with_incorrect_values_should_raise(self):
+        watcher = remapping.MappingWatcher(self.mapping_path)
+        for mapping in (
+            {"/mnt/a": 1},
+            {"Windows": ["L:\\"], "Linux": [1]},
+            {"Windows": ["L:\\"], "Linux": "/mnt/storage1"},
+        ):
+            self.write_mapping(mapping)
+            self.assertFalse(watcher.check())
+            self.assertIsInstance(watcher.last_error, ValueError)
+
+    def test_background_thread_survives_unexpected_errors(self):
+        def loader(*args):
+            if loader.fail:
+                loader.fail = False
+                raise TypeError("unexpected")
+            return load_remap(*args)
+
+        loader.fail = False
+        with remapping.MappingWatcher(
+            self.mapping_path, interval=0.01, loader=loader
+        ) as watcher:
+            loader.fail = True
+            self.write_mapping({"L:\\": "X:\\"})
+            deadline = time.monotonic() + 5
+            while loader.fail and time.monotonic() < deadline:
+                time.sleep(0.01)
+            while watcher.last_error is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertIsInstance(watcher.last_error, TypeError)
+            self.assertTrue(watcher._thread.is_alive())
+
+            self.write_mapping({"L:\\": "Y:\\"})
+            while watcher.last_error is not None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(["Y:\\temp"], watcher(["L:\\temp"]))
+
+    def test_reload_mapping_in_background(self):
+        with remapping.MappingWatcher(self.mapping_path, interval=0.01) as watcher:
+            self.write_mapping({"Windows": ["L:\\"], "Linux": ["/mnt/storage2"]})
+            deadline = time.monotonic() + 5
+            while (
+                watcher(["L:\\temp"], "Linux") != ["/mnt/storage2/temp"]
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.01)
+
+        self.assertEqual(["/mnt/storage2/temp"], watcher(["L:\\temp"], "Linux"))
+        self.assertIsNone(watcher._thread)
+
+    def test_initialize_watcher_with_incorrect_interval_should_raise(self):
+        with self.assertRaises(ValueError):
+            remapping.MappingWatcher(self.mapping_path, interval=0)